@@ -2,22 +2,31 @@
 Punto de entrada principal de la aplicación FastAPI.
 
 Ejecutar desde la raíz del proyecto con:
-    python -m uvicorn app.main:app --reload
+    python -m uvicorn app.main:app --reload   (desarrollo)
+    python -m app.servidor                    (producción, ver app/servidor.py)
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 import logging
 
-from app.routes import alumnos, profesores
+from app.routes import alumnos, profesores, admin, debug, rpc, transacciones
+from app.services import asincrono, mantenimiento_service, memoria_service, semilla_service
 from app.utils.exceptions import (
     ValidationError,
     NotFoundError,
+    GoneError,
+    NotAcceptableError,
+    UnsupportedMediaTypeError,
     ServerError,
     validation_error_handler,
     not_found_error_handler,
+    gone_error_handler,
+    not_acceptable_error_handler,
+    unsupported_media_type_error_handler,
     server_error_handler,
 )
 
@@ -27,6 +36,17 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Arrancar y detener los subsistemas de fondo junto con la aplicación."""
+    semilla_service.iniciar()
+    mantenimiento_service.iniciar()
+    yield
+    mantenimiento_service.detener()
+    asincrono.detener()
+
+
 app = FastAPI(
     title="API REST - Gestión de Alumnos y Profesores",
     description="API REST educativa con persistencia en memoria. ⚠️ Los datos se pierden al reiniciar.",
@@ -34,6 +54,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -74,11 +95,25 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 # Manejadores de excepciones personalizadas
 app.add_exception_handler(ValidationError, validation_error_handler)
 app.add_exception_handler(NotFoundError, not_found_error_handler)
+app.add_exception_handler(GoneError, gone_error_handler)
+app.add_exception_handler(NotAcceptableError, not_acceptable_error_handler)
+app.add_exception_handler(UnsupportedMediaTypeError, unsupported_media_type_error_handler)
 app.add_exception_handler(ServerError, server_error_handler)
 
 # Routers
 app.include_router(alumnos.router, prefix="/alumnos", tags=["Alumnos"])
 app.include_router(profesores.router, prefix="/profesores", tags=["Profesores"])
+app.include_router(transacciones.router, prefix="/transacciones", tags=["Transacciones"])
+app.include_router(rpc.router, tags=["WebSocket"])
+
+# Administración: sin ADMIN_HABILITADO=1 las rutas /admin no existen
+if admin.HABILITADO:
+    app.include_router(admin.router, prefix="/admin", tags=["Admin"])
+
+# Diagnóstico de memoria: sin DEBUG_MEMORIA=1 no se registra nada (costo cero)
+if memoria_service.HABILITADO:
+    app.middleware("http")(memoria_service.middleware_asignaciones)
+    app.include_router(debug.router, prefix="/debug/memoria", tags=["Debug"])
 
 
 @app.get("/", tags=["Root"])
@@ -94,6 +129,11 @@ async def root():
 
 @app.get("/health", tags=["Health"])
 async def health_check():
+    if semilla_service.cargando():
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "loading", "service": "API REST - Proyecto Educativo"},
+        )
     return {
         "status": "healthy",
         "service": "API REST - Proyecto Educativo",
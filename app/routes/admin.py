@@ -0,0 +1,66 @@
+"""
+Rutas de administración (planificador de mantenimiento, carga inicial).
+
+Permiten ejecutar y pausar tareas y ven el reporte de la semilla, así que
+solo se registran con ADMIN_HABILITADO=1 (ver app.main), igual que
+/debug/memoria.
+
+Configuración por variables de entorno:
+    ADMIN_HABILITADO   "1" para registrar las rutas /admin (default "0")
+    ADMIN_TOKEN        Si se define, se exige en la cabecera X-Admin-Token
+"""
+
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, status
+from starlette.concurrency import run_in_threadpool
+from app.services import mantenimiento_service, semilla_service
+from app.utils.exceptions import NotFoundError
+import logging
+
+logger = logging.getLogger(__name__)
+
+HABILITADO = os.getenv("ADMIN_HABILITADO", "0") == "1"
+TOKEN = os.getenv("ADMIN_TOKEN")
+
+
+async def verificar_token(x_admin_token: Optional[str] = Header(None)):
+    """Exigir X-Admin-Token si ADMIN_TOKEN está definido."""
+    if TOKEN and x_admin_token != TOKEN:
+        # 404 en lugar de 401/403 para no revelar que la ruta existe
+        raise NotFoundError("Recurso no encontrado", "Recurso no encontrado")
+
+
+router = APIRouter(dependencies=[Depends(verificar_token)])
+
+
+@router.get("/mantenimiento/tareas", status_code=status.HTTP_200_OK)
+async def listar_tareas():
+    """Listar tareas de mantenimiento con su estado y métricas."""
+    return mantenimiento_service.listar_tareas()
+
+
+@router.post("/mantenimiento/tareas/{tarea_id}/ejecutar", status_code=status.HTTP_200_OK)
+async def ejecutar_tarea(tarea_id: str):
+    """Ejecutar una tarea ahora (en el pool de hilos, sin bloquear el event loop)."""
+    logger.info(f"Ejecución manual de tarea {tarea_id}")
+    return await run_in_threadpool(mantenimiento_service.ejecutar_tarea, tarea_id)
+
+
+@router.post("/mantenimiento/tareas/{tarea_id}/pausar", status_code=status.HTTP_200_OK)
+async def pausar_tarea(tarea_id: str):
+    """Pausar la ejecución periódica de una tarea."""
+    return mantenimiento_service.pausar_tarea(tarea_id)
+
+
+@router.post("/mantenimiento/tareas/{tarea_id}/reanudar", status_code=status.HTTP_200_OK)
+async def reanudar_tarea(tarea_id: str):
+    """Reanudar la ejecución periódica de una tarea."""
+    return mantenimiento_service.reanudar_tarea(tarea_id)
+
+
+@router.get("/semilla", status_code=status.HTTP_200_OK)
+async def estado_semilla():
+    """Estado de la carga inicial y reporte de filas rechazadas."""
+    return semilla_service.obtener_estado()
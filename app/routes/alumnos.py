@@ -2,35 +2,197 @@
 Rutas (endpoints) para la entidad Alumno.
 """
 
-from fastapi import APIRouter, status, Query
-from typing import List
-from app.schemas.alumno_schema import AlumnoCreate, AlumnoUpdate, AlumnoResponse
-from app.services import alumnos_service
+from datetime import datetime
+from fastapi import APIRouter, Depends, status, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from app.schemas.alumno_schema import (
+    AlumnoCreate,
+    AlumnoUpdate,
+    AlumnoResponse,
+    AlumnoLookup,
+    AlumnoLookupResponse,
+)
+from app.schemas.historial_schema import HistorialResponse
+from app.schemas.ranking_schema import RankingResponse
+from app.services import asincrono, alumnos_service
+from app.utils.exceptions import ValidationError
+from app.utils.historial import a_instante
+from app.utils.validations import parsear_lista_csv
+from app.utils.proyeccion import parsear_campos
+from app.utils.exportacion import ARROW_STREAM, respuesta_arrow
+from app.utils.formatos import MSGPACK, RutaMsgpack, formato_respuesta, respuesta_cruda
 import logging
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(route_class=RutaMsgpack)
+
+CAMPOS_QUERY = Query(None, description="Campos a devolver separados por comas (ej: id,matricula)")
+
+AS_OF_QUERY = Query(
+    None,
+    description=(
+        "Leer el estado en esa fecha (ISO 8601 o epoch; sin zona horaria = UTC). "
+        "410 si esa versión ya no se conserva"
+    ),
+)
+
+MAX_LOTE = 1000  # Máximo de identificadores por llamada de lote
 
 
 @router.get("", response_model=List[AlumnoResponse], status_code=status.HTTP_200_OK)
 async def listar_alumnos(
     skip: int = Query(0, ge=0, description="Número de registros a saltar"),
     limit: int = Query(100, ge=1, le=1000, description="Número máximo de registros"),
+    fields: Optional[str] = CAMPOS_QUERY,
+    formato: str = Depends(formato_respuesta),
+    snapshot: bool = Query(False, description="Leer de una foto fija y devolver X-Cursor-Siguiente"),
+    cursor: Optional[str] = Query(None, description="Cursor de X-Cursor-Siguiente (ignora skip)"),
+    as_of: Optional[datetime] = AS_OF_QUERY,
 ):
     """Obtener lista de todos los alumnos."""
     try:
-        alumnos = alumnos_service.obtener_todos_alumnos()
+        campos = parsear_campos(fields, AlumnoResponse)
+        if as_of is not None:
+            registros = await asincrono.alumnos.obtener_registros_alumnos_en(a_instante(as_of), skip, limit)
+            return respuesta_cruda(
+                registros, AlumnoResponse, campos or tuple(AlumnoResponse.model_fields), formato=formato
+            )
+        if snapshot or cursor:
+            registros, siguiente = await asincrono.alumnos.obtener_pagina_alumnos(cursor, skip, limit)
+            respuesta = respuesta_cruda(
+                registros, AlumnoResponse, campos or tuple(AlumnoResponse.model_fields), formato=formato
+            )
+            if siguiente:
+                respuesta.headers["X-Cursor-Siguiente"] = siguiente
+            return respuesta
+        if campos or formato == MSGPACK:
+            registros = await asincrono.alumnos.obtener_registros_alumnos(skip, limit)
+            return respuesta_cruda(registros, AlumnoResponse, campos, formato=formato)
+        alumnos = await asincrono.alumnos.obtener_todos_alumnos()
         return alumnos[skip : skip + limit]
     except Exception as e:
         logger.error(f"Error al listar alumnos: {str(e)}")
         raise
 
 
+@router.get("/lookup", response_model=AlumnoLookupResponse, status_code=status.HTTP_200_OK)
+async def buscar_alumnos_lote(
+    ids: Optional[str] = Query(None, description="IDs separados por comas (ej: 1,2,3)"),
+    matriculas: Optional[str] = Query(None, description="Valores separados por comas"),
+    fields: Optional[str] = CAMPOS_QUERY,
+    formato: str = Depends(formato_respuesta),
+):
+    """Obtener varios alumnos por id y/o matrícula en una sola llamada."""
+    return await _resolver_lote(
+        parsear_lista_csv(ids, "ids", como_entero=True),
+        parsear_lista_csv(matriculas, "matriculas"),
+        fields,
+        formato,
+    )
+
+
+@router.post("/lookup", response_model=AlumnoLookupResponse, status_code=status.HTTP_200_OK)
+async def buscar_alumnos_lote_post(
+    consulta: AlumnoLookup,
+    fields: Optional[str] = CAMPOS_QUERY,
+    formato: str = Depends(formato_respuesta),
+):
+    """Obtener varios alumnos por id y/o matrícula (lote en el cuerpo)."""
+    return await _resolver_lote(consulta.ids, consulta.matriculas, fields, formato)
+
+
+async def _resolver_lote(
+    ids: List[int], matriculas: List[str], fields: Optional[str], formato: str
+):
+    if len(ids) + len(matriculas) > MAX_LOTE:
+        raise ValidationError(
+            "Lote demasiado grande",
+            f"Se permiten como máximo {MAX_LOTE} identificadores por llamada",
+        )
+    campos = parsear_campos(fields, AlumnoResponse)
+    if campos or formato == MSGPACK:
+        resultado = await asincrono.alumnos.resolver_lote_alumnos(ids, matriculas)
+        return respuesta_cruda(resultado, AlumnoResponse, campos, forma="lote", formato=formato)
+    return await asincrono.alumnos.obtener_alumnos_por_lote(ids, matriculas)
+
+
+@router.get("/facetas", status_code=status.HTTP_200_OK)
+async def contar_facetas_alumnos(
+    promedio: Optional[str] = Query(None, description="Bandas de promedio separadas por comas (ej: 3-4,4-5)"),
+    inicial_apellido: Optional[str] = Query(None, description="Iniciales separadas por comas (ej: G,M)"),
+):
+    """Conteos por faceta (bitmaps) bajo la combinación de filtros dada."""
+    filtros = {
+        faceta: [v.upper() if faceta == "inicial_apellido" else v for v in valores]
+        for faceta, valores in (
+            ("promedio", parsear_lista_csv(promedio, "promedio")),
+            ("inicial_apellido", parsear_lista_csv(inicial_apellido, "inicial_apellido")),
+        )
+        if valores
+    }
+    return await asincrono.alumnos.contar_facetas(filtros)
+
+
+@router.get(
+    "/export.arrow",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {ARROW_STREAM: {}}, "description": "Stream Arrow IPC"},
+        406: {"description": "pyarrow no está instalado en el servidor"},
+    },
+)
+async def exportar_alumnos_arrow(fields: Optional[str] = CAMPOS_QUERY):
+    """Todos los alumnos como stream Apache Arrow IPC (para pandas, DuckDB, Polars)."""
+    campos = parsear_campos(fields, AlumnoResponse)
+    columnas = alumnos_service.COLUMNAS_ARROW
+    if campos:
+        columnas = {campo: columnas[campo] for campo in campos}
+    version, registros = await asincrono.alumnos.exportar_alumnos()
+    logger.info(f"Exportando {len(registros)} alumnos en Arrow (versión {version})")
+    return respuesta_arrow(registros, columnas, version, "alumnos")
+
+
+@router.get("/ranking", response_model=RankingResponse, status_code=status.HTTP_200_OK)
+async def ranking_por_promedio(
+    promedio: float = Query(..., ge=0.0, le=5.0, description="Promedio a ubicar en el ranking (0.0-5.0)"),
+):
+    """Posición y percentil que tendría un alumno con ese valor de promedio."""
+    return await asincrono.alumnos.ranking_por_promedio(promedio)
+
+
+@router.get("/{alumno_id}/ranking", response_model=RankingResponse, status_code=status.HTTP_200_OK)
+async def obtener_ranking_alumno(alumno_id: int):
+    """Posición y percentil de un alumno por promedio (1 = mayor)."""
+    return await asincrono.alumnos.obtener_ranking_alumno(alumno_id)
+
+
+@router.get("/{alumno_id}/historial", response_model=HistorialResponse, status_code=status.HTTP_200_OK)
+async def obtener_historial_alumno(alumno_id: int):
+    """Versiones conservadas de un alumno y los campos que cambió cada una."""
+    return await asincrono.alumnos.obtener_historial_alumno(alumno_id)
+
+
 @router.get("/{alumno_id}", response_model=AlumnoResponse, status_code=status.HTTP_200_OK)
-async def obtener_alumno(alumno_id: int):
+async def obtener_alumno(
+    alumno_id: int,
+    fields: Optional[str] = CAMPOS_QUERY,
+    formato: str = Depends(formato_respuesta),
+    as_of: Optional[datetime] = AS_OF_QUERY,
+):
     """Obtener un alumno por su ID."""
-    return alumnos_service.obtener_alumno_por_id(alumno_id)
+    campos = parsear_campos(fields, AlumnoResponse)
+    if as_of is not None:
+        registro = await asincrono.alumnos.obtener_registro_alumno_en(alumno_id, a_instante(as_of))
+        return respuesta_cruda(
+            registro, AlumnoResponse, campos or tuple(AlumnoResponse.model_fields), forma="item", formato=formato
+        )
+    if campos or formato == MSGPACK:
+        registro = await asincrono.alumnos.obtener_registro_alumno(alumno_id)
+        return respuesta_cruda(registro, AlumnoResponse, campos, forma="item", formato=formato)
+    return await asincrono.alumnos.obtener_alumno_por_id(alumno_id)
 
 
 @router.post("", response_model=AlumnoResponse, status_code=status.HTTP_201_CREATED)
@@ -38,7 +200,7 @@ async def crear_alumno(alumno: AlumnoCreate):
     """Crear un nuevo alumno."""
     try:
         logger.info(f"Creando alumno con matrícula {alumno.matricula}")
-        return alumnos_service.crear_alumno(alumno)
+        return await asincrono.alumnos.crear_alumno(alumno)
     except Exception as e:
         logger.error(f"Error al crear alumno: {str(e)}")
         raise
@@ -49,7 +211,7 @@ async def actualizar_alumno(alumno_id: int, alumno: AlumnoUpdate):
     """Actualizar un alumno existente."""
     try:
         logger.info(f"Actualizando alumno ID {alumno_id}")
-        return alumnos_service.actualizar_alumno(alumno_id, alumno)
+        return await asincrono.alumnos.actualizar_alumno(alumno_id, alumno)
     except Exception as e:
         logger.error(f"Error al actualizar alumno: {str(e)}")
         raise
@@ -60,7 +222,7 @@ async def eliminar_alumno(alumno_id: int):
     """Eliminar un alumno."""
     try:
         logger.info(f"Eliminando alumno ID {alumno_id}")
-        return alumnos_service.eliminar_alumno(alumno_id)
+        return await asincrono.alumnos.eliminar_alumno(alumno_id)
     except Exception as e:
         logger.error(f"Error al eliminar alumno: {str(e)}")
         raise
@@ -69,4 +231,4 @@ async def eliminar_alumno(alumno_id: int):
 @router.get("/stats/resumen", status_code=status.HTTP_200_OK)
 async def obtener_estadisticas_alumnos():
     """Obtener estadísticas de alumnos."""
-    return alumnos_service.obtener_estadisticas()
\ No newline at end of file
+    return await asincrono.alumnos.obtener_estadisticas()
\ No newline at end of file
@@ -0,0 +1,63 @@
+"""
+Rutas de diagnóstico de memoria (solo registradas con DEBUG_MEMORIA=1).
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, Query, status
+from starlette.concurrency import run_in_threadpool
+from app.services import memoria_service
+from app.utils.exceptions import NotFoundError
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def verificar_token(x_debug_token: Optional[str] = Header(None)):
+    """Exigir X-Debug-Token si DEBUG_MEMORIA_TOKEN está definido."""
+    if memoria_service.TOKEN and x_debug_token != memoria_service.TOKEN:
+        # 404 en lugar de 401/403 para no revelar que la ruta existe
+        raise NotFoundError("Recurso no encontrado", "Recurso no encontrado")
+
+
+router = APIRouter(dependencies=[Depends(verificar_token)])
+
+
+@router.get("", status_code=status.HTTP_200_OK)
+async def reporte_memoria():
+    """Bytes por almacén, por registro y por campo, y eficiencia de interning."""
+    return await run_in_threadpool(memoria_service.reporte_memoria)
+
+
+@router.post("/rastreo/iniciar", status_code=status.HTTP_200_OK)
+async def iniciar_rastreo(profundidad: int = Query(1, ge=1, le=25)):
+    """Iniciar el rastreo de asignaciones (tracemalloc)."""
+    return memoria_service.iniciar_rastreo(profundidad)
+
+
+@router.post("/rastreo/detener", status_code=status.HTTP_200_OK)
+async def detener_rastreo():
+    """Detener el rastreo y descartar los snapshots."""
+    return memoria_service.detener_rastreo()
+
+
+@router.get("/rastreo/rutas", status_code=status.HTTP_200_OK)
+async def top_sitios_por_ruta(limite: int = Query(10, ge=1, le=100)):
+    """Principales sitios de asignación agrupados por ruta."""
+    return memoria_service.top_sitios_por_ruta(limite)
+
+
+@router.post("/snapshots/{nombre}", status_code=status.HTTP_201_CREATED)
+async def tomar_snapshot(nombre: str):
+    """Tomar un snapshot con nombre para compararlo después."""
+    return await run_in_threadpool(memoria_service.tomar_snapshot, nombre)
+
+
+@router.get("/snapshots/{desde}/diff", status_code=status.HTTP_200_OK)
+async def diferencia_snapshots(
+    desde: str,
+    hasta: Optional[str] = Query(None, description="Snapshot final (default: ahora)"),
+    limite: int = Query(10, ge=1, le=100),
+):
+    """Diferencias de asignación entre dos snapshots."""
+    return await run_in_threadpool(memoria_service.diferencia_snapshots, desde, hasta, limite)
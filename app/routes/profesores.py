@@ -2,35 +2,202 @@
 Rutas (endpoints) para la entidad Profesor.
 """
 
-from fastapi import APIRouter, status, Query
-from typing import List
-from app.schemas.profesor_schema import ProfesorCreate, ProfesorUpdate, ProfesorResponse
-from app.services import profesores_service
+from datetime import datetime
+from fastapi import APIRouter, Depends, status, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from app.schemas.profesor_schema import (
+    ProfesorCreate,
+    ProfesorUpdate,
+    ProfesorResponse,
+    ProfesorLookup,
+    ProfesorLookupResponse,
+)
+from app.schemas.historial_schema import HistorialResponse
+from app.schemas.ranking_schema import RankingResponse
+from app.services import asincrono, profesores_service
+from app.utils.exceptions import ValidationError
+from app.utils.historial import a_instante
+from app.utils.validations import parsear_lista_csv
+from app.utils.proyeccion import parsear_campos
+from app.utils.exportacion import ARROW_STREAM, respuesta_arrow
+from app.utils.formatos import MSGPACK, RutaMsgpack, formato_respuesta, respuesta_cruda
 import logging
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(route_class=RutaMsgpack)
+
+CAMPOS_QUERY = Query(None, description="Campos a devolver separados por comas (ej: id,numeroEmpleado)")
+
+AS_OF_QUERY = Query(
+    None,
+    description=(
+        "Leer el estado en esa fecha (ISO 8601 o epoch; sin zona horaria = UTC). "
+        "410 si esa versión ya no se conserva"
+    ),
+)
+
+MAX_LOTE = 1000  # Máximo de identificadores por llamada de lote
 
 
 @router.get("", response_model=List[ProfesorResponse], status_code=status.HTTP_200_OK)
 async def listar_profesores(
     skip: int = Query(0, ge=0, description="Número de registros a saltar"),
     limit: int = Query(100, ge=1, le=1000, description="Número máximo de registros"),
+    fields: Optional[str] = CAMPOS_QUERY,
+    formato: str = Depends(formato_respuesta),
+    snapshot: bool = Query(False, description="Leer de una foto fija y devolver X-Cursor-Siguiente"),
+    cursor: Optional[str] = Query(None, description="Cursor de X-Cursor-Siguiente (ignora skip)"),
+    as_of: Optional[datetime] = AS_OF_QUERY,
 ):
     """Obtener lista de todos los profesores."""
     try:
-        profesores = profesores_service.obtener_todos_profesores()
+        campos = parsear_campos(fields, ProfesorResponse)
+        if as_of is not None:
+            registros = await asincrono.profesores.obtener_registros_profesores_en(a_instante(as_of), skip, limit)
+            return respuesta_cruda(
+                registros, ProfesorResponse, campos or tuple(ProfesorResponse.model_fields), formato=formato
+            )
+        if snapshot or cursor:
+            registros, siguiente = await asincrono.profesores.obtener_pagina_profesores(
+                cursor, skip, limit
+            )
+            respuesta = respuesta_cruda(
+                registros,
+                ProfesorResponse,
+                campos or tuple(ProfesorResponse.model_fields),
+                formato=formato,
+            )
+            if siguiente:
+                respuesta.headers["X-Cursor-Siguiente"] = siguiente
+            return respuesta
+        if campos or formato == MSGPACK:
+            registros = await asincrono.profesores.obtener_registros_profesores(skip, limit)
+            return respuesta_cruda(registros, ProfesorResponse, campos, formato=formato)
+        profesores = await asincrono.profesores.obtener_todos_profesores()
         return profesores[skip : skip + limit]
     except Exception as e:
         logger.error(f"Error al listar profesores: {str(e)}")
         raise
 
 
+@router.get("/lookup", response_model=ProfesorLookupResponse, status_code=status.HTTP_200_OK)
+async def buscar_profesores_lote(
+    ids: Optional[str] = Query(None, description="IDs separados por comas (ej: 1,2,3)"),
+    numerosEmpleado: Optional[str] = Query(None, description="Valores separados por comas"),
+    fields: Optional[str] = CAMPOS_QUERY,
+    formato: str = Depends(formato_respuesta),
+):
+    """Obtener varios profesores por id y/o número de empleado en una sola llamada."""
+    return await _resolver_lote(
+        parsear_lista_csv(ids, "ids", como_entero=True),
+        parsear_lista_csv(numerosEmpleado, "numerosEmpleado"),
+        fields,
+        formato,
+    )
+
+
+@router.post("/lookup", response_model=ProfesorLookupResponse, status_code=status.HTTP_200_OK)
+async def buscar_profesores_lote_post(
+    consulta: ProfesorLookup,
+    fields: Optional[str] = CAMPOS_QUERY,
+    formato: str = Depends(formato_respuesta),
+):
+    """Obtener varios profesores por id y/o número de empleado (lote en el cuerpo)."""
+    return await _resolver_lote(consulta.ids, consulta.numerosEmpleado, fields, formato)
+
+
+async def _resolver_lote(
+    ids: List[int], numeros_empleado: List[str], fields: Optional[str], formato: str
+):
+    if len(ids) + len(numeros_empleado) > MAX_LOTE:
+        raise ValidationError(
+            "Lote demasiado grande",
+            f"Se permiten como máximo {MAX_LOTE} identificadores por llamada",
+        )
+    campos = parsear_campos(fields, ProfesorResponse)
+    if campos or formato == MSGPACK:
+        resultado = await asincrono.profesores.resolver_lote_profesores(ids, numeros_empleado)
+        return respuesta_cruda(resultado, ProfesorResponse, campos, forma="lote", formato=formato)
+    return await asincrono.profesores.obtener_profesores_por_lote(ids, numeros_empleado)
+
+
+@router.get("/facetas", status_code=status.HTTP_200_OK)
+async def contar_facetas_profesores(
+    horasClase: Optional[str] = Query(None, description="Cargas separadas por comas (parcial, completo, sobrecarga)"),
+    inicial_apellido: Optional[str] = Query(None, description="Iniciales separadas por comas (ej: G,M)"),
+):
+    """Conteos por faceta (bitmaps) bajo la combinación de filtros dada."""
+    filtros = {
+        faceta: [v.upper() if faceta == "inicial_apellido" else v for v in valores]
+        for faceta, valores in (
+            ("horasClase", parsear_lista_csv(horasClase, "horasClase")),
+            ("inicial_apellido", parsear_lista_csv(inicial_apellido, "inicial_apellido")),
+        )
+        if valores
+    }
+    return await asincrono.profesores.contar_facetas(filtros)
+
+
+@router.get(
+    "/export.arrow",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {ARROW_STREAM: {}}, "description": "Stream Arrow IPC"},
+        406: {"description": "pyarrow no está instalado en el servidor"},
+    },
+)
+async def exportar_profesores_arrow(fields: Optional[str] = CAMPOS_QUERY):
+    """Todos los profesores como stream Apache Arrow IPC (para pandas, DuckDB, Polars)."""
+    campos = parsear_campos(fields, ProfesorResponse)
+    columnas = profesores_service.COLUMNAS_ARROW
+    if campos:
+        columnas = {campo: columnas[campo] for campo in campos}
+    version, registros = await asincrono.profesores.exportar_profesores()
+    logger.info(f"Exportando {len(registros)} profesores en Arrow (versión {version})")
+    return respuesta_arrow(registros, columnas, version, "profesores")
+
+
+@router.get("/ranking", response_model=RankingResponse, status_code=status.HTTP_200_OK)
+async def ranking_por_horas_clase(
+    horasClase: int = Query(..., ge=0, le=168, description="Horas de clase a ubicar en el ranking (0-168)"),
+):
+    """Posición y percentil que tendría un profesor con ese valor de horas de clase."""
+    return await asincrono.profesores.ranking_por_horas_clase(horasClase)
+
+
+@router.get("/{profesor_id}/ranking", response_model=RankingResponse, status_code=status.HTTP_200_OK)
+async def obtener_ranking_profesor(profesor_id: int):
+    """Posición y percentil de un profesor por horas de clase (1 = mayor)."""
+    return await asincrono.profesores.obtener_ranking_profesor(profesor_id)
+
+
+@router.get("/{profesor_id}/historial", response_model=HistorialResponse, status_code=status.HTTP_200_OK)
+async def obtener_historial_profesor(profesor_id: int):
+    """Versiones conservadas de un profesor y los campos que cambió cada una."""
+    return await asincrono.profesores.obtener_historial_profesor(profesor_id)
+
+
 @router.get("/{profesor_id}", response_model=ProfesorResponse, status_code=status.HTTP_200_OK)
-async def obtener_profesor(profesor_id: int):
+async def obtener_profesor(
+    profesor_id: int,
+    fields: Optional[str] = CAMPOS_QUERY,
+    formato: str = Depends(formato_respuesta),
+    as_of: Optional[datetime] = AS_OF_QUERY,
+):
     """Obtener un profesor por su ID."""
-    return profesores_service.obtener_profesor_por_id(profesor_id)
+    campos = parsear_campos(fields, ProfesorResponse)
+    if as_of is not None:
+        registro = await asincrono.profesores.obtener_registro_profesor_en(profesor_id, a_instante(as_of))
+        return respuesta_cruda(
+            registro, ProfesorResponse, campos or tuple(ProfesorResponse.model_fields), forma="item", formato=formato
+        )
+    if campos or formato == MSGPACK:
+        registro = await asincrono.profesores.obtener_registro_profesor(profesor_id)
+        return respuesta_cruda(registro, ProfesorResponse, campos, forma="item", formato=formato)
+    return await asincrono.profesores.obtener_profesor_por_id(profesor_id)
 
 
 @router.post("", response_model=ProfesorResponse, status_code=status.HTTP_201_CREATED)
@@ -38,7 +205,7 @@ async def crear_profesor(profesor: ProfesorCreate):
     """Crear un nuevo profesor."""
     try:
         logger.info(f"Creando profesor con número {profesor.numeroEmpleado}")
-        return profesores_service.crear_profesor(profesor)
+        return await asincrono.profesores.crear_profesor(profesor)
     except Exception as e:
         logger.error(f"Error al crear profesor: {str(e)}")
         raise
@@ -49,7 +216,7 @@ async def actualizar_profesor(profesor_id: int, profesor: ProfesorUpdate):
     """Actualizar un profesor existente."""
     try:
         logger.info(f"Actualizando profesor ID {profesor_id}")
-        return profesores_service.actualizar_profesor(profesor_id, profesor)
+        return await asincrono.profesores.actualizar_profesor(profesor_id, profesor)
     except Exception as e:
         logger.error(f"Error al actualizar profesor: {str(e)}")
         raise
@@ -60,7 +227,7 @@ async def eliminar_profesor(profesor_id: int):
     """Eliminar un profesor."""
     try:
         logger.info(f"Eliminando profesor ID {profesor_id}")
-        return profesores_service.eliminar_profesor(profesor_id)
+        return await asincrono.profesores.eliminar_profesor(profesor_id)
     except Exception as e:
         logger.error(f"Error al eliminar profesor: {str(e)}")
         raise
@@ -69,4 +236,4 @@ async def eliminar_profesor(profesor_id: int):
 @router.get("/stats/resumen", status_code=status.HTTP_200_OK)
 async def obtener_estadisticas_profesores():
     """Obtener estadísticas de profesores."""
-    return profesores_service.obtener_estadisticas()
\ No newline at end of file
+    return await asincrono.profesores.obtener_estadisticas()
\ No newline at end of file
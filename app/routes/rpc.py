@@ -0,0 +1,296 @@
+"""
+Endpoint WebSocket `/ws` con mensajes estilo JSON-RPC.
+
+Pensado para clientes de alta frecuencia (kioscos, integraciones) que hacen
+miles de lecturas y escrituras pequeñas: una sola conexión persistente, sin
+el costo por petición de HTTP, y con varias llamadas en vuelo a la vez.
+
+Mensajes (texto JSON; en frames binarios, MessagePack si está instalado y
+la respuesta vuelve en binario):
+
+    {"id": 1, "method": "alumnos.get", "params": {"id": 7}}
+    {"id": 1, "result": {...}}
+    {"id": 1, "error": {"code": 404, "message": "...", "detail": "..."}}
+
+    - `id` es del cliente (número o texto) y vuelve en la respuesta; sin
+      `id` la llamada es una notificación y no se responde.
+    - Las llamadas de frames distintos se atienden en paralelo y cada
+      respuesta se envía al terminar: pueden llegar en otro orden.
+    - Un frame con una lista de llamadas es un lote: se ejecutan en orden,
+      una tras otra, y se responde con un único frame con la lista de
+      respuestas. Sirve para encadenar escrituras que dependen entre sí.
+
+Métodos (`<entidad>` es alumnos o profesores):
+
+    <entidad>.get      {"id", "fields"?}
+    <entidad>.list     {"skip"?, "limit"?, "fields"?}
+    <entidad>.create   {"datos"}
+    <entidad>.update   {"id", "datos"}
+    <entidad>.delete   {"id"}
+    <entidad>.stats    {}
+
+Los errores de los servicios usan el código HTTP que devolvería la ruta REST
+(400, 404, 500); los del protocolo, los de JSON-RPC (-32700 frame ilegible,
+-32600 llamada mal formada, -32601 método desconocido).
+
+Contrapresión por conexión: como mucho WS_MAX_PENDIENTES frames en curso y
+WS_COLA_SALIDA respuestas esperando a enviarse. Si el cliente no lee las
+respuestas se llena la cola, las llamadas en curso no terminan, se agotan
+los cupos y el servidor deja de leer frames de esa conexión (la ventana TCP
+frena al cliente) sin afectar a las demás.
+
+Configuración por variables de entorno:
+    WS_MAX_PENDIENTES   Frames en curso por conexión (default 64)
+    WS_COLA_SALIDA      Respuestas pendientes de envío por conexión (default 64)
+    WS_MAX_LOTE         Llamadas por lote (default 1000)
+"""
+
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from pydantic import BaseModel, ValidationError as PydanticValidationError
+
+from app.schemas.alumno_schema import AlumnoCreate, AlumnoResponse, AlumnoUpdate
+from app.schemas.profesor_schema import ProfesorCreate, ProfesorResponse, ProfesorUpdate
+from app.services import asincrono
+from app.utils.exceptions import APIException, ValidationError
+from app.utils.formatos import msgpack
+from app.utils.proyeccion import parsear_campos
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+MAX_PENDIENTES = max(1, int(os.getenv("WS_MAX_PENDIENTES", "64")))
+COLA_SALIDA = max(1, int(os.getenv("WS_COLA_SALIDA", "64")))
+MAX_LOTE = max(1, int(os.getenv("WS_MAX_LOTE", "1000")))
+
+# Códigos de error del protocolo (JSON-RPC 2.0)
+FRAME_ILEGIBLE = -32700
+LLAMADA_INVALIDA = -32600
+METODO_DESCONOCIDO = -32601
+
+Metodo = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class _ErrorProtocolo(Exception):
+    def __init__(self, codigo: int, mensaje: str):
+        self.codigo = codigo
+        super().__init__(mensaje)
+
+
+def _error(codigo: int, mensaje: str, detalle: Any = None) -> Dict[str, Any]:
+    return {"code": codigo, "message": mensaje, "detail": detalle or mensaje}
+
+
+# ----------------------------------------------------------------------
+# Parámetros
+# ----------------------------------------------------------------------
+
+
+def _entero(params: Dict[str, Any], nombre: str, defecto: Optional[int] = None,
+            minimo: int = 0, maximo: Optional[int] = None) -> int:
+    valor = params.get(nombre, defecto)
+    if valor is None:
+        raise ValidationError(f"Parámetro requerido: {nombre}", f"Falta el parámetro {nombre}")
+    if not isinstance(valor, int) or isinstance(valor, bool) or valor < minimo or (
+        maximo is not None and valor > maximo
+    ):
+        rango = f"entre {minimo} y {maximo}" if maximo is not None else f"mayor o igual a {minimo}"
+        raise ValidationError(f"Parámetro inválido: {nombre}", f"{nombre} debe ser un entero {rango}")
+    return valor
+
+
+def _campos(params: Dict[str, Any], respuesta: type) -> Optional[Tuple[str, ...]]:
+    fields = params.get("fields")
+    if fields is not None and not isinstance(fields, str):
+        raise ValidationError(
+            "Parámetro inválido: fields",
+            'fields debe ser un texto con campos separados por comas (ej: "id,matricula")',
+        )
+    return parsear_campos(fields, respuesta)
+
+
+def _validar(modelo: type, params: Dict[str, Any]) -> BaseModel:
+    datos = params.get("datos")
+    if not isinstance(datos, dict):
+        raise ValidationError("Parámetro requerido: datos", "datos debe ser un objeto")
+    try:
+        return modelo.model_validate(datos)
+    except PydanticValidationError as e:
+        raise ValidationError(
+            "Los datos proporcionados no son válidos",
+            "; ".join(f"{' -> '.join(str(x) for x in err['loc'])}: {err['msg']}" for err in e.errors()),
+        )
+
+
+def _proyectar(registro: Dict[str, Any], campos: Optional[Tuple[str, ...]]) -> Dict[str, Any]:
+    return registro if not campos else {c: registro[c] for c in campos}
+
+
+# ----------------------------------------------------------------------
+# Métodos
+# ----------------------------------------------------------------------
+
+
+def _metodos_entidad(
+    servicio: asincrono.ServicioAsincrono,
+    singular: str,
+    plural: str,
+    crear: type,
+    actualizar: type,
+    respuesta: type,
+) -> Dict[str, Metodo]:
+    """Métodos `<plural>.*` sobre las mismas funciones de servicio que las rutas REST."""
+    obtener_registro = getattr(servicio, f"obtener_registro_{singular}")
+    obtener_registros = getattr(servicio, f"obtener_registros_{plural}")
+    crear_registro = getattr(servicio, f"crear_{singular}")
+    actualizar_registro = getattr(servicio, f"actualizar_{singular}")
+    eliminar_registro = getattr(servicio, f"eliminar_{singular}")
+
+    async def get(params: Dict[str, Any]) -> Any:
+        campos = _campos(params, respuesta)
+        return _proyectar(await obtener_registro(_entero(params, "id")), campos)
+
+    async def list_(params: Dict[str, Any]) -> Any:
+        campos = _campos(params, respuesta)
+        registros = await obtener_registros(
+            _entero(params, "skip", 0), _entero(params, "limit", 100, minimo=1, maximo=1000)
+        )
+        return [_proyectar(r, campos) for r in registros]
+
+    async def create(params: Dict[str, Any]) -> Any:
+        return (await crear_registro(_validar(crear, params))).model_dump()
+
+    async def update(params: Dict[str, Any]) -> Any:
+        registro_id = _entero(params, "id")
+        return (await actualizar_registro(registro_id, _validar(actualizar, params))).model_dump()
+
+    async def delete(params: Dict[str, Any]) -> Any:
+        return await eliminar_registro(_entero(params, "id"))
+
+    async def stats(_params: Dict[str, Any]) -> Any:
+        return await servicio.obtener_estadisticas()
+
+    operaciones = {"get": get, "list": list_, "create": create, "update": update, "delete": delete, "stats": stats}
+    return {f"{plural}.{nombre}": metodo for nombre, metodo in operaciones.items()}
+
+
+METODOS: Dict[str, Metodo] = {
+    **_metodos_entidad(asincrono.alumnos, "alumno", "alumnos", AlumnoCreate, AlumnoUpdate, AlumnoResponse),
+    **_metodos_entidad(
+        asincrono.profesores, "profesor", "profesores", ProfesorCreate, ProfesorUpdate, ProfesorResponse
+    ),
+}
+
+
+async def _llamar(llamada: Any) -> Optional[Dict[str, Any]]:
+    """Ejecutar una llamada; None si es una notificación (sin `id`)."""
+    if not isinstance(llamada, dict) or not isinstance(llamada.get("method"), str):
+        return {"id": None, "error": _error(LLAMADA_INVALIDA, "Llamada inválida: falta method")}
+    respuesta: Dict[str, Any] = {"id": llamada.get("id")}
+    metodo = METODOS.get(llamada["method"])
+    params = llamada.get("params")
+    if params is None:
+        params = {}
+    try:
+        if metodo is None:
+            raise _ErrorProtocolo(METODO_DESCONOCIDO, f"Método desconocido: {llamada['method']}")
+        if not isinstance(params, dict):
+            raise _ErrorProtocolo(LLAMADA_INVALIDA, "params debe ser un objeto")
+        respuesta["result"] = await metodo(params)
+    except _ErrorProtocolo as e:
+        respuesta["error"] = _error(e.codigo, str(e))
+    except APIException as e:
+        respuesta["error"] = _error(e.status_code, e.message, e.detail)
+    except Exception:
+        logger.exception(f"Error en la llamada {llamada['method']}")
+        respuesta["error"] = _error(500, "Error interno del servidor")
+    return respuesta if "id" in llamada else None
+
+
+async def atender_frame(datos: Any) -> Any:
+    """Respuesta a un frame ya decodificado (llamada o lote); None si no hay que responder."""
+    if not isinstance(datos, list):
+        return await _llamar(datos)
+    if not datos or len(datos) > MAX_LOTE:
+        return {
+            "id": None,
+            "error": _error(LLAMADA_INVALIDA, f"Un lote debe tener entre 1 y {MAX_LOTE} llamadas"),
+        }
+    respuestas = [await _llamar(llamada) for llamada in datos]
+    return [r for r in respuestas if r is not None] or None
+
+
+# ----------------------------------------------------------------------
+# Conexión
+# ----------------------------------------------------------------------
+
+
+def _decodificar(mensaje: Dict[str, Any]) -> Tuple[Any, bool]:
+    """(contenido, binario) de un mensaje ASGI websocket.receive."""
+    if mensaje.get("bytes") is not None:
+        if msgpack is None:
+            raise _ErrorProtocolo(FRAME_ILEGIBLE, "MessagePack no disponible en el servidor")
+        try:
+            return msgpack.unpackb(mensaje["bytes"]), True
+        except Exception:
+            raise _ErrorProtocolo(FRAME_ILEGIBLE, "Frame MessagePack ilegible")
+    try:
+        return json.loads(mensaje.get("text") or ""), False
+    except ValueError:
+        raise _ErrorProtocolo(FRAME_ILEGIBLE, "Frame JSON ilegible")
+
+
+async def _atender(mensaje: Dict[str, Any], salida: asyncio.Queue, cupos: asyncio.Semaphore) -> None:
+    try:
+        binario = mensaje.get("bytes") is not None
+        try:
+            datos, binario = _decodificar(mensaje)
+            respuesta = await atender_frame(datos)
+        except _ErrorProtocolo as e:
+            respuesta = {"id": None, "error": _error(e.codigo, str(e))}
+        if respuesta is not None:
+            await salida.put((respuesta, binario))
+    finally:
+        cupos.release()
+
+
+async def _escribir(websocket: WebSocket, salida: asyncio.Queue) -> None:
+    while True:
+        respuesta, binario = await salida.get()
+        if binario:
+            await websocket.send_bytes(msgpack.packb(respuesta))
+        else:
+            await websocket.send_text(json.dumps(respuesta, separators=(",", ":")))
+
+
+@router.websocket("/ws")
+async def rpc(websocket: WebSocket):
+    """Llamadas a los servicios sobre una conexión persistente (ver docstring del módulo)."""
+    await websocket.accept()
+    cupos = asyncio.Semaphore(MAX_PENDIENTES)
+    salida: asyncio.Queue = asyncio.Queue(COLA_SALIDA)
+    escritor = asyncio.create_task(_escribir(websocket, salida))
+    en_curso: set = set()
+    try:
+        while not escritor.done():
+            # Sin cupo no se lee el siguiente frame: contrapresión hacia el cliente
+            await cupos.acquire()
+            mensaje = await websocket.receive()
+            if mensaje["type"] == "websocket.disconnect":
+                break
+            tarea = asyncio.create_task(_atender(mensaje, salida, cupos))
+            en_curso.add(tarea)
+            tarea.add_done_callback(en_curso.discard)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        # Las escrituras ya enviadas al pool terminan igual; solo se descartan sus respuestas
+        for tarea in (*en_curso, escritor):
+            tarea.cancel()
+        await asyncio.gather(*en_curso, escritor, return_exceptions=True)
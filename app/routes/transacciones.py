@@ -0,0 +1,22 @@
+"""
+Rutas para transacciones multi-registro.
+"""
+
+from fastapi import APIRouter, status
+from app.schemas.transaccion_schema import TransaccionRequest, TransaccionResponse
+from app.services import asincrono, transacciones_service
+from app.utils.formatos import RutaMsgpack
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(route_class=RutaMsgpack)
+
+
+@router.post("", response_model=TransaccionResponse, status_code=status.HTTP_200_OK)
+async def ejecutar_transaccion(transaccion: TransaccionRequest):
+    """Aplicar varias operaciones de crear/actualizar/eliminar de forma atómica."""
+    logger.info(f"Transacción con {len(transaccion.operaciones)} operaciones")
+    return await asincrono.ejecutar_bloqueante(
+        transacciones_service.ejecutar_transaccion, transaccion.operaciones
+    )
@@ -2,55 +2,39 @@
 Schemas para Alumno - AJUSTADO PARA TESTS JAVA
 """
 
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+from app.schemas import tipos
+from app.schemas.tipos import Nombre
+
+Promedio = tipos.promedio(
+    nulo="Promedio no puede ser null",
+    invalido="Promedio debe ser un número válido",
+    rango="Promedio debe estar entre 0.0 y 5.0",
+)
+PromedioCambio = tipos.promedio(
+    nulo="No puede ser null",
+    invalido="Debe ser un número válido",
+    rango="Debe estar entre 0.0 y 5.0",
+)
+Matricula = tipos.matricula(
+    nulo="Matrícula no puede ser null",
+    decimal="Matrícula no puede ser un número decimal",
+    vacio="Matrícula debe ser un string no vacío",
+)
+MatriculaCambio = tipos.matricula(
+    nulo="No puede ser null",
+    decimal="Matrícula no puede ser un número decimal",
+    vacio="Debe ser string no vacío",
+)
 
 
 class AlumnoBase(BaseModel):
-    nombres: str = Field(..., min_length=1, max_length=100, example="Juan")
-    apellidos: str = Field(..., min_length=1, max_length=100, example="García")
-    matricula: str = Field(..., min_length=1, max_length=50, example="A123456")
-    promedio: float = Field(..., ge=0.0, le=5.0, example=4.25)
-
-    @field_validator("nombres", "apellidos", mode="before")
-    @classmethod
-    def validar_no_vacio(cls, v: str) -> str:
-        if v is None:
-            raise ValueError("No puede ser null")
-        if isinstance(v, str):
-            v = v.strip()
-            if not v:
-                raise ValueError("No puede estar vacío")
-        return v
-
-    @field_validator("promedio", mode="before")
-    @classmethod
-    def validar_promedio(cls, v) -> float:
-        if v is None:
-            raise ValueError("Promedio no puede ser null")
-        try:
-            val = float(v)
-        except (TypeError, ValueError):
-            raise ValueError("Promedio debe ser un número válido")
-        
-        if val < 0.0 or val > 5.0:
-            raise ValueError("Promedio debe estar entre 0.0 y 5.0")
-        return val
-
-    @field_validator("matricula", mode="before")
-    @classmethod
-    def validar_matricula(cls, v) -> str:
-        if v is None:
-            raise ValueError("Matrícula no puede ser null")
-        # Rechazar floats/doubles (valores como -1.223)
-        if isinstance(v, float):
-            raise ValueError("Matrícula no puede ser un número decimal")
-        # Convertir int a string si es necesario
-        if isinstance(v, int):
-            v = str(v)
-        if not isinstance(v, str) or not v.strip():
-            raise ValueError("Matrícula debe ser un string no vacío")
-        return v.strip()
+    nombres: Nombre = Field(..., example="Juan")
+    apellidos: Nombre = Field(..., example="García")
+    matricula: Matricula = Field(..., example="A123456")
+    promedio: Promedio = Field(..., example=4.25)
 
 
 class AlumnoCreate(AlumnoBase):
@@ -60,53 +44,25 @@ class AlumnoCreate(AlumnoBase):
 
 class AlumnoUpdate(BaseModel):
     """Schema para actualizar alumno"""
-    nombres: Optional[str] = Field(None, min_length=1, max_length=100)
-    apellidos: Optional[str] = Field(None, min_length=1, max_length=100)
-    matricula: Optional[str] = Field(None, min_length=1, max_length=50)
-    promedio: Optional[float] = Field(None, ge=0.0, le=5.0)
+    # Campo omitido = sin cambio; null explícito se rechaza con "No puede ser null"
+    nombres: Nombre = None
+    apellidos: Nombre = None
+    matricula: MatriculaCambio = None
+    promedio: PromedioCambio = None
 
-    @field_validator("nombres", "apellidos", mode="before")
-    @classmethod
-    def validar_no_vacio(cls, v):
-        if v is None:
-            raise ValueError("No puede ser null")
-        if isinstance(v, str):
-            v = v.strip()
-            if not v:
-                raise ValueError("No puede estar vacío")
-        return v
 
-    @field_validator("promedio", mode="before")
-    @classmethod
-    def validar_promedio(cls, v):
-        if v is None:
-            raise ValueError("No puede ser null")
-        try:
-            val = float(v)
-        except (TypeError, ValueError):
-            raise ValueError("Debe ser un número válido")
-        
-        if val < 0.0 or val > 5.0:
-            raise ValueError("Debe estar entre 0.0 y 5.0")
-        return val
+class AlumnoResponse(AlumnoBase):
+    id: int = Field(..., example=1)
 
-    @field_validator("matricula", mode="before")
-    @classmethod
-    def validar_matricula(cls, v):
-        if v is None:
-            raise ValueError("No puede ser null")
-        # Rechazar floats/doubles
-        if isinstance(v, float):
-            raise ValueError("Matrícula no puede ser un número decimal")
-        # Convertir int a string
-        if isinstance(v, int):
-            v = str(v)
-        if not isinstance(v, str) or not v.strip():
-            raise ValueError("Debe ser string no vacío")
-        return v.strip()
+    model_config = {"from_attributes": True}
 
+class AlumnoLookup(BaseModel):
+    """Schema para resolver un lote de alumnos por id y/o matrícula"""
+    ids: List[int] = Field(default_factory=list, max_length=1000)
+    matriculas: List[str] = Field(default_factory=list, max_length=1000)
 
-class AlumnoResponse(AlumnoBase):
-    id: int = Field(..., example=1)
 
-    model_config = {"from_attributes": True}
\ No newline at end of file
+class AlumnoLookupResponse(BaseModel):
+    encontrados: List[AlumnoResponse]
+    ids_faltantes: List[int]
+    matriculas_faltantes: List[str]
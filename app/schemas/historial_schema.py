@@ -0,0 +1,21 @@
+"""
+Schemas para el historial de versiones (GET /alumnos/{id}/historial, GET /profesores/{id}/historial)
+"""
+
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal
+
+
+class VersionHistorial(BaseModel):
+    version: int = Field(..., example=3)
+    fecha: datetime
+    operacion: Literal["crear", "actualizar", "eliminar"]
+    cambios: Dict[str, Any] = Field(
+        ..., description="Campos que cambiaron (el registro completo en un alta, vacío en una baja)"
+    )
+
+
+class HistorialResponse(BaseModel):
+    id: int
+    versiones: List[VersionHistorial]
@@ -0,0 +1,21 @@
+"""
+Schemas para el ranking (GET /alumnos/ranking, GET /alumnos/{id}/ranking y sus equivalentes de profesores)
+"""
+
+from pydantic import BaseModel, Field
+from typing import Optional, Union
+
+
+class RankingResponse(BaseModel):
+    id: Optional[int] = Field(None, description="Registro consultado (null al consultar por valor)")
+    campo: str = Field(..., example="promedio")
+    valor: Union[int, float] = Field(
+        ..., example=4.25, description="Entero para horasClase, real para promedio"
+    )
+    posicion: int = Field(..., example=12, description="1 = mayor valor; los empatados comparten posición")
+    total: int = Field(..., example=480)
+    empatados: int = Field(..., example=3, description="Otros registros con el mismo valor")
+    percentil: float = Field(
+        ..., example=97.6, description="Porcentaje por debajo más la mitad de los empatados"
+    )
+    top: float = Field(..., example=2.5, description="Está en el top X% (posicion / total)")
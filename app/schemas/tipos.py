@@ -0,0 +1,226 @@
+"""
+Tipos anotados compartidos por los schemas de Alumno y Profesor.
+
+Cada tipo es una cadena de pasos de pydantic-core (chain_schema) que se
+valida entero en el núcleo compilado, sin validadores Python por campo. Cada
+paso que puede fallar va envuelto en un error propio con el mensaje de
+siempre ("Value error, ..."), así que las respuestas 400 no cambian. Los
+tipos se parametrizan con sus mensajes porque Create y Update usan textos
+distintos para el mismo campo.
+
+Solo las conversiones poco comunes pasan por Python dentro del núcleo: texto
+a número en promedio/horasClase (float()/int() de Python, que aceptan más
+formatos que pydantic) y valores que no son texto ni número en
+matricula/numeroEmpleado (str()).
+"""
+
+from dataclasses import dataclass, field
+from typing import Annotated, Any, Dict
+
+from pydantic import GetCoreSchemaHandler, GetJsonSchemaHandler
+from pydantic_core import CoreSchema, core_schema as cs
+
+MENOS_INFINITO = float("-inf")
+
+
+@dataclass(frozen=True)
+class Esquema:
+    """Metadato de Annotated que fija el core schema y el JSON schema del tipo."""
+
+    core: CoreSchema
+    json: Dict[str, Any] = field(default_factory=dict)
+
+    def __get_pydantic_core_schema__(self, _tipo: Any, _handler: GetCoreSchemaHandler) -> CoreSchema:
+        return self.core
+
+    def __get_pydantic_json_schema__(self, _core: CoreSchema, _handler: GetJsonSchemaHandler):
+        return dict(self.json)
+
+
+def _error(schema: CoreSchema, mensaje: str) -> CoreSchema:
+    """Si `schema` falla, un único value_error con `mensaje`."""
+    return cs.custom_error_schema(schema, "value_error", custom_error_context={"error": mensaje})
+
+
+def _primero(*opciones: CoreSchema) -> CoreSchema:
+    """La primera opción que valide (ordenadas de la más a la menos frecuente)."""
+    return cs.union_schema(list(opciones), mode="left_to_right")
+
+
+_STR = cs.str_schema(strict=True)
+_INT = cs.int_schema(strict=True)
+_FLOAT = cs.float_schema(strict=True)
+_BOOL = cs.bool_schema(strict=True)
+
+# Equivalente JSON de cada isinstance (bool es subclase de int; el entero va
+# antes que el float para que 5 no se convierta en 5.0)
+_JSON_DE_TIPO = {str: _STR, int: _primero(_INT, _BOOL), float: _FLOAT}
+
+
+def _de_tipo(*tipos: type) -> CoreSchema:
+    """
+    Acepta sin convertir las instancias de `tipos`: un solo isinstance desde
+    Python y, desde JSON (model_validate_json, donde isinstance siempre
+    falla), los valores JSON de esos tipos.
+    """
+    return cs.json_or_python_schema(
+        json_schema=_primero(*(_JSON_DE_TIPO[tipo] for tipo in tipos)),
+        python_schema=cs.is_instance_schema(tipos),
+    )
+
+
+def texto(max_length: int, nulo: str = "No puede ser null", vacio: str = "No puede estar vacío"):
+    """Texto recortado y no vacío (nombres, apellidos)."""
+    return Annotated[
+        str,
+        Esquema(
+            cs.chain_schema(
+                [
+                    cs.nullable_schema(cs.str_schema(strip_whitespace=True, max_length=max_length)),
+                    _error(_STR, nulo),
+                    _error(cs.str_schema(min_length=1), vacio),
+                ]
+            ),
+            {"type": "string", "minLength": 1, "maxLength": max_length},
+        ),
+    ]
+
+
+def promedio(nulo: str, invalido: str, rango: str, minimo: float = 0.0, maximo: float = 5.0):
+    """Número real en [minimo, maximo]; acepta enteros, booleanos y texto numérico."""
+    return Annotated[
+        float,
+        Esquema(
+            cs.chain_schema(
+                [
+                    cs.nullable_schema(
+                        _error(
+                            _primero(
+                                # Igual que float() salvo dígitos no ASCII ("４.５")
+                                cs.float_schema(),
+                                cs.chain_schema([_STR, cs.no_info_plain_validator_function(float)]),
+                            ),
+                            invalido,
+                        )
+                    ),
+                    _error(_FLOAT, nulo),
+                    # NaN no es un número fuera de rango: falla la cota superior
+                    cs.custom_error_schema(
+                        cs.float_schema(ge=MENOS_INFINITO),
+                        "less_than_equal",
+                        custom_error_context={"le": maximo},
+                    ),
+                    _error(cs.float_schema(ge=minimo, le=maximo), rango),
+                ]
+            ),
+            {"type": "number", "minimum": minimo, "maximum": maximo},
+        ),
+    ]
+
+
+def horas(nulo: str, rango: str, entero: str, minimo: int = 0, maximo: int = 168):
+    """
+    Entero en [minimo, maximo]. Un float se compara con el rango antes de
+    exigir que sea entero (-1.5 es "fuera de rango", 2.5 "no es entero").
+    """
+    return Annotated[
+        int,
+        Esquema(
+            cs.chain_schema(
+                [
+                    cs.nullable_schema(
+                        _error(
+                            _primero(
+                                _INT,
+                                _FLOAT,
+                                cs.chain_schema([_BOOL, cs.int_schema()]),
+                                # int() de Python: pydantic aceptaría además "12.0"
+                                cs.chain_schema([_STR, cs.no_info_plain_validator_function(int)]),
+                            ),
+                            entero,
+                        )
+                    ),
+                    _error(_de_tipo(int, float), nulo),
+                    _error(
+                        _primero(_INT, cs.float_schema(strict=True, ge=MENOS_INFINITO)),
+                        "cannot convert float NaN to integer",
+                    ),
+                    _error(
+                        _primero(
+                            cs.int_schema(strict=True, ge=minimo, le=maximo),
+                            cs.float_schema(strict=True, ge=minimo, le=maximo),
+                        ),
+                        rango,
+                    ),
+                    _error(cs.int_schema(), entero),
+                ]
+            ),
+            {"type": "integer", "minimum": minimo, "maximum": maximo},
+        ),
+    ]
+
+
+def matricula(nulo: str, decimal: str, vacio: str, max_length: int = 50):
+    """Texto no vacío; un entero se convierte a texto y un decimal se rechaza."""
+    return Annotated[
+        str,
+        Esquema(
+            cs.chain_schema(
+                [
+                    cs.nullable_schema(_error(_de_tipo(str, int, float), vacio)),
+                    _error(_de_tipo(str, int, float), nulo),
+                    _error(_de_tipo(str, int), decimal),
+                    _primero(
+                        cs.str_schema(strict=True, strip_whitespace=True),
+                        cs.str_schema(coerce_numbers_to_str=True),  # enteros
+                        cs.chain_schema([_BOOL, cs.no_info_plain_validator_function(str)]),  # "True"
+                    ),
+                    _error(cs.str_schema(min_length=1), vacio),
+                    cs.str_schema(max_length=max_length),
+                ]
+            ),
+            {"type": "string", "minLength": 1, "maxLength": max_length},
+        ),
+    ]
+
+
+def numero_empleado(nulo: str, negativo: str, invalido: str, max_length: int = 20):
+    """
+    Texto que no empieza con "-"; un número se convierte a texto y uno
+    negativo se rechaza con su propio mensaje.
+    """
+    return Annotated[
+        str,
+        Esquema(
+            cs.chain_schema(
+                [
+                    cs.nullable_schema(
+                        _primero(
+                            _STR,
+                            _INT,
+                            # NaN no es negativo: sigue como texto ("nan")
+                            cs.float_schema(strict=True, ge=MENOS_INFINITO),
+                            cs.no_info_plain_validator_function(str),
+                        )
+                    ),
+                    _error(_de_tipo(str, int, float), nulo),
+                    _error(
+                        _primero(_STR, cs.int_schema(strict=True, ge=0), cs.float_schema(strict=True, ge=0)),
+                        negativo,
+                    ),
+                    _primero(
+                        cs.str_schema(strict=True, strip_whitespace=True),
+                        cs.chain_schema([_INT, cs.str_schema(coerce_numbers_to_str=True)]),
+                        cs.chain_schema([cs.no_info_plain_validator_function(str), cs.str_schema(strip_whitespace=True)]),
+                    ),
+                    _error(cs.str_schema(min_length=1, pattern=r"^[^-]"), invalido),
+                    cs.str_schema(max_length=max_length),
+                ]
+            ),
+            {"type": "string", "minLength": 1, "maxLength": max_length},
+        ),
+    ]
+
+
+# Nombres y apellidos: mismos mensajes en Create y Update
+Nombre = texto(100)
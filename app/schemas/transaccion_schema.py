@@ -0,0 +1,41 @@
+"""
+Schemas para transacciones multi-registro (POST /transacciones)
+"""
+
+from pydantic import BaseModel, Field, model_validator
+from typing import Any, Dict, List, Literal, Optional
+
+MAX_OPERACIONES = 1000
+
+
+class Operacion(BaseModel):
+    """Una operación de la transacción sobre alumnos o profesores"""
+    entidad: Literal["alumnos", "profesores"]
+    op: Literal["crear", "actualizar", "eliminar"]
+    id: Optional[int] = Field(None, description="Obligatorio para actualizar y eliminar")
+    datos: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="Campos de AlumnoCreate/ProfesorCreate (crear) o de *Update (actualizar)",
+    )
+
+    @model_validator(mode="after")
+    def validar_id(self):
+        if self.op != "crear" and self.id is None:
+            raise ValueError(f"id es obligatorio para {self.op}")
+        return self
+
+
+class TransaccionRequest(BaseModel):
+    operaciones: List[Operacion] = Field(..., min_length=1, max_length=MAX_OPERACIONES)
+
+
+class ResultadoOperacion(BaseModel):
+    entidad: str
+    op: str
+    id: int
+    registro: Optional[Dict[str, Any]] = Field(None, description="Estado tras la operación")
+
+
+class TransaccionResponse(BaseModel):
+    resultados: List[ResultadoOperacion]
+    versiones: Dict[str, int] = Field(..., description="Versión de cada almacén tras confirmar")
@@ -1,5 +1,5 @@
 """Paquete de servicios."""
 
-from app.services import alumnos_service, profesores_service
+from app.services import alumnos_service, profesores_service, mantenimiento_service
 
-__all__ = ["alumnos_service", "profesores_service"]
\ No newline at end of file
+__all__ = ["alumnos_service", "profesores_service", "mantenimiento_service"]
\ No newline at end of file
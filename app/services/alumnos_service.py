@@ -2,49 +2,78 @@
 Servicio CRUD para Alumnos - AJUSTADO PARA TESTS
 """
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Sequence, Tuple
 from app.schemas.alumno_schema import AlumnoCreate, AlumnoUpdate, AlumnoResponse
-from app.utils.exceptions import ValidationError, NotFoundError
+from app.utils.exceptions import APIException, ValidationError, NotFoundError, GoneError
+from app.utils.concurrencia import MODO_CONCURRENTE
+from app.utils.almacen import Almacen, Conflicto, CursorInvalido, ErrorAlmacen
+from app.utils.facetas import IndiceFacetas, bandas, inicial
+from app.utils.historial import Historial, VersionNoConservada, a_fecha
+from app.utils.ranking import IndiceRanking
 import logging
 
 logger = logging.getLogger(__name__)
 
-alumnos_db: List[Dict[str, Any]] = []
-_next_alumno_id: int = 1
+# Campos de cada registro, en orden (ver cargar_registros)
+CAMPOS = ("id", "nombres", "apellidos", "matricula", "promedio")
 
+# Tipos de columna del export Arrow (ver app.utils.exportacion)
+COLUMNAS_ARROW = {
+    "id": "int64",
+    "nombres": "string",
+    "apellidos": "string",
+    "matricula": "string",
+    "promedio": "float64",
+}
 
-def _obtener_siguiente_id() -> int:
-    global _next_alumno_id
-    id_actual = _next_alumno_id
-    _next_alumno_id += 1
-    return id_actual
+# Las escrituras de este módulo son seguras entre hilos (ver app.services.asincrono)
+ESCRITURA_CONCURRENTE = MODO_CONCURRENTE
 
+# Facetas para /alumnos/facetas: banda de promedio e inicial del apellido
+BANDAS_PROMEDIO = ["0-1", "1-2", "2-3", "3-4", "4-5"]
+_facetas = IndiceFacetas(
+    {
+        "promedio": bandas("promedio", [1.0, 2.0, 3.0, 4.0], BANDAS_PROMEDIO),
+        "inicial_apellido": inicial("apellidos"),
+    },
+    valores_fijos={"promedio": BANDAS_PROMEDIO},
+)
 
-def _matricula_existe(matricula: str, excluir_id: Optional[int] = None) -> bool:
-    for alumno in alumnos_db:
-        if alumno["matricula"] == matricula:
-            if excluir_id is None or alumno["id"] != excluir_id:
-                return True
-    return False
+# Historial de versiones por registro para lecturas as_of (ver app.utils.historial)
+_historial = Historial()
 
+# Posición y percentil por promedio en O(log n) (ver app.utils.ranking)
+_ranking = IndiceRanking("promedio", 0.0, 5.0, resolucion=0.001)
 
-def _id_existe(id: int) -> bool:
-    for alumno in alumnos_db:
-        if alumno["id"] == id:
-            return True
-    return False
+# Almacén versionado (ver app.utils.almacen): índices O(1) por id y por
+# matrícula con reserva atómica de claves, registros copy-on-write y fotos por
+# versión para lecturas aisladas. Las lecturas no toman candado. Las facetas,
+# el historial y el ranking se notifican en cada escritura.
+almacen = Almacen("matricula", indices_secundarios=[_facetas, _historial, _ranking])
+alumnos_db: Sequence[Dict[str, Any]] = almacen.registros
+_alumnos_por_id = almacen.por_id
+_alumnos_por_matricula = almacen.por_clave
+
+
+def _construir_lista() -> List[AlumnoResponse]:
+    return [AlumnoResponse(**alumno) for alumno in alumnos_db]
 
 
 def obtener_todos_alumnos() -> List[AlumnoResponse]:
     logger.info(f"Obteniendo {len(alumnos_db)} alumnos")
-    return [AlumnoResponse(**alumno) for alumno in alumnos_db]
+    return almacen.desde_cache("lista", _construir_lista)
+
+
+def precalentar_lista() -> int:
+    """Construir (si hace falta) la lista de respuestas cacheada; devuelve su tamaño."""
+    return len(almacen.desde_cache("lista", _construir_lista))
 
 
 def obtener_alumno_por_id(alumno_id: int) -> AlumnoResponse:
-    for alumno in alumnos_db:
-        if alumno["id"] == alumno_id:
-            logger.info(f"Alumno encontrado: ID {alumno_id}")
-            return AlumnoResponse(**alumno)
+    alumno = _alumnos_por_id.get(alumno_id)
+    if alumno is not None:
+        logger.info(f"Alumno encontrado: ID {alumno_id}")
+        return AlumnoResponse(**alumno)
     
     logger.warning(f"Alumno no encontrado: ID {alumno_id}")
     raise NotFoundError(
@@ -53,93 +82,283 @@ def obtener_alumno_por_id(alumno_id: int) -> AlumnoResponse:
     )
 
 
-def crear_alumno(alumno_data: AlumnoCreate) -> AlumnoResponse:
-    # Si el test envía id, usarlo; si no, generar uno
-    if alumno_data.id is not None:
-        if _id_existe(alumno_data.id):
-            raise ValidationError(
-                f"ID {alumno_data.id} ya existe",
-                "El ID debe ser único",
-            )
-        nuevo_id = alumno_data.id
-    else:
-        nuevo_id = _obtener_siguiente_id()
-
-    # Validar unicidad de matrícula
-    if _matricula_existe(alumno_data.matricula):
-        logger.error(f"Matrícula duplicada: {alumno_data.matricula}")
-        raise ValidationError(
-            f"Matrícula {alumno_data.matricula} ya está registrada",
-            "La matrícula debe ser única",
+def obtener_registros_alumnos(skip: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Devolver los registros crudos del almacén (sin construir modelos).
+
+    Pensado para rutas que serializan directamente (p. ej. proyecciones);
+    los dicts devueltos son de solo lectura para el llamador.
+    """
+    fin = None if limit is None else skip + limit
+    return alumnos_db[skip:fin]
+
+
+def obtener_pagina_alumnos(
+    cursor: Optional[str] = None, skip: int = 0, limit: int = 100
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Página de registros crudos leída de una foto fija del almacén.
+
+    Devuelve también el cursor de la página siguiente (None al final): con
+    él se sigue leyendo la misma versión aunque haya escrituras entre páginas.
+    """
+    try:
+        return almacen.pagina(cursor, skip, limit)
+    except CursorInvalido as e:
+        raise ValidationError("Cursor inválido o expirado", str(e))
+
+
+def obtener_registro_alumno(alumno_id: int) -> Dict[str, Any]:
+    """Devolver el registro crudo de un alumno o lanzar NotFoundError."""
+    alumno = _alumnos_por_id.get(alumno_id)
+    if alumno is None:
+        logger.warning(f"Alumno no encontrado: ID {alumno_id}")
+        raise NotFoundError(
+            f"Alumno con ID {alumno_id} no existe",
+            f"No se encontró alumno con el identificador {alumno_id}",
         )
-    
+    return alumno
+
+
+def obtener_historial_alumno(alumno_id: int) -> Dict[str, Any]:
+    """Versiones conservadas de un alumno (también si ya fue eliminado)."""
+    versiones = _historial.versiones(alumno_id)
+    if versiones is None:
+        raise _no_encontrado(
+            alumno_id, f"No hay historial del alumno con el identificador {alumno_id}"
+        )
+    return {"id": alumno_id, "versiones": versiones}
+
+
+def obtener_registro_alumno_en(alumno_id: int, instante: float) -> Dict[str, Any]:
+    """
+    Registro crudo de un alumno tal como estaba en `instante` (epoch).
+
+    NotFoundError si no existía entonces; GoneError si existía pero esa
+    versión ya no se conserva.
+    """
+    try:
+        alumno = _historial.estado_en(alumno_id, instante)
+    except VersionNoConservada as e:
+        raise _no_conservada(e)
+    if alumno is None:
+        raise _no_encontrado(
+            alumno_id,
+            f"El alumno con el identificador {alumno_id} no existía en {a_fecha(instante)}",
+        )
+    return alumno
+
+
+def obtener_registros_alumnos_en(
+    instante: float, skip: int = 0, limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Registros crudos de los alumnos que existían en `instante` (epoch) o GoneError."""
+    try:
+        return _historial.registros_en(instante, skip, limit)
+    except VersionNoConservada as e:
+        raise _no_conservada(e)
+
+
+def obtener_ranking_alumno(alumno_id: int) -> Dict[str, Any]:
+    """Posición y percentil de un alumno por promedio o NotFoundError."""
+    ranking = _ranking.posicion_de(alumno_id)
+    if ranking is None:
+        raise _no_encontrado(alumno_id, f"No se encontró alumno con el identificador {alumno_id}")
+    return ranking
+
+
+def ranking_por_promedio(valor: float) -> Dict[str, Any]:
+    """Posición y percentil que tendría un alumno con ese valor de promedio."""
+    return _ranking.posicion_para(valor)
+
+
+def exportar_alumnos() -> Tuple[int, Tuple[Dict[str, Any], ...]]:
+    """Foto fija de todos los registros para exportar: (versión, registros crudos)."""
+    return almacen.snapshot()
+
+
+def purgar_historial() -> int:
+    """Compactar el historial fuera de la ventana de retención (tarea de mantenimiento)."""
+    return _historial.purgar()
+
+
+def resolver_lote_alumnos(
+    ids: Optional[List[int]] = None,
+    matriculas: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Resolver un lote de ids y/o matrículas en una sola pasada.
+
+    Los encontrados (registros crudos) se devuelven en el orden de la
+    petición (primero ids, luego matrículas) sin repetir registros; los
+    faltantes se reportan por separado en lugar de lanzar NotFoundError.
+    """
+    encontrados: List[Dict[str, Any]] = []
+    vistos: set = set()
+    ids_faltantes: List[int] = []
+    matriculas_faltantes: List[str] = []
+
+    for alumno_id in ids or []:
+        alumno = _alumnos_por_id.get(alumno_id)
+        if alumno is None:
+            ids_faltantes.append(alumno_id)
+        elif alumno["id"] not in vistos:
+            vistos.add(alumno["id"])
+            encontrados.append(alumno)
+
+    for matricula in matriculas or []:
+        alumno = _alumnos_por_matricula.get(matricula)
+        if alumno is None:
+            matriculas_faltantes.append(matricula)
+        elif alumno["id"] not in vistos:
+            vistos.add(alumno["id"])
+            encontrados.append(alumno)
+
+    logger.info(
+        f"Lote de alumnos: {len(encontrados)} encontrados, "
+        f"{len(ids_faltantes) + len(matriculas_faltantes)} faltantes"
+    )
+    return {
+        "encontrados": encontrados,
+        "ids_faltantes": ids_faltantes,
+        "matriculas_faltantes": matriculas_faltantes,
+    }
+
+
+def obtener_alumnos_por_lote(
+    ids: Optional[List[int]] = None,
+    matriculas: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """Igual que resolver_lote_alumnos, pero con modelos AlumnoResponse."""
+    resultado = resolver_lote_alumnos(ids, matriculas)
+    resultado["encontrados"] = [AlumnoResponse(**r) for r in resultado["encontrados"]]
+    return resultado
+
+
+def _no_conservada(error: VersionNoConservada) -> GoneError:
+    logger.warning(f"Versión no conservada: alumno ID {error.registro_id}")
+    return GoneError(
+        f"La versión del alumno con ID {error.registro_id} en {a_fecha(error.instante)} ya no se conserva",
+        "El historial de esa fecha se descartó (HISTORIAL_MAX_VERSIONES / HISTORIAL_RETENCION_SEGUNDOS)",
+    )
+
+
+def _no_encontrado(alumno_id: int, detalle: str) -> NotFoundError:
+    logger.warning(f"Alumno no encontrado: ID {alumno_id}")
+    return NotFoundError(f"Alumno con ID {alumno_id} no existe", detalle)
+
+
+def _matricula_duplicada(matricula: str) -> ValidationError:
+    logger.error(f"Matrícula duplicada: {matricula}")
+    return ValidationError(
+        f"Matrícula {matricula} ya está registrada",
+        "La matrícula debe ser única",
+    )
+
+
+def error_de_almacen(error: ErrorAlmacen, operacion: str = "crear") -> APIException:
+    """Traducir un error del almacén a la excepción HTTP de este servicio."""
+    if isinstance(error, Conflicto):
+        if error.campo == "id":
+            return ValidationError(f"ID {error.valor} ya existe", "El ID debe ser único")
+        return _matricula_duplicada(error.valor)
+    return _no_encontrado(error.registro_id, f"No se puede {operacion} un alumno inexistente")
+
+
+def crear_alumno(alumno_data: AlumnoCreate) -> AlumnoResponse:
+    # Si el test envía id, usarlo; si no, el almacén genera uno
     nuevo_alumno = {
-        "id": nuevo_id,
+        "id": alumno_data.id,
         "nombres": alumno_data.nombres,
         "apellidos": alumno_data.apellidos,
         "matricula": alumno_data.matricula,
         "promedio": alumno_data.promedio,
     }
-    
-    alumnos_db.append(nuevo_alumno)
-    logger.info(f"Alumno creado: ID {nuevo_id}, matrícula {alumno_data.matricula}")
+    try:
+        almacen.crear(nuevo_alumno)
+    except ErrorAlmacen as e:
+        raise error_de_almacen(e)
+    logger.info(f"Alumno creado: ID {nuevo_alumno['id']}, matrícula {alumno_data.matricula}")
     
     return AlumnoResponse(**nuevo_alumno)
 
 
 def actualizar_alumno(alumno_id: int, alumno_data: AlumnoUpdate) -> AlumnoResponse:
-    alumno = None
-    for a in alumnos_db:
-        if a["id"] == alumno_id:
-            alumno = a
-            break
-    
-    if alumno is None:
-        logger.warning(f"Alumno no encontrado: ID {alumno_id}")
-        raise NotFoundError(
-            f"Alumno con ID {alumno_id} no existe",
-            "No se puede actualizar un alumno inexistente",
-        )
-    
-    if alumno_data.matricula and alumno_data.matricula != alumno["matricula"]:
-        if _matricula_existe(alumno_data.matricula, excluir_id=alumno_id):
-            logger.error(f"Matrícula duplicada: {alumno_data.matricula}")
-            raise ValidationError(
-                f"Matrícula {alumno_data.matricula} ya está registrada",
-                "La matrícula debe ser única",
-            )
-    
-    if alumno_data.nombres is not None:
-        alumno["nombres"] = alumno_data.nombres
-    if alumno_data.apellidos is not None:
-        alumno["apellidos"] = alumno_data.apellidos
-    if alumno_data.matricula is not None:
-        alumno["matricula"] = alumno_data.matricula
-    if alumno_data.promedio is not None:
-        alumno["promedio"] = alumno_data.promedio
-    
+    try:
+        alumno = almacen.actualizar(alumno_id, alumno_data.model_dump(exclude_none=True))
+    except ErrorAlmacen as e:
+        raise error_de_almacen(e, "actualizar")
+
     logger.info(f"Alumno actualizado: ID {alumno_id}")
     return AlumnoResponse(**alumno)
 
 
 def eliminar_alumno(alumno_id: int) -> Dict[str, str]:
-    global alumnos_db
-    
-    for i, alumno in enumerate(alumnos_db):
-        if alumno["id"] == alumno_id:
-            matricula = alumno["matricula"]
-            alumnos_db.pop(i)
-            logger.info(f"Alumno eliminado: ID {alumno_id}, matrícula {matricula}")
-            return {"mensaje": f"Alumno con ID {alumno_id} eliminado correctamente"}
-    
-    logger.warning(f"Alumno no encontrado: ID {alumno_id}")
-    raise NotFoundError(
-        f"Alumno con ID {alumno_id} no existe",
-        "No se puede eliminar un alumno inexistente",
+    try:
+        alumno = almacen.eliminar(alumno_id)
+    except ErrorAlmacen as e:
+        raise error_de_almacen(e, "eliminar")
+
+    logger.info(f"Alumno eliminado: ID {alumno_id}, matrícula {alumno['matricula']}")
+    return {"mensaje": f"Alumno con ID {alumno_id} eliminado correctamente"}
+
+
+def cargar_registros(filas: List[Tuple[int, tuple]]) -> List[Tuple[int, str]]:
+    """
+    Carga masiva de registros ya validados (ver app.services.semilla_service).
+
+    Aplica la unicidad de id y matrícula una sola vez por fila, inserta todos los
+    aceptados con un único extend y marca un solo cambio de versión.
+
+    Args:
+        filas: Pares (número de fila en el origen, valores validados en orden CAMPOS)
+
+    Returns:
+        Pares (número de fila, motivo) de las filas rechazadas
+    """
+    conflictos = almacen.cargar_muchos([dict(zip(CAMPOS, valores)) for _, valores in filas])
+    rechazados = [
+        (
+            filas[posicion][0],
+            f"ID {e.valor} ya existe" if e.campo == "id" else f"Matrícula {e.valor} ya está registrada",
+        )
+        for posicion, e in conflictos
+    ]
+    logger.info(
+        f"Carga masiva de alumnos: {len(filas) - len(rechazados)} aceptados, "
+        f"{len(rechazados)} rechazados"
     )
+    return rechazados
+
+
+def contar_facetas(filtros: Optional[Dict[str, List[str]]] = None) -> Dict[str, Any]:
+    """Conteos por valor de cada faceta bajo los filtros dados (ver IndiceFacetas)."""
+    return _facetas.contar(filtros)
+
+
+def estructuras_memoria() -> Dict[str, Any]:
+    """Estructuras del almacén, para diagnóstico de memoria (ver memoria_service)."""
+    return {
+        "registros": alumnos_db,
+        "indices": {
+            "por_id": _alumnos_por_id,
+            "por_matricula": _alumnos_por_matricula,
+            "historial": _historial,
+            "ranking": _ranking,
+        },
+    }
 
 
 def obtener_estadisticas() -> Dict[str, Any]:
+    return almacen.desde_cache("estadisticas", _calcular_estadisticas)
+
+
+def precalcular_estadisticas() -> Dict[str, Any]:
+    """Calcular y cachear las estadísticas fuera del camino de la petición."""
+    return obtener_estadisticas()
+
+
+def _calcular_estadisticas() -> Dict[str, Any]:
     if not alumnos_db:
         return {"total": 0, "promedio_general": 0.0}
     
@@ -0,0 +1,109 @@
+"""
+Interfaz asíncrona sobre los servicios CRUD.
+
+Las rutas son `async def`; si llamaran directamente a funciones de servicio
+bloqueantes (E/S de disco, base de datos, serialización grande) detendrían
+el event loop y todas las peticiones concurrentes. ServicioAsincrono expone
+las mismas funciones que el módulo de servicio envuelto, pero:
+
+    - si el módulo ofrece una implementación nativa `async def`, se usa tal cual;
+    - si no, la función se ejecuta en un pool de hilos acotado.
+
+En ambos casos la espera cuenta como fase "servicio" de Server-Timing (ver
+app.utils.tiempos).
+
+Las funciones que escriben (crear_*, actualizar_*, eliminar_*) se serializan
+por servicio con un candado, salvo que el módulo declare
+`ESCRITURA_CONCURRENTE = True` (almacenes con candados propios).
+
+Configuración por variables de entorno:
+    SERVICIOS_HILOS   Tamaño máximo del pool de hilos (default 8)
+"""
+
+import asyncio
+import functools
+import inspect
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import ModuleType
+from typing import Any, Callable, Optional
+
+from app.services import alumnos_service, profesores_service
+from app.utils.tiempos import fase
+
+logger = logging.getLogger(__name__)
+
+PREFIJOS_ESCRITURA = ("crear_", "actualizar_", "eliminar_")
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _obtener_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        hilos = int(os.getenv("SERVICIOS_HILOS", "8"))
+        _executor = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="servicio")
+        logger.info(f"Pool de servicios creado con {hilos} hilos")
+    return _executor
+
+
+async def ejecutar_bloqueante(funcion: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Ejecutar `funcion` en el pool de servicios sin bloquear el event loop."""
+    loop = asyncio.get_running_loop()
+    with fase("servicio"):
+        return await loop.run_in_executor(
+            _obtener_executor(), functools.partial(funcion, *args, **kwargs)
+        )
+
+
+def detener() -> None:
+    """Cerrar el pool de hilos esperando a que terminen las tareas en curso."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+
+class ServicioAsincrono:
+    """Adaptador `await`-able de un módulo de servicio síncrono."""
+
+    def __init__(self, modulo: ModuleType):
+        self._modulo = modulo
+        self._candado_escritura = threading.Lock()
+
+    def __getattr__(self, nombre: str) -> Callable[..., Any]:
+        funcion = getattr(self._modulo, nombre)
+        if inspect.iscoroutinefunction(funcion):
+
+            @functools.wraps(funcion)
+            async def envoltura(*args: Any, **kwargs: Any) -> Any:
+                with fase("servicio"):
+                    return await funcion(*args, **kwargs)
+
+        else:
+            if nombre.startswith(PREFIJOS_ESCRITURA) and not getattr(
+                self._modulo, "ESCRITURA_CONCURRENTE", False
+            ):
+                funcion = self._serializar(funcion)
+
+            @functools.wraps(funcion)
+            async def envoltura(*args: Any, **kwargs: Any) -> Any:
+                return await ejecutar_bloqueante(funcion, *args, **kwargs)
+
+        # Cachear en la instancia: __getattr__ solo se invoca la primera vez
+        setattr(self, nombre, envoltura)
+        return envoltura
+
+    def _serializar(self, funcion: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(funcion)
+        def con_candado(*args: Any, **kwargs: Any) -> Any:
+            with self._candado_escritura:
+                return funcion(*args, **kwargs)
+
+        return con_candado
+
+
+alumnos = ServicioAsincrono(alumnos_service)
+profesores = ServicioAsincrono(profesores_service)
@@ -0,0 +1,225 @@
+"""
+Planificador de tareas de mantenimiento en segundo plano.
+
+Ejecuta trabajo costoso (precalcular estadísticas, precalentar cachés, ...)
+fuera del camino de las peticiones usando APScheduler sobre un pool de
+hilos. Se inicia y se detiene con el ciclo de vida de la aplicación
+(ver app.main).
+
+Configuración por variables de entorno:
+    MANTENIMIENTO_HABILITADO   "0" para no arrancar el planificador (default "1")
+    MANTENIMIENTO_HILOS        Tamaño del pool de hilos (default 2)
+"""
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from apscheduler.executors.pool import ThreadPoolExecutor
+from apscheduler.schedulers.background import BackgroundScheduler
+
+from app.services import alumnos_service, profesores_service
+from app.utils.exceptions import NotFoundError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MetricasTarea:
+    """Métricas de ejecución acumuladas de una tarea."""
+    ejecuciones: int = 0
+    errores: int = 0
+    omitidas: int = 0
+    ultima_duracion_ms: float = 0.0
+    max_duracion_ms: float = 0.0
+    total_duracion_ms: float = 0.0
+    ultima_ejecucion: Optional[str] = None
+    ultimo_error: Optional[str] = None
+
+
+@dataclass
+class Tarea:
+    id: str
+    funcion: Callable[[], Any]
+    intervalo_segundos: int
+    jitter_segundos: int
+    descripcion: str = ""
+    pausada: bool = False
+    metricas: MetricasTarea = field(default_factory=MetricasTarea)
+    candado: threading.Lock = field(default_factory=threading.Lock)
+
+
+_tareas: Dict[str, Tarea] = {}
+_scheduler: Optional[BackgroundScheduler] = None
+
+
+def _ejecutar(tarea_id: str) -> Dict[str, Any]:
+    """Ejecutar una tarea midiendo su duración; se omite si ya está en curso."""
+    tarea = _tareas[tarea_id]
+    metricas = tarea.metricas
+    if not tarea.candado.acquire(blocking=False):
+        metricas.omitidas += 1
+        logger.warning(f"Tarea {tarea_id} omitida: ejecución anterior en curso")
+        return {"tarea": tarea_id, "estado": "omitida"}
+    inicio = time.perf_counter()
+    try:
+        tarea.funcion()
+        estado = "ok"
+    except Exception as e:
+        metricas.errores += 1
+        metricas.ultimo_error = str(e)
+        logger.error(f"Error en tarea {tarea_id}: {str(e)}")
+        estado = "error"
+    finally:
+        duracion_ms = (time.perf_counter() - inicio) * 1000
+        metricas.ejecuciones += 1
+        metricas.ultima_duracion_ms = round(duracion_ms, 3)
+        metricas.max_duracion_ms = round(max(metricas.max_duracion_ms, duracion_ms), 3)
+        metricas.total_duracion_ms = round(metricas.total_duracion_ms + duracion_ms, 3)
+        metricas.ultima_ejecucion = datetime.now().isoformat()
+        tarea.candado.release()
+    return {"tarea": tarea_id, "estado": estado, "duracion_ms": metricas.ultima_duracion_ms}
+
+
+def registrar_tarea(
+    tarea_id: str,
+    funcion: Callable[[], Any],
+    intervalo_segundos: int,
+    jitter_segundos: int = 0,
+    descripcion: str = "",
+) -> None:
+    """Registrar una tarea periódica (antes o después de iniciar el planificador)."""
+    _tareas[tarea_id] = Tarea(tarea_id, funcion, intervalo_segundos, jitter_segundos, descripcion)
+    if _scheduler is not None:
+        _programar(_tareas[tarea_id])
+    logger.info(f"Tarea de mantenimiento registrada: {tarea_id} cada {intervalo_segundos}s")
+
+
+def _programar(tarea: Tarea) -> None:
+    opciones: Dict[str, Any] = {"next_run_time": None} if tarea.pausada else {}
+    _scheduler.add_job(
+        _ejecutar,
+        "interval",
+        args=[tarea.id],
+        id=tarea.id,
+        name=tarea.id,
+        seconds=tarea.intervalo_segundos,
+        jitter=tarea.jitter_segundos or None,
+        max_instances=1,
+        coalesce=True,
+        replace_existing=True,
+        **opciones,
+    )
+
+
+def iniciar() -> None:
+    """Arrancar el planificador con todas las tareas registradas."""
+    global _scheduler
+    if _scheduler is not None or os.getenv("MANTENIMIENTO_HABILITADO", "1") == "0":
+        return
+    hilos = int(os.getenv("MANTENIMIENTO_HILOS", "2"))
+    _scheduler = BackgroundScheduler(executors={"default": ThreadPoolExecutor(hilos)})
+    for tarea in _tareas.values():
+        _programar(tarea)
+    _scheduler.start()
+    logger.info(f"Planificador de mantenimiento iniciado con {len(_tareas)} tareas")
+
+
+def detener() -> None:
+    """Detener el planificador esperando a que terminen las tareas en curso."""
+    global _scheduler
+    if _scheduler is None:
+        return
+    _scheduler.shutdown(wait=True)
+    _scheduler = None
+    logger.info("Planificador de mantenimiento detenido")
+
+
+def _obtener_tarea(tarea_id: str) -> Tarea:
+    tarea = _tareas.get(tarea_id)
+    if tarea is None:
+        raise NotFoundError(
+            f"Tarea {tarea_id} no existe",
+            f"No hay una tarea de mantenimiento registrada con id {tarea_id}",
+        )
+    return tarea
+
+
+def listar_tareas() -> List[Dict[str, Any]]:
+    resultado = []
+    for tarea in _tareas.values():
+        job = _scheduler.get_job(tarea.id) if _scheduler is not None else None
+        proxima = job.next_run_time if job is not None else None
+        resultado.append({
+            "id": tarea.id,
+            "descripcion": tarea.descripcion,
+            "intervalo_segundos": tarea.intervalo_segundos,
+            "jitter_segundos": tarea.jitter_segundos,
+            "pausada": tarea.pausada,
+            "proxima_ejecucion": proxima.isoformat() if proxima else None,
+            "en_curso": tarea.candado.locked(),
+            "metricas": vars(tarea.metricas),
+        })
+    return resultado
+
+
+def ejecutar_tarea(tarea_id: str) -> Dict[str, Any]:
+    """Ejecutar una tarea inmediatamente en el hilo llamador."""
+    _obtener_tarea(tarea_id)
+    return _ejecutar(tarea_id)
+
+
+def pausar_tarea(tarea_id: str) -> Dict[str, str]:
+    _obtener_tarea(tarea_id).pausada = True
+    if _scheduler is not None:
+        _scheduler.pause_job(tarea_id)
+    return {"mensaje": f"Tarea {tarea_id} pausada"}
+
+
+def reanudar_tarea(tarea_id: str) -> Dict[str, str]:
+    _obtener_tarea(tarea_id).pausada = False
+    if _scheduler is not None:
+        _scheduler.resume_job(tarea_id)
+    return {"mensaje": f"Tarea {tarea_id} reanudada"}
+
+
+def _precalcular_estadisticas() -> None:
+    alumnos_service.precalcular_estadisticas()
+    profesores_service.precalcular_estadisticas()
+
+
+def _precalentar_listas() -> None:
+    alumnos_service.precalentar_lista()
+    profesores_service.precalentar_lista()
+
+
+def _purgar_historial() -> None:
+    alumnos_service.purgar_historial()
+    profesores_service.purgar_historial()
+
+
+registrar_tarea(
+    "precalcular_estadisticas",
+    _precalcular_estadisticas,
+    intervalo_segundos=30,
+    jitter_segundos=5,
+    descripcion="Recalcula las estadísticas de alumnos y profesores",
+)
+registrar_tarea(
+    "precalentar_listas",
+    _precalentar_listas,
+    intervalo_segundos=30,
+    jitter_segundos=5,
+    descripcion="Reconstruye las listas de respuestas cacheadas",
+)
+registrar_tarea(
+    "purgar_historial",
+    _purgar_historial,
+    intervalo_segundos=600,
+    jitter_segundos=60,
+    descripcion="Compacta el historial de versiones fuera de la ventana de retención",
+)
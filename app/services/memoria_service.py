@@ -0,0 +1,209 @@
+"""
+Diagnóstico de memoria de los almacenes y seguimiento de asignaciones.
+
+    - Contabilidad: bytes por almacén, bytes por registro desglosados por campo
+      y eficiencia del interning de strings (cuántos valores repetidos
+      comparten el mismo objeto).
+    - Asignaciones: inicio/parada de tracemalloc, principales sitios de
+      asignación agrupados por ruta y diferencias entre snapshots con nombre.
+
+Solo se activa con DEBUG_MEMORIA=1 (ver app.main): deshabilitado, no se
+registra ni la ruta /debug/memoria ni el middleware, por lo que no hay costo
+alguno en el camino de las peticiones.
+
+Configuración por variables de entorno:
+    DEBUG_MEMORIA          "1" para habilitar el diagnóstico (default "0")
+    DEBUG_MEMORIA_TOKEN    Si se define, se exige en la cabecera X-Debug-Token
+    DEBUG_MEMORIA_MUESTREO Medir 1 de cada N peticiones al rastrear (default 1)
+"""
+
+import logging
+import os
+import sys
+import tracemalloc
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+from app.services import alumnos_service, profesores_service
+from app.utils.exceptions import NotFoundError, ValidationError
+
+logger = logging.getLogger(__name__)
+
+HABILITADO = os.getenv("DEBUG_MEMORIA", "0") == "1"
+TOKEN = os.getenv("DEBUG_MEMORIA_TOKEN")
+MUESTREO = max(1, int(os.getenv("DEBUG_MEMORIA_MUESTREO", "1")))
+TOP_SITIOS = 10
+
+_ALMACENES = {"alumnos": alumnos_service, "profesores": profesores_service}
+
+_snapshots: Dict[str, tracemalloc.Snapshot] = {}
+# ruta -> sitio ("archivo:línea") -> [bytes, asignaciones]
+_sitios_por_ruta: Dict[str, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(lambda: [0, 0]))
+_peticiones_vistas = 0
+
+
+def _tamano_profundo(obj: Any, vistos: set) -> int:
+    """Bytes de `obj` y de los contenedores/valores que referencia (sin repetir objetos)."""
+    if id(obj) in vistos:
+        return 0
+    vistos.add(id(obj))
+    total = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for clave, valor in obj.items():
+            total += _tamano_profundo(clave, vistos) + _tamano_profundo(valor, vistos)
+    elif isinstance(obj, (list, tuple, set)):
+        for valor in obj:
+            total += _tamano_profundo(valor, vistos)
+    return total
+
+
+def _reporte_almacen(servicio) -> Dict[str, Any]:
+    estructuras = servicio.estructuras_memoria()
+    registros = list(estructuras["registros"])
+    vistos: set = set()
+    bytes_registros = _tamano_profundo(registros, vistos)
+    bytes_indices = {
+        nombre: indice.bytes_estructura() for nombre, indice in estructuras["indices"].items()
+    }
+
+    por_campo: Dict[str, int] = Counter()
+    strings: Dict[str, Dict[str, set]] = defaultdict(lambda: {"valores": set(), "objetos": set()})
+    bytes_duplicados: Dict[str, int] = Counter()
+    for registro in registros:
+        for campo, valor in registro.items():
+            por_campo[campo] += sys.getsizeof(valor)
+            if isinstance(valor, str):
+                info = strings[campo]
+                if id(valor) not in info["objetos"]:
+                    if valor in info["valores"]:
+                        bytes_duplicados[campo] += sys.getsizeof(valor)
+                    info["objetos"].add(id(valor))
+                    info["valores"].add(valor)
+
+    n = len(registros) or 1
+    return {
+        "registros": len(registros),
+        "bytes_total": bytes_registros + sum(bytes_indices.values()),
+        "bytes_registros": bytes_registros,
+        "bytes_indices": bytes_indices,
+        "bytes_por_registro": {
+            "dict": round(sum(sys.getsizeof(r) for r in registros) / n, 1),
+            **{campo: round(total / n, 1) for campo, total in por_campo.items()},
+        },
+        "interning": {
+            campo: {
+                "valores_distintos": len(info["valores"]),
+                "objetos_distintos": len(info["objetos"]),
+                "bytes_recuperables": bytes_duplicados[campo],
+            }
+            for campo, info in strings.items()
+        },
+    }
+
+
+def reporte_memoria() -> Dict[str, Any]:
+    """Contabilidad de memoria de todos los almacenes."""
+    return {
+        "almacenes": {nombre: _reporte_almacen(s) for nombre, s in _ALMACENES.items()},
+        "rastreo_activo": tracemalloc.is_tracing(),
+    }
+
+
+def iniciar_rastreo(profundidad: int = 1) -> Dict[str, Any]:
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(profundidad)
+        _sitios_por_ruta.clear()
+        logger.info(f"Rastreo de asignaciones iniciado (profundidad {profundidad})")
+    return {"rastreo_activo": True}
+
+
+def detener_rastreo() -> Dict[str, Any]:
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+        _snapshots.clear()
+        logger.info("Rastreo de asignaciones detenido")
+    return {"rastreo_activo": False}
+
+
+def _requerir_rastreo() -> None:
+    if not tracemalloc.is_tracing():
+        raise ValidationError(
+            "El rastreo de asignaciones no está activo",
+            "Iniciar con POST /debug/memoria/rastreo/iniciar",
+        )
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    # Excluir las asignaciones del propio tracemalloc
+    return tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, tracemalloc.__file__)]
+    )
+
+
+def registrar_peticion(ruta: str, antes: tracemalloc.Snapshot) -> None:
+    """Acumular los sitios que asignaron memoria durante una petición de `ruta`."""
+    despues = _snapshot()
+    sitios = _sitios_por_ruta[ruta]
+    for estadistica in despues.compare_to(antes, "lineno")[:TOP_SITIOS]:
+        if estadistica.size_diff > 0:
+            sitio = str(estadistica.traceback[0])
+            sitios[sitio][0] += estadistica.size_diff
+            sitios[sitio][1] += max(estadistica.count_diff, 0)
+
+
+async def middleware_asignaciones(request, call_next):
+    """Middleware HTTP: mide asignaciones por ruta mientras el rastreo está activo."""
+    global _peticiones_vistas
+    if not tracemalloc.is_tracing() or request.url.path.startswith("/debug/"):
+        return await call_next(request)
+    _peticiones_vistas += 1
+    if _peticiones_vistas % MUESTREO:
+        return await call_next(request)
+    # Con peticiones concurrentes las diferencias se mezclan: es una aproximación
+    antes = _snapshot()
+    respuesta = await call_next(request)
+    ruta = request.scope.get("route")
+    registrar_peticion(
+        f"{request.method} {getattr(ruta, 'path', request.url.path)}", antes
+    )
+    return respuesta
+
+
+def top_sitios_por_ruta(limite: int = TOP_SITIOS) -> Dict[str, List[Dict[str, Any]]]:
+    _requerir_rastreo()
+    return {
+        ruta: [
+            {"sitio": sitio, "bytes": valores[0], "asignaciones": valores[1]}
+            for sitio, valores in sorted(sitios.items(), key=lambda x: -x[1][0])[:limite]
+        ]
+        for ruta, sitios in _sitios_por_ruta.items()
+    }
+
+
+def tomar_snapshot(nombre: str) -> Dict[str, Any]:
+    _requerir_rastreo()
+    _snapshots[nombre] = _snapshot()
+    actual, pico = tracemalloc.get_traced_memory()
+    return {"snapshot": nombre, "bytes_rastreados": actual, "pico": pico}
+
+
+def diferencia_snapshots(
+    desde: str, hasta: Optional[str] = None, limite: int = TOP_SITIOS
+) -> List[Dict[str, Any]]:
+    """Principales diferencias entre dos snapshots (o entre `desde` y ahora)."""
+    _requerir_rastreo()
+    if desde not in _snapshots or (hasta is not None and hasta not in _snapshots):
+        raise NotFoundError(
+            "Snapshot no existe",
+            f"Snapshots disponibles: {', '.join(_snapshots) or 'ninguno'}",
+        )
+    final = _snapshots[hasta] if hasta is not None else _snapshot()
+    return [
+        {
+            "sitio": str(e.traceback[0]),
+            "bytes_diff": e.size_diff,
+            "asignaciones_diff": e.count_diff,
+            "bytes": e.size,
+        }
+        for e in final.compare_to(_snapshots[desde], "lineno")[:limite]
+    ]
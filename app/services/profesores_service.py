@@ -2,49 +2,78 @@
 Servicio CRUD para Profesores - AJUSTADO PARA TESTS
 """
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Sequence, Tuple
 from app.schemas.profesor_schema import ProfesorCreate, ProfesorUpdate, ProfesorResponse
-from app.utils.exceptions import ValidationError, NotFoundError
+from app.utils.exceptions import APIException, ValidationError, NotFoundError, GoneError
+from app.utils.concurrencia import MODO_CONCURRENTE
+from app.utils.almacen import Almacen, Conflicto, CursorInvalido, ErrorAlmacen
+from app.utils.facetas import IndiceFacetas, bandas, inicial
+from app.utils.historial import Historial, VersionNoConservada, a_fecha
+from app.utils.ranking import IndiceRanking
 import logging
 
 logger = logging.getLogger(__name__)
 
-profesores_db: List[Dict[str, Any]] = []
-_next_profesor_id: int = 1
+# Campos de cada registro, en orden (ver cargar_registros)
+CAMPOS = ("id", "numeroEmpleado", "nombres", "apellidos", "horasClase")
 
+# Tipos de columna del export Arrow (ver app.utils.exportacion)
+COLUMNAS_ARROW = {
+    "id": "int64",
+    "numeroEmpleado": "string",
+    "nombres": "string",
+    "apellidos": "string",
+    "horasClase": "int64",
+}
 
-def _obtener_siguiente_id() -> int:
-    global _next_profesor_id
-    id_actual = _next_profesor_id
-    _next_profesor_id += 1
-    return id_actual
+# Las escrituras de este módulo son seguras entre hilos (ver app.services.asincrono)
+ESCRITURA_CONCURRENTE = MODO_CONCURRENTE
 
+# Facetas para /profesores/facetas: tipo de carga horaria e inicial del apellido
+BANDAS_HORAS = ["parcial", "completo", "sobrecarga"]
+_facetas = IndiceFacetas(
+    {
+        "horasClase": bandas("horasClase", [20, 41], BANDAS_HORAS),
+        "inicial_apellido": inicial("apellidos"),
+    },
+    valores_fijos={"horasClase": BANDAS_HORAS},
+)
 
-def _numero_empleado_existe(numero: str, excluir_id: Optional[int] = None) -> bool:
-    for profesor in profesores_db:
-        if profesor["numeroEmpleado"] == numero:
-            if excluir_id is None or profesor["id"] != excluir_id:
-                return True
-    return False
+# Historial de versiones por registro para lecturas as_of (ver app.utils.historial)
+_historial = Historial()
 
+# Posición y percentil por horasClase en O(log n) (ver app.utils.ranking)
+_ranking = IndiceRanking("horasClase", 0, 168, resolucion=1)
 
-def _id_existe(id: int) -> bool:
-    for profesor in profesores_db:
-        if profesor["id"] == id:
-            return True
-    return False
+# Almacén versionado (ver app.utils.almacen): índices O(1) por id y por número
+# de empleado con reserva atómica de claves, registros copy-on-write y fotos
+# por versión para lecturas aisladas. Las lecturas no toman candado. Las
+# facetas, el historial y el ranking se notifican en cada escritura.
+almacen = Almacen("numeroEmpleado", indices_secundarios=[_facetas, _historial, _ranking])
+profesores_db: Sequence[Dict[str, Any]] = almacen.registros
+_profesores_por_id = almacen.por_id
+_profesores_por_numero = almacen.por_clave
+
+
+def _construir_lista() -> List[ProfesorResponse]:
+    return [ProfesorResponse(**profesor) for profesor in profesores_db]
 
 
 def obtener_todos_profesores() -> List[ProfesorResponse]:
     logger.info(f"Obteniendo {len(profesores_db)} profesores")
-    return [ProfesorResponse(**profesor) for profesor in profesores_db]
+    return almacen.desde_cache("lista", _construir_lista)
+
+
+def precalentar_lista() -> int:
+    """Construir (si hace falta) la lista de respuestas cacheada; devuelve su tamaño."""
+    return len(almacen.desde_cache("lista", _construir_lista))
 
 
 def obtener_profesor_por_id(profesor_id: int) -> ProfesorResponse:
-    for profesor in profesores_db:
-        if profesor["id"] == profesor_id:
-            logger.info(f"Profesor encontrado: ID {profesor_id}")
-            return ProfesorResponse(**profesor)
+    profesor = _profesores_por_id.get(profesor_id)
+    if profesor is not None:
+        logger.info(f"Profesor encontrado: ID {profesor_id}")
+        return ProfesorResponse(**profesor)
     
     logger.warning(f"Profesor no encontrado: ID {profesor_id}")
     raise NotFoundError(
@@ -53,93 +82,282 @@ def obtener_profesor_por_id(profesor_id: int) -> ProfesorResponse:
     )
 
 
-def crear_profesor(profesor_data: ProfesorCreate) -> ProfesorResponse:
-    # Si el test envía id, usarlo
-    if profesor_data.id is not None:
-        if _id_existe(profesor_data.id):
-            raise ValidationError(
-                f"ID {profesor_data.id} ya existe",
-                "El ID debe ser único",
-            )
-        nuevo_id = profesor_data.id
-    else:
-        nuevo_id = _obtener_siguiente_id()
-
-    # Validar unicidad de numeroEmpleado
-    if _numero_empleado_existe(profesor_data.numeroEmpleado):
-        logger.error(f"Número duplicado: {profesor_data.numeroEmpleado}")
-        raise ValidationError(
-            f"Número de empleado {profesor_data.numeroEmpleado} ya existe",
-            "El número de empleado debe ser único",
+def obtener_registros_profesores(skip: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Devolver los registros crudos del almacén (sin construir modelos).
+
+    Pensado para rutas que serializan directamente (p. ej. proyecciones);
+    los dicts devueltos son de solo lectura para el llamador.
+    """
+    fin = None if limit is None else skip + limit
+    return profesores_db[skip:fin]
+
+
+def obtener_pagina_profesores(
+    cursor: Optional[str] = None, skip: int = 0, limit: int = 100
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Página de registros crudos leída de una foto fija del almacén.
+
+    Devuelve también el cursor de la página siguiente (None al final): con
+    él se sigue leyendo la misma versión aunque haya escrituras entre páginas.
+    """
+    try:
+        return almacen.pagina(cursor, skip, limit)
+    except CursorInvalido as e:
+        raise ValidationError("Cursor inválido o expirado", str(e))
+
+
+def obtener_registro_profesor(profesor_id: int) -> Dict[str, Any]:
+    """Devolver el registro crudo de un profesor o lanzar NotFoundError."""
+    profesor = _profesores_por_id.get(profesor_id)
+    if profesor is None:
+        logger.warning(f"Profesor no encontrado: ID {profesor_id}")
+        raise NotFoundError(
+            f"Profesor con ID {profesor_id} no existe",
+            f"No se encontró profesor con el identificador {profesor_id}",
         )
-    
+    return profesor
+
+
+def obtener_historial_profesor(profesor_id: int) -> Dict[str, Any]:
+    """Versiones conservadas de un profesor (también si ya fue eliminado)."""
+    versiones = _historial.versiones(profesor_id)
+    if versiones is None:
+        raise _no_encontrado(
+            profesor_id, f"No hay historial del profesor con el identificador {profesor_id}"
+        )
+    return {"id": profesor_id, "versiones": versiones}
+
+
+def obtener_registro_profesor_en(profesor_id: int, instante: float) -> Dict[str, Any]:
+    """
+    Registro crudo de un profesor tal como estaba en `instante` (epoch).
+
+    NotFoundError si no existía entonces; GoneError si existía pero esa
+    versión ya no se conserva.
+    """
+    try:
+        profesor = _historial.estado_en(profesor_id, instante)
+    except VersionNoConservada as e:
+        raise _no_conservada(e)
+    if profesor is None:
+        raise _no_encontrado(
+            profesor_id,
+            f"El profesor con el identificador {profesor_id} no existía en {a_fecha(instante)}",
+        )
+    return profesor
+
+
+def obtener_registros_profesores_en(
+    instante: float, skip: int = 0, limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Registros crudos de los profesores que existían en `instante` (epoch) o GoneError."""
+    try:
+        return _historial.registros_en(instante, skip, limit)
+    except VersionNoConservada as e:
+        raise _no_conservada(e)
+
+
+def obtener_ranking_profesor(profesor_id: int) -> Dict[str, Any]:
+    """Posición y percentil de un profesor por horas de clase o NotFoundError."""
+    ranking = _ranking.posicion_de(profesor_id)
+    if ranking is None:
+        raise _no_encontrado(profesor_id, f"No se encontró profesor con el identificador {profesor_id}")
+    return ranking
+
+
+def ranking_por_horas_clase(valor: float) -> Dict[str, Any]:
+    """Posición y percentil que tendría un profesor con ese valor de horas de clase."""
+    return _ranking.posicion_para(valor)
+
+
+def exportar_profesores() -> Tuple[int, Tuple[Dict[str, Any], ...]]:
+    """Foto fija de todos los registros para exportar: (versión, registros crudos)."""
+    return almacen.snapshot()
+
+
+def purgar_historial() -> int:
+    """Compactar el historial fuera de la ventana de retención (tarea de mantenimiento)."""
+    return _historial.purgar()
+
+
+def resolver_lote_profesores(
+    ids: Optional[List[int]] = None,
+    numeros_empleado: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Resolver un lote de ids y/o números de empleado en una sola pasada.
+
+    Los encontrados (registros crudos) se devuelven en el orden de la
+    petición (primero ids, luego números de empleado) sin repetir registros; los
+    faltantes se reportan por separado en lugar de lanzar NotFoundError.
+    """
+    encontrados: List[Dict[str, Any]] = []
+    vistos: set = set()
+    ids_faltantes: List[int] = []
+    numeros_faltantes: List[str] = []
+
+    for profesor_id in ids or []:
+        profesor = _profesores_por_id.get(profesor_id)
+        if profesor is None:
+            ids_faltantes.append(profesor_id)
+        elif profesor["id"] not in vistos:
+            vistos.add(profesor["id"])
+            encontrados.append(profesor)
+
+    for numero in numeros_empleado or []:
+        profesor = _profesores_por_numero.get(numero)
+        if profesor is None:
+            numeros_faltantes.append(numero)
+        elif profesor["id"] not in vistos:
+            vistos.add(profesor["id"])
+            encontrados.append(profesor)
+
+    logger.info(
+        f"Lote de profesores: {len(encontrados)} encontrados, "
+        f"{len(ids_faltantes) + len(numeros_faltantes)} faltantes"
+    )
+    return {
+        "encontrados": encontrados,
+        "ids_faltantes": ids_faltantes,
+        "numeros_empleado_faltantes": numeros_faltantes,
+    }
+
+
+def obtener_profesores_por_lote(
+    ids: Optional[List[int]] = None,
+    numeros_empleado: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """Igual que resolver_lote_profesores, pero con modelos ProfesorResponse."""
+    resultado = resolver_lote_profesores(ids, numeros_empleado)
+    resultado["encontrados"] = [ProfesorResponse(**r) for r in resultado["encontrados"]]
+    return resultado
+
+
+def _no_conservada(error: VersionNoConservada) -> GoneError:
+    logger.warning(f"Versión no conservada: profesor ID {error.registro_id}")
+    return GoneError(
+        f"La versión del profesor con ID {error.registro_id} en {a_fecha(error.instante)} ya no se conserva",
+        "El historial de esa fecha se descartó (HISTORIAL_MAX_VERSIONES / HISTORIAL_RETENCION_SEGUNDOS)",
+    )
+
+
+def _no_encontrado(profesor_id: int, detalle: str) -> NotFoundError:
+    logger.warning(f"Profesor no encontrado: ID {profesor_id}")
+    return NotFoundError(f"Profesor con ID {profesor_id} no existe", detalle)
+
+
+def _numero_duplicado(numero: str, detalle: str) -> ValidationError:
+    logger.error(f"Número duplicado: {numero}")
+    return ValidationError(f"Número de empleado {numero} ya existe", detalle)
+
+
+def error_de_almacen(error: ErrorAlmacen, operacion: str = "crear") -> APIException:
+    """Traducir un error del almacén a la excepción HTTP de este servicio."""
+    if isinstance(error, Conflicto):
+        if error.campo == "id":
+            return ValidationError(f"ID {error.valor} ya existe", "El ID debe ser único")
+        if operacion == "crear":
+            return _numero_duplicado(error.valor, "El número de empleado debe ser único")
+        return _numero_duplicado(error.valor, "El número debe ser único")
+    return _no_encontrado(error.registro_id, f"No se puede {operacion} un profesor inexistente")
+
+
+def crear_profesor(profesor_data: ProfesorCreate) -> ProfesorResponse:
+    # Si el test envía id, usarlo; si no, el almacén genera uno
     nuevo_profesor = {
-        "id": nuevo_id,
+        "id": profesor_data.id,
         "numeroEmpleado": profesor_data.numeroEmpleado,
         "nombres": profesor_data.nombres,
         "apellidos": profesor_data.apellidos,
         "horasClase": profesor_data.horasClase,
     }
-    
-    profesores_db.append(nuevo_profesor)
-    logger.info(f"Profesor creado: ID {nuevo_id}")
+    try:
+        almacen.crear(nuevo_profesor)
+    except ErrorAlmacen as e:
+        raise error_de_almacen(e)
+    logger.info(f"Profesor creado: ID {nuevo_profesor['id']}")
     
     return ProfesorResponse(**nuevo_profesor)
 
 
 def actualizar_profesor(profesor_id: int, profesor_data: ProfesorUpdate) -> ProfesorResponse:
-    profesor = None
-    for p in profesores_db:
-        if p["id"] == profesor_id:
-            profesor = p
-            break
-    
-    if profesor is None:
-        logger.warning(f"Profesor no encontrado: ID {profesor_id}")
-        raise NotFoundError(
-            f"Profesor con ID {profesor_id} no existe",
-            "No se puede actualizar un profesor inexistente",
-        )
-    
-    if profesor_data.numeroEmpleado and profesor_data.numeroEmpleado != profesor["numeroEmpleado"]:
-        if _numero_empleado_existe(profesor_data.numeroEmpleado, excluir_id=profesor_id):
-            logger.error(f"Número duplicado: {profesor_data.numeroEmpleado}")
-            raise ValidationError(
-                f"Número de empleado {profesor_data.numeroEmpleado} ya existe",
-                "El número debe ser único",
-            )
-    
-    if profesor_data.numeroEmpleado is not None:
-        profesor["numeroEmpleado"] = profesor_data.numeroEmpleado
-    if profesor_data.nombres is not None:
-        profesor["nombres"] = profesor_data.nombres
-    if profesor_data.apellidos is not None:
-        profesor["apellidos"] = profesor_data.apellidos
-    if profesor_data.horasClase is not None:
-        profesor["horasClase"] = profesor_data.horasClase
-    
+    try:
+        profesor = almacen.actualizar(profesor_id, profesor_data.model_dump(exclude_none=True))
+    except ErrorAlmacen as e:
+        raise error_de_almacen(e, "actualizar")
+
     logger.info(f"Profesor actualizado: ID {profesor_id}")
     return ProfesorResponse(**profesor)
 
 
 def eliminar_profesor(profesor_id: int) -> Dict[str, str]:
-    global profesores_db
-    
-    for i, profesor in enumerate(profesores_db):
-        if profesor["id"] == profesor_id:
-            numero = profesor["numeroEmpleado"]
-            profesores_db.pop(i)
-            logger.info(f"Profesor eliminado: ID {profesor_id}")
-            return {"mensaje": f"Profesor con ID {profesor_id} eliminado correctamente"}
-    
-    logger.warning(f"Profesor no encontrado: ID {profesor_id}")
-    raise NotFoundError(
-        f"Profesor con ID {profesor_id} no existe",
-        "No se puede eliminar un profesor inexistente",
+    try:
+        almacen.eliminar(profesor_id)
+    except ErrorAlmacen as e:
+        raise error_de_almacen(e, "eliminar")
+
+    logger.info(f"Profesor eliminado: ID {profesor_id}")
+    return {"mensaje": f"Profesor con ID {profesor_id} eliminado correctamente"}
+
+
+def cargar_registros(filas: List[Tuple[int, tuple]]) -> List[Tuple[int, str]]:
+    """
+    Carga masiva de registros ya validados (ver app.services.semilla_service).
+
+    Aplica la unicidad de id y numeroEmpleado una sola vez por fila, inserta
+    todos los aceptados con un único extend y marca un solo cambio de versión.
+
+    Args:
+        filas: Pares (número de fila en el origen, valores validados en orden CAMPOS)
+
+    Returns:
+        Pares (número de fila, motivo) de las filas rechazadas
+    """
+    conflictos = almacen.cargar_muchos([dict(zip(CAMPOS, valores)) for _, valores in filas])
+    rechazados = [
+        (
+            filas[posicion][0],
+            f"ID {e.valor} ya existe" if e.campo == "id" else f"Número de empleado {e.valor} ya existe",
+        )
+        for posicion, e in conflictos
+    ]
+    logger.info(
+        f"Carga masiva de profesores: {len(filas) - len(rechazados)} aceptados, "
+        f"{len(rechazados)} rechazados"
     )
+    return rechazados
+
+
+def contar_facetas(filtros: Optional[Dict[str, List[str]]] = None) -> Dict[str, Any]:
+    """Conteos por valor de cada faceta bajo los filtros dados (ver IndiceFacetas)."""
+    return _facetas.contar(filtros)
+
+
+def estructuras_memoria() -> Dict[str, Any]:
+    """Estructuras del almacén, para diagnóstico de memoria (ver memoria_service)."""
+    return {
+        "registros": profesores_db,
+        "indices": {
+            "por_id": _profesores_por_id,
+            "por_numero_empleado": _profesores_por_numero,
+            "historial": _historial,
+            "ranking": _ranking,
+        },
+    }
 
 
 def obtener_estadisticas() -> Dict[str, Any]:
+    return almacen.desde_cache("estadisticas", _calcular_estadisticas)
+
+
+def precalcular_estadisticas() -> Dict[str, Any]:
+    """Calcular y cachear las estadísticas fuera del camino de la petición."""
+    return obtener_estadisticas()
+
+
+def _calcular_estadisticas() -> Dict[str, Any]:
     if not profesores_db:
         return {"total": 0, "promedio_horas": 0.0}
     
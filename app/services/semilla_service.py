@@ -0,0 +1,259 @@
+"""
+Carga inicial (seeding) de alumnos y profesores desde archivos CSV o JSONL.
+
+Al arrancar la aplicación se leen los archivos configurados por bloques; cada
+bloque se valida contra AlumnoCreate/ProfesorCreate en un pool de procesos y
+los registros válidos se insertan directamente en el almacén con
+`cargar_registros` (la unicidad se comprueba una sola vez, en orden de
+archivo). Las filas rechazadas quedan en un reporte consultable en
+/admin/semilla (con ADMIN_HABILITADO=1). Mientras la carga está en curso
+/health responde "loading".
+
+`volcar_archivo` hace el camino inverso (almacén -> JSONL): app.servidor lo
+usa al apagarse para que el volcado sirva de semilla en el siguiente arranque.
+
+Configuración por variables de entorno:
+    SEMILLA_ALUMNOS          Ruta a un .csv o .jsonl de alumnos
+    SEMILLA_PROFESORES       Ruta a un .csv o .jsonl de profesores
+    SEMILLA_TAMANO_BLOQUE    Filas por bloque de validación (default 20000)
+    SEMILLA_PROCESOS         Procesos de validación (default: número de CPUs)
+"""
+
+import csv
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError as PydanticValidationError
+
+from app.schemas.alumno_schema import AlumnoCreate
+from app.schemas.profesor_schema import ProfesorCreate
+from app.services import alumnos_service, profesores_service
+
+logger = logging.getLogger(__name__)
+
+MAX_RECHAZOS_REPORTADOS = 1000
+
+_ENTIDADES = {
+    "alumnos": (AlumnoCreate, alumnos_service),
+    "profesores": (ProfesorCreate, profesores_service),
+}
+
+_estado: Dict[str, Any] = {"estado": "inactiva", "archivos": {}}
+_hilo: Optional[threading.Thread] = None
+
+
+def _parsear_lineas(formato: str, cabecera: List[str], lineas: List[str]) -> Iterator[Any]:
+    """
+    Filas de un bloque: dicts en CSV; en JSONL la línea sin decodificar (se
+    decodifica al validar, para que una línea mal formada sea una fila
+    rechazada y no un error del bloque). None en las líneas vacías.
+    """
+    if formato == "csv":
+        for valores in csv.reader(lineas):
+            fila: Dict[str, Any] = dict(zip(cabecera, valores))
+            if fila.get("id") == "":
+                fila["id"] = None
+            yield fila
+    else:
+        for linea in lineas:
+            yield linea if linea.strip() else None
+
+
+def _validar_bloque(
+    entidad: str, formato: str, cabecera: List[str], primera_fila: int, lineas: List[str]
+) -> Tuple[List[Tuple[int, tuple]], List[Tuple[int, str]]]:
+    """
+    Parsear y validar un bloque de líneas crudas (se ejecuta en un proceso del pool).
+
+    Se envían líneas de texto y se devuelven tuplas en el orden de
+    `servicio.CAMPOS`: ambos se serializan entre procesos mucho más rápido
+    que los dicts.
+    """
+    modelo, servicio = _ENTIDADES[entidad]
+    campos = servicio.CAMPOS
+    validos: List[Tuple[int, tuple]] = []
+    rechazados: List[Tuple[int, str]] = []
+    for numero, fila in enumerate(_parsear_lineas(formato, cabecera, lineas), start=primera_fila):
+        if fila is None:
+            continue
+        try:
+            if isinstance(fila, str):
+                fila = json.loads(fila)
+            datos = modelo.model_validate(fila)
+            validos.append((numero, tuple(getattr(datos, c) for c in campos)))
+        except PydanticValidationError as e:
+            errores = "; ".join(
+                f"{' -> '.join(str(x) for x in err['loc'])}: {err['msg']}" for err in e.errors()
+            )
+            rechazados.append((numero, errores))
+        except ValueError as e:  # JSONDecodeError (después de Pydantic, que también es ValueError)
+            rechazados.append((numero, f"JSON inválido: {e}"))
+    return validos, rechazados
+
+
+def _bloques(ruta: str, tamano: int) -> Iterator[Tuple[str, List[str], int, List[str]]]:
+    """Iterar (formato, cabecera, primera fila, líneas) por bloques de `tamano` líneas."""
+    if ruta.endswith(".csv"):
+        formato = "csv"
+    elif ruta.endswith((".jsonl", ".ndjson")):
+        formato = "jsonl"
+    else:
+        raise ValueError(f"Formato no soportado (se espera .csv o .jsonl): {ruta}")
+    # Se lee por líneas: en CSV no se admiten campos entrecomillados con saltos de línea
+    with open(ruta, newline="", encoding="utf-8") as archivo:
+        cabecera: List[str] = []
+        primera_fila = 1
+        if formato == "csv":
+            cabecera = next(csv.reader([archivo.readline()]), [])
+            primera_fila = 2  # La fila 1 es la cabecera
+        while True:
+            lineas = list(islice(archivo, tamano))
+            if not lineas:
+                return
+            yield formato, cabecera, primera_fila, lineas
+            primera_fila += len(lineas)
+
+
+def cargar_archivo(
+    entidad: str,
+    ruta: str,
+    pool: Optional[ProcessPoolExecutor] = None,
+    tamano_bloque: int = 20000,
+    max_en_vuelo: int = 8,
+) -> Dict[str, Any]:
+    """
+    Cargar un archivo completo en el almacén de `entidad`.
+
+    Sin `pool` la validación se hace en el proceso actual. Con pool se
+    mantienen a lo sumo `max_en_vuelo` bloques pendientes (memoria acotada) y
+    los resultados se aplican en orden de archivo, de modo que ante claves
+    duplicadas gana la primera aparición.
+    """
+    servicio = _ENTIDADES[entidad][1]
+    inicio = time.perf_counter()
+    cargados = 0
+    rechazados: List[Tuple[int, str]] = []
+
+    def aplicar(validos, invalidos) -> None:
+        nonlocal cargados
+        duplicados = servicio.cargar_registros(validos)
+        cargados += len(validos) - len(duplicados)
+        rechazados.extend(invalidos)
+        rechazados.extend(duplicados)
+
+    if pool is None:
+        for bloque in _bloques(ruta, tamano_bloque):
+            aplicar(*_validar_bloque(entidad, *bloque))
+    else:
+        en_vuelo: deque = deque()
+        for bloque in _bloques(ruta, tamano_bloque):
+            en_vuelo.append(pool.submit(_validar_bloque, entidad, *bloque))
+            if len(en_vuelo) >= max_en_vuelo:
+                aplicar(*en_vuelo.popleft().result())
+        while en_vuelo:
+            aplicar(*en_vuelo.popleft().result())
+
+    rechazados.sort()
+    reporte = {
+        "ruta": ruta,
+        "cargados": cargados,
+        "total_rechazados": len(rechazados),
+        "rechazados": [
+            {"fila": fila, "motivo": motivo} for fila, motivo in rechazados[:MAX_RECHAZOS_REPORTADOS]
+        ],
+        "duracion_ms": round((time.perf_counter() - inicio) * 1000, 1),
+    }
+    logger.info(
+        f"Semilla de {entidad} desde {ruta}: {cargados} cargados, "
+        f"{len(rechazados)} rechazados en {reporte['duracion_ms']} ms"
+    )
+    return reporte
+
+
+def _cargar_configurados(rutas: Dict[str, str]) -> None:
+    tamano = int(os.getenv("SEMILLA_TAMANO_BLOQUE", "20000"))
+    procesos = int(os.getenv("SEMILLA_PROCESOS", str(os.cpu_count() or 1)))
+    try:
+        # "spawn": el proceso principal ya tiene hilos (servidor, planificador)
+        contexto = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=procesos, mp_context=contexto) as pool:
+            for entidad, ruta in rutas.items():
+                _estado["archivos"][entidad] = cargar_archivo(
+                    entidad, ruta, pool, tamano, max_en_vuelo=2 * procesos
+                )
+        _estado["estado"] = "completada"
+    except Exception as e:
+        logger.error(f"Error en la carga inicial: {str(e)}")
+        _estado["estado"] = "error"
+        _estado["error"] = str(e)
+
+
+def _rutas_configuradas() -> Dict[str, str]:
+    return {
+        entidad: ruta
+        for entidad, ruta in (
+            ("alumnos", os.getenv("SEMILLA_ALUMNOS")),
+            ("profesores", os.getenv("SEMILLA_PROFESORES")),
+        )
+        if ruta
+    }
+
+
+def cargar() -> None:
+    """
+    Hacer la carga inicial en el hilo actual (ver app.servidor, que la
+    ejecuta antes de crear los workers). Después, iniciar() no hace nada.
+    """
+    rutas = _rutas_configuradas()
+    if not rutas or _estado["estado"] != "inactiva":
+        return
+    _estado["estado"] = "cargando"
+    _cargar_configurados(rutas)
+
+
+def iniciar() -> None:
+    """Lanzar la carga inicial en segundo plano si hay archivos configurados."""
+    global _hilo
+    rutas = _rutas_configuradas()
+    if not rutas or _hilo is not None or _estado["estado"] != "inactiva":
+        return
+    _estado["estado"] = "cargando"
+    _hilo = threading.Thread(target=_cargar_configurados, args=(rutas,), name="semilla", daemon=True)
+    _hilo.start()
+
+
+def cargando() -> bool:
+    return _estado["estado"] == "cargando"
+
+
+def obtener_estado() -> Dict[str, Any]:
+    return _estado
+
+
+def volcar_archivo(entidad: str, ruta: str) -> int:
+    """
+    Escribir el almacén de `entidad` como JSONL (el formato que acepta
+    cargar_archivo) y devolver el número de registros.
+
+    Se lee de una foto fija del almacén, sin bloquear a los escritores, y se
+    escribe en un temporal que luego se renombra: un volcado interrumpido no
+    deja un archivo a medias.
+    """
+    servicio = _ENTIDADES[entidad][1]
+    _, registros = servicio.almacen.snapshot()
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "w", encoding="utf-8") as archivo:
+        for registro in registros:
+            archivo.write(json.dumps(registro, ensure_ascii=False))
+            archivo.write("\n")
+    os.replace(temporal, ruta)
+    logger.info(f"Volcado de {entidad} en {ruta}: {len(registros)} registros")
+    return len(registros)
@@ -0,0 +1,122 @@
+"""
+Transacciones multi-registro sobre los almacenes de alumnos y profesores.
+
+Los datos de cada operación se validan con los mismos esquemas que las
+rutas individuales antes de tomar ningún candado. Después se toman en modo
+exclusivo los almacenes implicados (en orden fijo, para que dos
+transacciones no se bloqueen mutuamente), se aplican las operaciones sobre
+una vista privada, se comprueba la unicidad una sola vez sobre el estado
+final y se publica todo. Si algo falla no se publica nada.
+
+Los lectores no se bloquean: siguen viendo la versión anterior hasta que la
+transacción se confirma. En el historial todos los cambios de una
+transacción llevan el mismo instante, así que una lectura as_of la ve entera
+o no la ve.
+"""
+
+import logging
+from contextlib import ExitStack
+from typing import Any, Dict, List, Tuple
+
+from pydantic import ValidationError as PydanticValidationError
+
+from app.schemas.alumno_schema import AlumnoCreate, AlumnoUpdate
+from app.schemas.profesor_schema import ProfesorCreate, ProfesorUpdate
+from app.schemas.transaccion_schema import Operacion
+from app.services import alumnos_service, profesores_service
+from app.utils.almacen import ErrorAlmacen
+from app.utils.exceptions import APIException, ValidationError
+from app.utils.historial import instante_comun
+
+logger = logging.getLogger(__name__)
+
+_ENTIDADES = {
+    "alumnos": (AlumnoCreate, AlumnoUpdate, alumnos_service),
+    "profesores": (ProfesorCreate, ProfesorUpdate, profesores_service),
+}
+
+
+def _con_prefijo(prefijo: str, error: APIException) -> APIException:
+    return type(error)(f"{prefijo}: {error.message}", error.detail)
+
+
+def _preparar(indice: int, operacion: Operacion) -> Dict[str, Any]:
+    """Validar los datos de una operación; devuelve el dict a aplicar."""
+    crear, actualizar, servicio = _ENTIDADES[operacion.entidad]
+    try:
+        if operacion.op == "crear":
+            datos = dict(operacion.datos)
+            if operacion.id is not None:
+                datos["id"] = operacion.id
+            validado = crear.model_validate(datos)
+            return {campo: getattr(validado, campo) for campo in servicio.CAMPOS}
+        if operacion.op == "actualizar":
+            return actualizar.model_validate(operacion.datos).model_dump(exclude_none=True)
+        return {}
+    except PydanticValidationError as e:
+        raise ValidationError(
+            f"Operación {indice}: los datos proporcionados no son válidos",
+            "; ".join(
+                f"{' -> '.join(str(x) for x in err['loc'])}: {err['msg']}" for err in e.errors()
+            ),
+        )
+
+
+def ejecutar_transaccion(operaciones: List[Operacion]) -> Dict[str, Any]:
+    """
+    Aplicar `operaciones` de forma atómica: todas o ninguna.
+
+    Returns:
+        Resultado de cada operación (en orden) y la versión final de cada
+        almacén implicado
+    """
+    preparadas: List[Tuple[Operacion, Dict[str, Any]]] = [
+        (operacion, _preparar(i, operacion)) for i, operacion in enumerate(operaciones)
+    ]
+    nombres = sorted({operacion.entidad for operacion in operaciones})
+
+    with ExitStack() as pila:
+        transacciones = {}
+        for nombre in nombres:
+            almacen = _ENTIDADES[nombre][2].almacen
+            pila.enter_context(almacen.escrituras.exclusivo())
+            transacciones[nombre] = almacen.transaccion()
+
+        resultados: List[Dict[str, Any]] = []
+        for i, (operacion, datos) in enumerate(preparadas):
+            transaccion = transacciones[operacion.entidad]
+            try:
+                if operacion.op == "crear":
+                    registro = transaccion.crear(datos)
+                elif operacion.op == "actualizar":
+                    registro = transaccion.actualizar(operacion.id, datos)
+                else:
+                    transaccion.eliminar(operacion.id)
+                    registro = None
+            except ErrorAlmacen as e:
+                servicio = _ENTIDADES[operacion.entidad][2]
+                raise _con_prefijo(f"Operación {i}", servicio.error_de_almacen(e, operacion.op))
+            resultados.append(
+                {
+                    "entidad": operacion.entidad,
+                    "op": operacion.op,
+                    "id": registro["id"] if registro is not None else operacion.id,
+                    "registro": registro,
+                }
+            )
+
+        # Restricciones: una sola vez, sobre el estado final
+        for nombre, transaccion in transacciones.items():
+            try:
+                transaccion.verificar()
+            except ErrorAlmacen as e:
+                servicio = _ENTIDADES[nombre][2]
+                raise _con_prefijo("Transacción rechazada", servicio.error_de_almacen(e))
+
+        with instante_comun():
+            for transaccion in transacciones.values():
+                transaccion.aplicar()
+        versiones = {nombre: _ENTIDADES[nombre][2].almacen.version for nombre in nombres}
+
+    logger.info(f"Transacción confirmada: {len(operaciones)} operaciones sobre {', '.join(nombres)}")
+    return {"resultados": resultados, "versiones": versiones}
@@ -0,0 +1,238 @@
+"""
+Lanzador de producción.
+
+Ejecutar desde la raíz del proyecto con:
+    python -m app.servidor
+
+`python app/main.py` es solo para desarrollo (reload: vigilante de archivos y
+proceso recargador). Este lanzador en cambio:
+
+    - usa el event loop y el parser HTTP más rápidos instalados (uvloop,
+      httptools) y cae a asyncio / h11 si no están;
+    - ajusta keep-alive y backlog, y desactiva el access log;
+    - precarga la aplicación (imports, esquemas, semilla, cachés) en el
+      proceso principal antes de crear los workers con fork, que así
+      comparten esas páginas (copy-on-write) y no repiten la carga;
+    - ante SIGTERM/SIGINT deja de aceptar conexiones, drena las peticiones
+      en curso con un plazo máximo, detiene los subsistemas de fondo y, si
+      se configura SERVIDOR_VOLCADO, vuelca los almacenes a JSONL.
+
+Workers: cada proceso tiene su propio almacén en memoria, así que una
+escritura en un worker no se ve en los demás. Por eso el valor por defecto
+es un solo proceso (con el pool de hilos de servicios dimensionado según las
+CPUs); SERVIDOR_WORKERS=auto (un worker por CPU) está pensado para cargas de
+solo lectura sobre datos sembrados.
+
+Configuración por variables de entorno:
+    SERVIDOR_HOST             Interfaz (default 0.0.0.0)
+    SERVIDOR_PUERTO           Puerto (default 8000)
+    SERVIDOR_WORKERS          Número de procesos o "auto" (default 1)
+    SERVIDOR_KEEP_ALIVE       Segundos de keep-alive (default 75, por encima
+                              del timeout típico de 60 s de los balanceadores)
+    SERVIDOR_BACKLOG          Cola de conexiones pendientes (default 4096)
+    SERVIDOR_PLAZO_DRENADO    Segundos para drenar al apagar (default 30)
+    SERVIDOR_LIMITE_CONCURRENCIA  Conexiones/peticiones simultáneas antes de
+                              responder 503 (default sin límite)
+    SERVIDOR_VOLCADO          Directorio donde volcar alumnos.jsonl y
+                              profesores.jsonl al apagar (default sin volcado)
+"""
+
+import importlib.util
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CPUS = os.cpu_count() or 1
+
+
+def _disponible(modulo: str) -> bool:
+    return importlib.util.find_spec(modulo) is not None
+
+
+def configuracion() -> Dict[str, Any]:
+    """Parámetros efectivos del servidor a partir del entorno."""
+    workers = os.getenv("SERVIDOR_WORKERS", "1")
+    limite = os.getenv("SERVIDOR_LIMITE_CONCURRENCIA")
+    return {
+        "host": os.getenv("SERVIDOR_HOST", "0.0.0.0"),
+        "puerto": int(os.getenv("SERVIDOR_PUERTO", "8000")),
+        "workers": CPUS if workers == "auto" else max(1, int(workers)),
+        "loop": "uvloop" if _disponible("uvloop") else "asyncio",
+        "http": "httptools" if _disponible("httptools") else "h11",
+        "keep_alive": int(os.getenv("SERVIDOR_KEEP_ALIVE", "75")),
+        "backlog": int(os.getenv("SERVIDOR_BACKLOG", "4096")),
+        "plazo_drenado": int(os.getenv("SERVIDOR_PLAZO_DRENADO", "30")),
+        "limite_concurrencia": int(limite) if limite else None,
+        "volcado": os.getenv("SERVIDOR_VOLCADO"),
+    }
+
+
+def _abrir_socket(host: str, puerto: int, backlog: int) -> socket.socket:
+    """Socket de escucha compartido por todos los workers."""
+    # proto explícito: las conexiones aceptadas lo heredan y asyncio/uvloop
+    # solo activan TCP_NODELAY en sockets con proto == IPPROTO_TCP (con el 0
+    # por defecto cada respuesta keep-alive espera al ACK retardado del cliente)
+    familia = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(familia, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, puerto))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def precargar():
+    """
+    Importar la aplicación y cargar todo lo que los workers compartirán.
+
+    No debe iniciar hilos: se ejecuta antes del fork (la semilla usa un pool
+    de procesos que se cierra antes de volver).
+    """
+    from app.main import app
+    from app.services import alumnos_service, profesores_service, semilla_service
+
+    semilla_service.cargar()
+    alumnos_service.precalentar_lista()
+    profesores_service.precalentar_lista()
+    return app
+
+
+def volcar_estado(directorio: str, sufijo: str = "") -> None:
+    from app.services import semilla_service
+
+    os.makedirs(directorio, exist_ok=True)
+    for entidad in ("alumnos", "profesores"):
+        semilla_service.volcar_archivo(entidad, os.path.join(directorio, f"{entidad}{sufijo}.jsonl"))
+
+
+def _servir(app, sock: socket.socket, cfg: Dict[str, Any], sufijo_volcado: str = "") -> None:
+    """Atender peticiones hasta recibir SIGTERM/SIGINT; al terminar, volcar el estado."""
+    import uvicorn
+
+    class Servidor(uvicorn.Server):
+        # uvicorn instala sus propios manejadores de SIGTERM/SIGINT: deja de
+        # aceptar, espera a las conexiones en curso (hasta el plazo) y ejecuta
+        # el apagado del lifespan (planificador, pool de hilos). Al volver de
+        # serve() vuelve a lanzar la señal, así que el volcado va aquí.
+        async def shutdown(self, sockets=None) -> None:
+            await super().shutdown(sockets)
+            if cfg["volcado"]:
+                volcar_estado(cfg["volcado"], sufijo_volcado)
+
+    Servidor(
+        uvicorn.Config(
+            app,
+            loop=cfg["loop"],
+            http=cfg["http"],
+            lifespan="on",
+            access_log=False,
+            server_header=False,
+            timeout_keep_alive=cfg["keep_alive"],
+            timeout_graceful_shutdown=cfg["plazo_drenado"],
+            backlog=cfg["backlog"],
+            limit_concurrency=cfg["limite_concurrencia"],
+            log_level="info",
+        )
+    ).run(sockets=[sock])
+
+
+class _Supervisor:
+    """Proceso principal con varios workers: los crea, los repone y los apaga."""
+
+    def __init__(self, app, sock: socket.socket, cfg: Dict[str, Any]):
+        self.app = app
+        self.sock = sock
+        self.cfg = cfg
+        self.workers: Dict[int, int] = {}  # pid -> índice
+        self.apagando = False
+
+    def _lanzar(self, indice: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            codigo = 0
+            try:
+                _servir(self.app, self.sock, self.cfg, sufijo_volcado=f".{indice}")
+            except BaseException:
+                logger.exception(f"Worker {indice} terminó con error")
+                codigo = 1
+            finally:
+                logging.shutdown()
+                os._exit(codigo)
+        self.workers[pid] = indice
+
+    def _apagar(self, signum: int, _frame: Any) -> None:
+        if not self.apagando:
+            logger.info(f"Señal {signum}: drenando {len(self.workers)} workers")
+        self.apagando = True
+        for pid in self.workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def ejecutar(self) -> None:
+        signal.signal(signal.SIGTERM, self._apagar)
+        signal.signal(signal.SIGINT, self._apagar)
+        for indice in range(self.cfg["workers"]):
+            self._lanzar(indice)
+
+        limite: Optional[float] = None
+        while self.workers:
+            if self.apagando and limite is None:
+                # Plazo de drenado más un margen para el apagado del lifespan y el volcado
+                limite = time.monotonic() + self.cfg["plazo_drenado"] + 10
+            if limite is not None and time.monotonic() > limite:
+                for pid in self.workers:
+                    logger.warning(f"Worker {pid} no terminó a tiempo: SIGKILL")
+                    os.kill(pid, signal.SIGKILL)
+                limite = float("inf")
+            try:
+                pid, estado = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                time.sleep(0.2)
+                continue
+            indice = self.workers.pop(pid)
+            if not self.apagando:
+                logger.warning(f"Worker {indice} (pid {pid}) terminó ({estado}); reponiendo")
+                time.sleep(1)
+                self._lanzar(indice)
+
+
+def main() -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    cfg = configuracion()
+    # Pool de hilos de servicios según las CPUs, salvo que se fije a mano
+    os.environ.setdefault("SERVICIOS_HILOS", str(min(32, CPUS + 4)))
+
+    inicio = time.perf_counter()
+    app = precargar()
+    sock = _abrir_socket(cfg["host"], cfg["puerto"], cfg["backlog"])
+    logger.info(
+        f"Servidor en {cfg['host']}:{cfg['puerto']} con {cfg['workers']} worker(s), "
+        f"loop={cfg['loop']}, http={cfg['http']}, keep-alive={cfg['keep_alive']} s, "
+        f"backlog={cfg['backlog']} (precarga {time.perf_counter() - inicio:.2f} s)"
+    )
+    if cfg["workers"] == 1:
+        _servir(app, sock, cfg)
+    elif not hasattr(os, "fork"):
+        sys.exit("SERVIDOR_WORKERS > 1 requiere fork (no disponible en esta plataforma)")
+    else:
+        _Supervisor(app, sock, cfg).ejecutar()
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,11 @@ Tests de integración.
 Ejecutar: pytest -v
 """
 
+import os
+
+# Las rutas /admin solo se registran con ADMIN_HABILITADO=1
+os.environ.setdefault("ADMIN_HABILITADO", "1")
+
 from fastapi.testclient import TestClient
 from app.main import app
 
@@ -54,4 +59,782 @@ class TestProfesores:
         assert response.status_code == 201
         data = response.json()
         assert data["numeroEmpleado"] == "789012"
-        assert "id" in data
\ No newline at end of file
+        assert "id" in data
+
+class TestLookup:
+    def test_lookup_alumnos_orden_y_faltantes(self):
+        ids = []
+        for i in range(3):
+            payload = {
+                "nombres": "Lote",
+                "apellidos": "Prueba",
+                "matricula": f"LK00000{i}",
+                "promedio": 3.0,
+            }
+            ids.append(client.post("/alumnos", json=payload).json()["id"])
+        response = client.get(
+            "/alumnos/lookup",
+            params={"ids": f"{ids[2]},999999,{ids[0]}", "matriculas": "LK000001,NOEXISTE"},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert [a["id"] for a in data["encontrados"]] == [ids[2], ids[0], ids[1]]
+        assert data["ids_faltantes"] == [999999]
+        assert data["matriculas_faltantes"] == ["NOEXISTE"]
+
+    def test_lookup_profesores_post(self):
+        payload = {
+            "numeroEmpleado": "LK1001",
+            "nombres": "Lote",
+            "apellidos": "Prueba",
+            "horasClase": 10,
+        }
+        profesor_id = client.post("/profesores", json=payload).json()["id"]
+        response = client.post(
+            "/profesores/lookup",
+            json={"ids": [profesor_id], "numerosEmpleado": ["LK1001", "NOEXISTE"]},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert [p["id"] for p in data["encontrados"]] == [profesor_id]
+        assert data["numeros_empleado_faltantes"] == ["NOEXISTE"]
+
+    def test_lookup_ids_invalidos(self):
+        response = client.get("/alumnos/lookup", params={"ids": "1,abc"})
+        assert response.status_code == 400
+
+
+class TestProyeccion:
+    def test_listar_alumnos_con_fields(self):
+        payload = {
+            "nombres": "Proy",
+            "apellidos": "Campos",
+            "matricula": "PR000001",
+            "promedio": 2.5,
+        }
+        alumno_id = client.post("/alumnos", json=payload).json()["id"]
+        response = client.get("/alumnos", params={"fields": "id,matricula", "limit": 1000})
+        assert response.status_code == 200
+        data = response.json()
+        assert all(set(a) == {"id", "matricula"} for a in data)
+        assert {"id": alumno_id, "matricula": "PR000001"} in data
+
+        response = client.get(f"/alumnos/{alumno_id}", params={"fields": "promedio"})
+        assert response.json() == {"promedio": 2.5}
+
+    def test_lookup_profesores_con_fields(self):
+        payload = {
+            "numeroEmpleado": "PR2001",
+            "nombres": "Proy",
+            "apellidos": "Campos",
+            "horasClase": 12,
+        }
+        client.post("/profesores", json=payload)
+        response = client.get(
+            "/profesores/lookup",
+            params={"numerosEmpleado": "PR2001", "fields": "numeroEmpleado"},
+        )
+        assert response.json()["encontrados"] == [{"numeroEmpleado": "PR2001"}]
+
+    def test_fields_desconocido(self):
+        response = client.get("/alumnos", params={"fields": "id,password"})
+        assert response.status_code == 400
+
+
+class TestMantenimiento:
+    def test_listar_y_ejecutar_tareas(self):
+        response = client.get("/admin/mantenimiento/tareas")
+        assert response.status_code == 200
+        ids = {t["id"] for t in response.json()}
+        assert {"precalcular_estadisticas", "precalentar_listas"} <= ids
+
+        response = client.post("/admin/mantenimiento/tareas/precalcular_estadisticas/ejecutar")
+        assert response.status_code == 200
+        assert response.json()["estado"] == "ok"
+
+    def test_pausar_tarea_inexistente(self):
+        response = client.post("/admin/mantenimiento/tareas/no_existe/pausar")
+        assert response.status_code == 404
+
+    def test_token_de_administracion(self, monkeypatch):
+        from app.routes import admin
+
+        monkeypatch.setattr(admin, "TOKEN", "secreto")
+        assert client.get("/admin/mantenimiento/tareas").status_code == 404
+        response = client.get("/admin/mantenimiento/tareas", headers={"X-Admin-Token": "otro"})
+        assert response.status_code == 404
+        response = client.get("/admin/mantenimiento/tareas", headers={"X-Admin-Token": "secreto"})
+        assert response.status_code == 200
+
+
+class TestServicioAsincrono:
+    def test_usa_nativa_o_delega_en_hilos(self):
+        import asyncio
+        import threading
+        import types
+        from app.services.asincrono import ServicioAsincrono
+
+        modulo = types.ModuleType("falso")
+        modulo.bloqueante = lambda: threading.current_thread().name
+
+        async def nativa():
+            return "nativa"
+
+        modulo.nativa = nativa
+        servicio = ServicioAsincrono(modulo)
+
+        async def correr():
+            return await servicio.bloqueante(), await servicio.nativa()
+
+        hilo, resultado = asyncio.run(correr())
+        assert hilo.startswith("servicio")
+        assert resultado == "nativa"
+
+
+class TestConcurrencia:
+    def test_creaciones_concurrentes_mantienen_invariantes(self):
+        from concurrent.futures import ThreadPoolExecutor
+        from app.schemas.alumno_schema import AlumnoCreate
+        from app.services import alumnos_service
+        from app.utils.exceptions import ValidationError
+
+        def crear(i):
+            # Cada matrícula se intenta 4 veces desde hilos distintos
+            datos = AlumnoCreate(
+                nombres="Hilo", apellidos="Estres", matricula=f"ST{i % 50:06d}", promedio=3.0
+            )
+            try:
+                return alumnos_service.crear_alumno(datos).id
+            except ValidationError:
+                return None
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            creados = [r for r in pool.map(crear, range(200)) if r is not None]
+
+        assert len(creados) == 50
+        assert len(set(creados)) == 50
+        registros = [a for a in alumnos_service.alumnos_db if a["matricula"].startswith("ST")]
+        assert len({a["matricula"] for a in registros}) == len(registros) == 50
+        assert len(alumnos_service._alumnos_por_id) == len(alumnos_service.alumnos_db)
+        assert len(alumnos_service._alumnos_por_matricula) == len(alumnos_service.alumnos_db)
+
+
+class TestSemilla:
+    def test_cargar_csv_reporta_rechazados(self, tmp_path):
+        from app.services import semilla_service
+
+        ruta = tmp_path / "alumnos.csv"
+        ruta.write_text(
+            "nombres,apellidos,matricula,promedio\n"
+            "Ana,Semilla,SM000001,4.5\n"
+            "Luis,Semilla,SM000002,9.9\n"
+            "Eva,Semilla,SM000001,3.0\n"
+            "Sol,Semilla,SM000003,2.0\n",
+            encoding="utf-8",
+        )
+        reporte = semilla_service.cargar_archivo("alumnos", str(ruta))
+        assert reporte["cargados"] == 2
+        assert [r["fila"] for r in reporte["rechazados"]] == [3, 4]
+
+        response = client.get("/alumnos/lookup", params={"matriculas": "SM000001,SM000003"})
+        assert len(response.json()["encontrados"]) == 2
+
+    def test_jsonl_con_linea_mal_formada(self, tmp_path):
+        from app.services import semilla_service
+
+        ruta = tmp_path / "alumnos.jsonl"
+        ruta.write_text(
+            '{"nombres": "Ana", "apellidos": "Json", "matricula": "SJ000001", "promedio": 4.5}\n'
+            '{"nombres": "Luis", "apellidos": "Json", "matri\n'
+            "\n"
+            '{"nombres": "Sol", "apellidos": "Json", "matricula": "SJ000002", "promedio": 2.0}\n',
+            encoding="utf-8",
+        )
+        reporte = semilla_service.cargar_archivo("alumnos", str(ruta), tamano_bloque=2)
+        assert reporte["cargados"] == 2
+        assert [r["fila"] for r in reporte["rechazados"]] == [2]
+        assert reporte["rechazados"][0]["motivo"].startswith("JSON inválido: ")
+
+
+class TestMemoria:
+    def test_reporte_memoria_por_almacen(self):
+        from app.services import memoria_service
+
+        reporte = memoria_service.reporte_memoria()["almacenes"]
+        assert set(reporte) == {"alumnos", "profesores"}
+        alumnos = reporte["alumnos"]
+        assert alumnos["bytes_total"] >= alumnos["bytes_registros"] > 0
+        assert "matricula" in alumnos["bytes_por_registro"]
+        assert "por_matricula" in alumnos["bytes_indices"]
+
+    def test_ruta_deshabilitada_por_defecto(self):
+        assert client.get("/debug/memoria").status_code == 404
+
+
+class TestFacetas:
+    def test_facetas_alumnos_con_filtros(self):
+        antes = client.get("/alumnos/facetas", params={"inicial_apellido": "Z"}).json()
+        for i, (apellido, promedio) in enumerate([("Zapata", 4.5), ("Zuluaga", 3.2), ("Zea", 4.9)]):
+            payload = {"nombres": "F", "apellidos": apellido, "matricula": f"FC00000{i}", "promedio": promedio}
+            client.post("/alumnos", json=payload)
+
+        response = client.get("/alumnos/facetas", params={"inicial_apellido": "z", "promedio": "4-5"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == antes["facetas"]["promedio"]["4-5"] + 2
+        assert set(data["facetas"]["promedio"]) == {"0-1", "1-2", "2-3", "3-4", "4-5"}
+        assert data["facetas"]["promedio"]["3-4"] == 0
+
+    def test_facetas_profesores_se_actualizan(self):
+        payload = {"numeroEmpleado": "FC9001", "nombres": "F", "apellidos": "Quiroga", "horasClase": 10}
+        profesor_id = client.post("/profesores", json=payload).json()["id"]
+        conteo = lambda: client.get(
+            "/profesores/facetas", params={"inicial_apellido": "Q"}
+        ).json()["facetas"]["horasClase"]
+        inicial = conteo()
+        client.put(f"/profesores/{profesor_id}", json={"horasClase": 45})
+        despues = conteo()
+        assert despues["parcial"] == inicial["parcial"] - 1
+        assert despues["sobrecarga"] == inicial["sobrecarga"] + 1
+        client.delete(f"/profesores/{profesor_id}")
+        assert conteo()["sobrecarga"] == inicial["sobrecarga"]
+
+    def test_cambios_pendientes_con_slot_reutilizado(self):
+        from app.utils.facetas import IndiceFacetas
+
+        indice = IndiceFacetas({"letra": lambda r: r["letra"]}, {"letra": ["A"]})
+        indice.agregar({"id": 1, "letra": "A"})
+        indice.agregar({"id": 2, "letra": "B"})
+        indice.eliminar({"id": 1, "letra": "A"})
+        indice.agregar({"id": 3, "letra": "C"})  # reutiliza el slot de 1 antes de fusionar
+        indice.actualizar({"id": 2, "letra": "C"})
+        assert indice.contar() == {"total": 2, "facetas": {"letra": {"A": 0, "C": 2}}}
+        assert indice.contar({"letra": ["A", "B"]})["total"] == 0
+
+
+class TestMsgpack:
+    def test_crear_y_listar_en_msgpack(self):
+        import msgpack
+
+        cabeceras = {"Content-Type": "application/msgpack", "Accept": "application/msgpack"}
+        payload = {"nombres": "Msg", "apellidos": "Pack", "matricula": "MP000001", "promedio": 3.5}
+        response = client.post("/alumnos", content=msgpack.packb(payload), headers=cabeceras)
+        assert response.status_code == 201
+        assert response.headers["content-type"] == "application/msgpack"
+        alumno = msgpack.unpackb(response.content)
+        assert alumno["matricula"] == "MP000001"
+
+        response = client.get(
+            f"/alumnos/{alumno['id']}",
+            params={"fields": "id,promedio"},
+            headers={"Accept": "application/msgpack"},
+        )
+        assert msgpack.unpackb(response.content) == {"id": alumno["id"], "promedio": 3.5}
+
+        response = client.get("/alumnos", params={"limit": 1000}, headers={"Accept": "application/msgpack"})
+        assert alumno in msgpack.unpackb(response.content)
+
+    def test_json_sigue_siendo_por_defecto(self):
+        response = client.get("/profesores")
+        assert response.headers["content-type"] == "application/json"
+
+    def test_negociacion_por_media_type_y_calidad(self):
+        from app.utils.formatos import acepta_msgpack
+
+        assert acepta_msgpack("application/msgpack")
+        assert acepta_msgpack("application/json;q=0.5, application/x-msgpack")
+        assert acepta_msgpack("Application/MsgPack; q=0.8, */*;q=0.1")
+        assert not acepta_msgpack("application/msgpack;q=0")
+        assert not acepta_msgpack("application/msgpack;q=0.5, application/json")
+        assert not acepta_msgpack("application/x-msgpack-foo")
+        assert not acepta_msgpack("*/*")
+
+        response = client.get("/profesores", headers={"Accept": "application/msgpack;q=0, */*"})
+        assert response.headers["content-type"] == "application/json"
+
+    def test_cuerpo_msgpack_invalido(self):
+        response = client.post(
+            "/alumnos", content=b"\xc1", headers={"Content-Type": "application/msgpack"}
+        )
+        assert response.status_code == 400
+        assert response.json() == {
+            "error": "Validation Error",
+            "message": "Cuerpo MessagePack inválido",
+            "detail": "No se pudo decodificar el cuerpo como MessagePack",
+            "path": "/alumnos",
+        }
+
+    def test_cuerpo_msgpack_con_errores_de_validacion(self):
+        import msgpack
+
+        response = client.post(
+            "/alumnos",
+            content=msgpack.packb({"nombres": " ", "apellidos": "Pack", "matricula": "MP000009", "promedio": 7}),
+            headers={"Content-Type": "application/msgpack"},
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == [
+            "body -> nombres: Value error, No puede estar vacío",
+            "body -> promedio: Value error, Promedio debe estar entre 0.0 y 5.0",
+        ]
+
+    def test_sin_paquete_msgpack(self, monkeypatch):
+        from app.utils import formatos
+
+        monkeypatch.setattr(formatos, "msgpack", None)
+        response = client.post("/alumnos", content=b"\x80", headers={"Content-Type": "application/msgpack"})
+        assert response.status_code == 415
+        assert response.json()["error"] == "Unsupported Media Type"
+
+        response = client.get("/profesores", headers={"Accept": "application/msgpack"})
+        assert response.status_code == 406
+        response = client.get("/profesores", headers={"Accept": "application/msgpack, application/json;q=0.5"})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+
+
+class TestMvcc:
+    def test_cursor_lee_la_misma_version(self):
+        ids = []
+        for i in range(3):
+            payload = {"nombres": "Foto", "apellidos": "Fija", "matricula": f"MV00000{i}", "promedio": 3.0}
+            ids.append(client.post("/alumnos", json=payload).json()["id"])
+        total = len(client.get("/alumnos", params={"limit": 1000}).json())
+
+        primera = client.get("/alumnos", params={"snapshot": True, "limit": total - 2})
+        assert primera.status_code == 200
+        cursor = primera.headers["X-Cursor-Siguiente"]
+        client.delete(f"/alumnos/{ids[0]}")
+
+        segunda = client.get("/alumnos", params={"cursor": cursor, "limit": 1000})
+        vistos = [a["id"] for a in primera.json() + segunda.json()]
+        assert len(vistos) == len(set(vistos)) == total
+        assert "X-Cursor-Siguiente" not in segunda.headers
+
+    def test_cursor_invalido(self):
+        response = client.get("/alumnos", params={"cursor": "no-es-un-cursor"})
+        assert response.status_code == 400
+
+
+class TestTransacciones:
+    def _crear(self, matricula):
+        payload = {"nombres": "Tx", "apellidos": "Prueba", "matricula": matricula, "promedio": 3.0}
+        return client.post("/alumnos", json=payload).json()["id"]
+
+    def test_intercambio_de_matriculas(self):
+        a, b = self._crear("TX000001"), self._crear("TX000002")
+        operaciones = [
+            {"entidad": "alumnos", "op": "actualizar", "id": a, "datos": {"matricula": "TX000002"}},
+            {"entidad": "alumnos", "op": "actualizar", "id": b, "datos": {"matricula": "TX000001"}},
+            {
+                "entidad": "profesores",
+                "op": "crear",
+                "datos": {"numeroEmpleado": "TX9001", "nombres": "T", "apellidos": "X", "horasClase": 5},
+            },
+        ]
+        response = client.post("/transacciones", json={"operaciones": operaciones})
+        assert response.status_code == 200
+        assert set(response.json()["versiones"]) == {"alumnos", "profesores"}
+        assert client.get(f"/alumnos/{a}").json()["matricula"] == "TX000002"
+        assert client.get(f"/alumnos/{b}").json()["matricula"] == "TX000001"
+
+    def test_lecturas_durante_intercambio_no_fallan(self):
+        import sys
+        import threading
+        from app.services import alumnos_service
+
+        a, b = self._crear("TX000021"), self._crear("TX000022")
+        almacen = alumnos_service.almacen
+        parar = threading.Event()
+        fallos = []
+
+        def leer():
+            while not parar.is_set():
+                for alumno_id in (a, b):
+                    try:
+                        alumnos_service.obtener_registro_alumno(alumno_id)
+                    except Exception as error:
+                        fallos.append(error)
+                for matricula in ("TX000021", "TX000022"):
+                    if alumnos_service._alumnos_por_matricula.get(matricula) is None:
+                        fallos.append(matricula)
+
+        intervalo = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        lectores = [threading.Thread(target=leer) for _ in range(2)]
+        try:
+            for lector in lectores:
+                lector.start()
+            for _ in range(2000):
+                with almacen.escrituras.exclusivo():
+                    transaccion = almacen.transaccion()
+                    matricula_a = transaccion.actualizar(a, {})["matricula"]
+                    matricula_b = transaccion.actualizar(b, {})["matricula"]
+                    transaccion.actualizar(a, {"matricula": matricula_b})
+                    transaccion.actualizar(b, {"matricula": matricula_a})
+                    transaccion.verificar()
+                    transaccion.aplicar()
+        finally:
+            parar.set()
+            for lector in lectores:
+                lector.join()
+            sys.setswitchinterval(intervalo)
+        assert fallos == []
+
+    def test_conflicto_al_confirmar_no_aplica_nada(self):
+        a = self._crear("TX000010")
+        self._crear("TX000011")
+        operaciones = [
+            {"entidad": "alumnos", "op": "actualizar", "id": a, "datos": {"promedio": 5.0}},
+            {
+                "entidad": "alumnos",
+                "op": "crear",
+                "datos": {"nombres": "N", "apellidos": "N", "matricula": "TX000012", "promedio": 1.0},
+            },
+            {"entidad": "alumnos", "op": "actualizar", "id": a, "datos": {"matricula": "TX000011"}},
+        ]
+        response = client.post("/transacciones", json={"operaciones": operaciones})
+        assert response.status_code == 400
+        assert client.get(f"/alumnos/{a}").json()["promedio"] == 3.0
+        assert client.get("/alumnos/lookup", params={"matriculas": "TX000012"}).json()["encontrados"] == []
+
+    def test_operacion_sobre_inexistente(self):
+        operaciones = [{"entidad": "profesores", "op": "eliminar", "id": 987654}]
+        response = client.post("/transacciones", json={"operaciones": operaciones})
+        assert response.status_code == 404
+        assert response.json()["message"].startswith("Operación 0")
+
+
+class TestServerTiming:
+    def test_cabecera_con_fases(self, monkeypatch):
+        from app.utils import tiempos
+
+        payload = {"nombres": "Tiempo", "apellidos": "Fases", "matricula": "SV900001", "promedio": 2.5}
+        alumno_id = client.post("/alumnos", json=payload).json()["id"]
+        monkeypatch.setattr(tiempos, "MUESTREO", 1)
+
+        response = client.get(f"/alumnos/{alumno_id}")
+        fases = {f.split(";")[0] for f in response.headers["Server-Timing"].split(", ")}
+        assert {"validacion", "servicio", "ruta", "modelo_respuesta", "codificacion", "total"} <= fases
+
+        response = client.get("/alumnos", params={"fields": "id"})
+        assert "serializacion" in response.headers["Server-Timing"]
+
+    def test_sin_muestreo_no_hay_cabecera(self):
+        assert "Server-Timing" not in client.get("/profesores").headers
+
+
+class TestServidor:
+    def test_configuracion_por_entorno(self, monkeypatch):
+        from app import servidor
+
+        monkeypatch.setenv("SERVIDOR_WORKERS", "auto")
+        monkeypatch.setenv("SERVIDOR_KEEP_ALIVE", "120")
+        cfg = servidor.configuracion()
+        assert cfg["workers"] == servidor.CPUS
+        assert cfg["keep_alive"] == 120
+        assert cfg["loop"] in ("uvloop", "asyncio") and cfg["http"] in ("httptools", "h11")
+
+    def test_volcado_sirve_de_semilla(self, tmp_path):
+        from app.services import semilla_service
+
+        ruta = str(tmp_path / "profesores.jsonl")
+        volcados = semilla_service.volcar_archivo("profesores", ruta)
+        # Recargar en el mismo almacén: todas las filas chocan por id
+        reporte = semilla_service.cargar_archivo("profesores", ruta)
+        assert reporte["cargados"] == 0
+        assert reporte["total_rechazados"] == volcados
+
+
+class TestValidacion:
+    def test_mensajes_de_error_crear_alumno(self):
+        response = client.post(
+            "/alumnos", json={"nombres": " ", "apellidos": None, "matricula": 1.5, "promedio": 7}
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == [
+            "body -> nombres: Value error, No puede estar vacío",
+            "body -> apellidos: Value error, No puede ser null",
+            "body -> matricula: Value error, Matrícula no puede ser un número decimal",
+            "body -> promedio: Value error, Promedio debe estar entre 0.0 y 5.0",
+        ]
+
+    def test_mensajes_de_error_actualizar_profesor(self):
+        response = client.put(
+            "/profesores/1", json={"numeroEmpleado": -3, "horasClase": 2.5, "nombres": 5}
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == [
+            "body -> numeroEmpleado: Value error, Número de empleado no puede ser negativo",
+            "body -> nombres: Input should be a valid string",
+            "body -> horasClase: Value error, Debe ser un número entero",
+        ]
+
+    def test_conversiones_se_mantienen(self):
+        response = client.post(
+            "/profesores",
+            json={"numeroEmpleado": 424242, "nombres": "  Ana ", "apellidos": "Ruiz", "horasClase": "12"},
+        )
+        assert response.status_code == 201
+        data = response.json()
+        assert (data["numeroEmpleado"], data["nombres"], data["horasClase"]) == ("424242", "Ana", 12)
+
+    def test_validacion_desde_json_igual_que_desde_python(self):
+        import json
+
+        from pydantic import ValidationError as PydanticValidationError
+
+        from app.schemas.alumno_schema import AlumnoUpdate
+        from app.schemas.profesor_schema import ProfesorUpdate
+
+        def resultado(modelo, datos, desde_json):
+            try:
+                if desde_json:
+                    return modelo.model_validate_json(json.dumps(datos)).model_dump()
+                return modelo.model_validate(datos).model_dump()
+            except PydanticValidationError as e:
+                return [(err["loc"], err["msg"]) for err in e.errors()]
+
+        casos = [
+            (AlumnoUpdate, {"matricula": "A123", "promedio": "3.5"}),
+            (AlumnoUpdate, {"matricula": 123456, "nombres": " Ana "}),
+            (AlumnoUpdate, {"matricula": 1.5}),
+            (AlumnoUpdate, {"matricula": True}),
+            (AlumnoUpdate, {"matricula": [1]}),
+            (ProfesorUpdate, {"numeroEmpleado": 654321, "horasClase": 40.0}),
+            (ProfesorUpdate, {"numeroEmpleado": -1, "horasClase": 2.5}),
+            (ProfesorUpdate, {"numeroEmpleado": {"a": 1}, "horasClase": "12"}),
+        ]
+        for modelo, datos in casos:
+            assert resultado(modelo, datos, True) == resultado(modelo, datos, False), datos
+        assert AlumnoUpdate.model_validate_json('{"matricula": "A123"}').matricula == "A123"
+
+
+class TestHistorial:
+    def test_historial_y_lecturas_as_of(self):
+        import time
+
+        alumno = client.post(
+            "/alumnos", json={"nombres": "Ana", "apellidos": "Paz", "matricula": "HS000001", "promedio": 3.0}
+        ).json()
+        antes_de_cambiar = time.time()
+        client.put(f"/alumnos/{alumno['id']}", json={"promedio": 4.5})
+        client.delete(f"/alumnos/{alumno['id']}")
+
+        versiones = client.get(f"/alumnos/{alumno['id']}/historial").json()["versiones"]
+        assert [v["operacion"] for v in versiones] == ["crear", "actualizar", "eliminar"]
+        assert versiones[1]["cambios"] == {"promedio": 4.5}
+
+        pasado = client.get(f"/alumnos/{alumno['id']}", params={"as_of": antes_de_cambiar})
+        assert pasado.status_code == 200 and pasado.json()["promedio"] == 3.0
+        lista = client.get("/alumnos", params={"as_of": antes_de_cambiar, "limit": 1000}).json()
+        assert any(a["matricula"] == "HS000001" for a in lista)
+        assert client.get(f"/alumnos/{alumno['id']}", params={"as_of": time.time()}).status_code == 404
+
+    def test_retencion_acota_versiones(self, monkeypatch):
+        from app.utils import historial
+
+        monkeypatch.setattr(historial, "MAX_VERSIONES", 10)
+        monkeypatch.setattr(historial, "INTERVALO_COMPLETO", 4)
+        h = historial.Historial()
+        registro = {"id": 1, "valor": 0}
+        with historial.instante_comun():
+            h.agregar(registro)
+        for valor in range(1, 50):
+            registro = {**registro, "valor": valor}
+            h.actualizar(registro)
+        versiones = h.versiones(1)
+        assert len(versiones) == 10 and versiones[-1]["version"] == 50
+        ultimo = h._lineas[1].tramo.instantes[-1]
+        assert h.estado_en(1, ultimo)["valor"] == 49
+
+        assert h.purgar(ahora=ultimo + historial.RETENCION_SEGUNDOS + 1) == 9
+        assert h.estado_en(1, ultimo) == {"id": 1, "valor": 49}
+
+    def test_as_of_recortado_responde_410(self, monkeypatch):
+        import time
+        from app.utils import historial
+
+        antes_del_alta = time.time()
+        alumno = client.post(
+            "/alumnos", json={"nombres": "Eva", "apellidos": "Paz", "matricula": "HS000002", "promedio": 1.0}
+        ).json()
+        recien_creado = time.time()
+        monkeypatch.setattr(historial, "MAX_VERSIONES", 2)
+        for promedio in (2.0, 3.0, 4.0):
+            client.put(f"/alumnos/{alumno['id']}", json={"promedio": promedio})
+
+        recortado = client.get(f"/alumnos/{alumno['id']}", params={"as_of": recien_creado})
+        assert recortado.status_code == 410
+        assert "ya no se conserva" in recortado.json()["message"]
+        assert client.get("/alumnos", params={"as_of": recien_creado}).status_code == 410
+        inexistente = client.get(f"/alumnos/{alumno['id']}", params={"as_of": antes_del_alta})
+        assert inexistente.status_code == 404
+        assert "no existía" in inexistente.json()["detail"]
+
+    def test_registros_en_con_altas_fuera_de_orden(self, monkeypatch):
+        from app.utils import historial
+
+        relojes = iter([10.0, 20.0, 15.0])
+        monkeypatch.setattr(historial.time, "time", lambda: next(relojes))
+        h = historial.Historial()
+        h.agregar({"id": 1, "valor": "a"})
+        h.agregar({"id": 2, "valor": "b"})
+        # Transacción con instante anterior al alta de 2
+        with historial.instante_comun():
+            h.agregar({"id": 3, "valor": "c"})
+
+        assert [r["id"] for r in h.registros_en(16.0)] == [1, 3]
+        assert [r["id"] for r in h.registros_en(16.0, skip=1)] == [3]
+        assert [r["id"] for r in h.registros_en(12.0)] == [1]
+        assert [r["id"] for r in h.registros_en(25.0, limit=2)] == [1, 2]
+
+class TestWebSocket:
+    def test_llamadas_lotes_y_errores(self):
+        with client.websocket_connect("/ws") as ws:
+            datos = {"nombres": "Web", "apellidos": "Socket", "matricula": "WS000001", "promedio": 3.5}
+            ws.send_json({"id": "c", "method": "alumnos.create", "params": {"datos": datos}})
+            creado = ws.receive_json()
+            assert creado["id"] == "c" and creado["result"]["matricula"] == "WS000001"
+            alumno_id = creado["result"]["id"]
+
+            ws.send_json(
+                [
+                    {"id": 1, "method": "alumnos.update", "params": {"id": alumno_id, "datos": {"promedio": 4.0}}},
+                    {"id": 2, "method": "alumnos.get", "params": {"id": alumno_id, "fields": "id,promedio"}},
+                    {"method": "alumnos.stats"},
+                    {"id": 3, "method": "alumnos.nada"},
+                ]
+            )
+            lote = ws.receive_json()
+            assert [r["id"] for r in lote] == [1, 2, 3]
+            assert lote[1]["result"] == {"id": alumno_id, "promedio": 4.0}
+            assert lote[2]["error"]["code"] == -32601
+
+            ws.send_json({"id": 4, "method": "alumnos.update", "params": {"id": alumno_id, "datos": {"promedio": 9}}})
+            assert ws.receive_json()["error"]["code"] == 400
+            ws.send_json({"id": 5, "method": "alumnos.delete", "params": {"id": alumno_id}})
+            ws.receive_json()
+            ws.send_json({"id": 6, "method": "alumnos.get", "params": {"id": alumno_id}})
+            assert ws.receive_json()["error"]["code"] == 404
+            ws.send_text("{no es json")
+            assert ws.receive_json()["error"]["code"] == -32700
+
+    def test_fields_que_no_es_texto(self):
+        with client.websocket_connect("/ws") as ws:
+            for i, fields in enumerate([["id"], 5, {"id": True}]):
+                metodo = "profesores.list" if i % 2 else "alumnos.get"
+                ws.send_json({"id": i, "method": metodo, "params": {"id": 1, "fields": fields}})
+                error = ws.receive_json()["error"]
+                assert error["code"] == 400
+                assert error["message"] == "Parámetro inválido: fields"
+
+    def test_params_que_no_es_objeto(self):
+        with client.websocket_connect("/ws") as ws:
+            for i, params in enumerate([[], 0, "", False, [1]]):
+                ws.send_json({"id": i, "method": "alumnos.list", "params": params})
+                error = ws.receive_json()["error"]
+                assert error["code"] == -32600
+                assert error["message"] == "params debe ser un objeto"
+            ws.send_json({"id": "sin", "method": "alumnos.list", "params": None})
+            assert "result" in ws.receive_json()
+
+    def test_respuestas_fuera_de_orden_y_msgpack(self):
+        import msgpack
+
+        with client.websocket_connect("/ws") as ws:
+            for i in range(20):
+                ws.send_json({"id": i, "method": "profesores.list", "params": {"limit": 1}})
+            assert sorted(ws.receive_json()["id"] for _ in range(20)) == list(range(20))
+
+            ws.send_bytes(msgpack.packb({"id": 1, "method": "profesores.stats"}))
+            assert "result" in msgpack.unpackb(ws.receive_bytes())
+
+
+class TestRanking:
+    def test_ranking_de_alumno_y_por_valor(self):
+        ids = []
+        for i, promedio in enumerate([4.99, 4.98, 4.98]):
+            payload = {"nombres": "Rank", "apellidos": "Ing", "matricula": f"RK00000{i}", "promedio": promedio}
+            ids.append(client.post("/alumnos", json=payload).json()["id"])
+
+        primero = client.get(f"/alumnos/{ids[0]}/ranking").json()
+        segundo = client.get(f"/alumnos/{ids[1]}/ranking").json()
+        assert primero["campo"] == "promedio" and primero["valor"] == 4.99
+        assert segundo["posicion"] == primero["posicion"] + 1 and segundo["empatados"] >= 1
+
+        client.put(f"/alumnos/{ids[2]}", json={"promedio": 5.0})
+        assert client.get(f"/alumnos/{ids[0]}/ranking").json()["posicion"] == primero["posicion"] + 1
+        assert client.get("/alumnos/ranking", params={"promedio": 5.0}).json()["empatados"] >= 1
+        client.delete(f"/alumnos/{ids[2]}")
+        assert client.get(f"/alumnos/{ids[2]}/ranking").status_code == 404
+        assert client.get("/alumnos/ranking", params={"promedio": 7}).status_code == 400
+        response = client.get("/profesores/ranking", params={"horasClase": 20})
+        assert response.status_code == 200
+        assert type(response.json()["valor"]) is int
+
+    def test_coincide_con_ordenar(self):
+        import random
+
+        from app.utils.ranking import IndiceRanking
+
+        azar = random.Random(41)
+        indice = IndiceRanking("promedio", 0.0, 5.0, resolucion=0.01)
+        registros = {i: {"id": i, "promedio": round(azar.uniform(0, 5), 2)} for i in range(500)}
+        indice.agregar_muchos(list(registros.values())[:250])
+        for registro in list(registros.values())[250:]:
+            indice.agregar(registro)
+        for i in azar.sample(range(500), 100):
+            registros[i] = {**registros[i], "promedio": round(azar.uniform(0, 5), 2)}
+            indice.actualizar(registros[i])
+        for i in azar.sample(range(500), 50):
+            indice.eliminar(registros.pop(i))
+
+        for registro in registros.values():
+            mayores = sum(r["promedio"] > registro["promedio"] for r in registros.values())
+            iguales = sum(r["promedio"] == registro["promedio"] for r in registros.values())
+            ranking = indice.posicion_de(registro["id"])
+            assert (ranking["posicion"], ranking["empatados"], ranking["total"]) == (
+                mayores + 1, iguales - 1, len(registros)
+            )
+
+
+class TestExportacionArrow:
+    def test_export_se_lee_como_tabla(self, monkeypatch):
+        import pyarrow as pa
+
+        from app.utils import exportacion
+
+        monkeypatch.setattr(exportacion, "FILAS_POR_LOTE", 2)
+        for i in range(3):
+            payload = {"nombres": "Arrow", "apellidos": "Ipc", "matricula": f"AR00000{i}", "promedio": 2.5 + i}
+            client.post("/alumnos", json=payload)
+        response = client.get("/alumnos/export.arrow")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == exportacion.ARROW_STREAM
+
+        tabla = pa.ipc.open_stream(response.content).read_all()
+        assert tabla.schema.names == ["id", "nombres", "apellidos", "matricula", "promedio"]
+        assert tabla.schema.field("promedio").type == pa.float64()
+        filas = tabla.to_pylist()
+        assert filas == client.get("/alumnos", params={"limit": 1000}).json()[: len(filas)]
+        assert next(f for f in filas if f["matricula"] == "AR000002")["promedio"] == 4.5
+
+        profesores = pa.ipc.open_stream(client.get("/profesores/export.arrow").content).read_all()
+        assert profesores.schema.field("horasClase").type == pa.int64()
+
+    def test_export_con_fields(self):
+        import pyarrow as pa
+
+        response = client.get("/alumnos/export.arrow", params={"fields": "matricula,id"})
+        tabla = pa.ipc.open_stream(response.content).read_all()
+        assert tabla.schema.names == ["matricula", "id"]
+        assert client.get("/profesores/export.arrow", params={"fields": "sueldo"}).status_code == 400
+
+    def test_sin_paquete_pyarrow(self, monkeypatch):
+        from app.utils import exportacion
+
+        monkeypatch.setattr(exportacion, "pa", None)
+        response = client.get("/profesores/export.arrow")
+        assert response.status_code == 406
+        assert response.json()["message"] == "Arrow no disponible"
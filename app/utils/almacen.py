@@ -0,0 +1,519 @@
+"""
+Almacén en memoria versionado (MVCC) para una entidad.
+
+Los registros publicados son inmutables: actualizar crea un dict nuevo y lo
+sustituye en los índices (copy-on-write). Cada versión del almacén es una
+Foto, también inmutable: una tupla de trozos de hasta TAMANO_TROZO
+registros. Una escritura copia solo el trozo que cambia y la tupla de
+trozos (O(TAMANO_TROZO + n / TAMANO_TROZO)), comparte el resto con la
+versión anterior y publica la foto nueva cambiando una sola referencia. Los
+lectores toman esa referencia y nunca esperan ni bloquean a los escritores:
+
+    - snapshot(): la foto publicada, que se conserva por versión (fijarla
+      no copia registros; las fotos conservadas comparten sus trozos).
+    - pagina(): lee una página de una foto y devuelve un cursor opaco que
+      sigue leyendo de la misma versión aunque el almacén cambie.
+    - Transaccion: varias operaciones que se validan y aplican a la vez,
+      comprobando la unicidad una sola vez al confirmar y publicando una
+      sola foto.
+
+Configuración por variables de entorno:
+    MVCC_MAX_SNAPSHOTS   Fotos conservadas a la vez por almacén (default 8)
+    MVCC_TTL_SEGUNDOS    Vida de una foto sin uso (default 300)
+"""
+
+import base64
+import os
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from collections.abc import Sequence
+from contextlib import contextmanager
+from itertools import accumulate, chain
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .concurrencia import AsignadorIds, CandadoEscrituras, CandadosFranjas, IndiceUnico
+
+Registro = Dict[str, Any]
+Trozo = Tuple[Registro, ...]
+
+MAX_SNAPSHOTS = int(os.getenv("MVCC_MAX_SNAPSHOTS", "8"))
+TTL_SNAPSHOTS = float(os.getenv("MVCC_TTL_SEGUNDOS", "300"))
+TAMANO_TROZO = 512
+
+
+class ErrorAlmacen(Exception):
+    """Base de los errores del almacén (los servicios los traducen a APIException)."""
+
+
+class Conflicto(ErrorAlmacen):
+    """`campo` ("id" o la clave única) ya tiene el valor `valor`."""
+
+    def __init__(self, campo: str, valor: Any):
+        self.campo = campo
+        self.valor = valor
+        super().__init__(f"{campo} {valor} ya existe")
+
+
+class Inexistente(ErrorAlmacen):
+    def __init__(self, registro_id: int):
+        self.registro_id = registro_id
+        super().__init__(f"id {registro_id} no existe")
+
+
+class CursorInvalido(ErrorAlmacen):
+    """Cursor mal formado o cuya foto ya no se conserva."""
+
+
+def codificar_cursor(version: int, posicion: int) -> str:
+    return base64.urlsafe_b64encode(f"{version}:{posicion}".encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str) -> Tuple[int, int]:
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        version, posicion = base64.urlsafe_b64decode(cursor + relleno).decode().split(":")
+        version, posicion = int(version), int(posicion)
+    except (ValueError, UnicodeDecodeError):
+        raise CursorInvalido("Cursor mal formado")
+    if version < 0 or posicion < 0:
+        raise CursorInvalido("Cursor mal formado")
+    return version, posicion
+
+
+class Foto(Sequence):
+    """Registros de una versión, en orden de alta; inmutable."""
+
+    __slots__ = ("version", "trozos", "_total", "_inicios")
+
+    def __init__(self, version: int, trozos: Tuple[Trozo, ...], total: int):
+        self.version = version
+        self.trozos = trozos
+        self._total = total
+        self._inicios: Optional[List[int]] = None
+
+    def __len__(self) -> int:
+        return self._total
+
+    def __iter__(self) -> Iterator[Registro]:
+        return chain.from_iterable(self.trozos)
+
+    def _posiciones(self) -> List[int]:
+        # Posición del primer registro de cada trozo; se calcula al primer
+        # acceso por posición (las escrituras no la necesitan)
+        if self._inicios is None:
+            self._inicios = list(accumulate((len(trozo) for trozo in self.trozos), initial=0))
+        return self._inicios
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            inicio, fin, paso = indice.indices(self._total)
+            if paso != 1:
+                return list(self)[indice]
+            return self._rango(inicio, fin)
+        if indice < 0:
+            indice += self._total
+        if not 0 <= indice < self._total:
+            raise IndexError("índice fuera de rango")
+        inicios = self._posiciones()
+        trozo = bisect_right(inicios, indice) - 1
+        return self.trozos[trozo][indice - inicios[trozo]]
+
+    def _rango(self, inicio: int, fin: int) -> List[Registro]:
+        resultado: List[Registro] = []
+        if inicio >= fin:
+            return resultado
+        inicios = self._posiciones()
+        trozo = bisect_right(inicios, inicio) - 1
+        while inicio < fin:
+            base = inicios[trozo]
+            resultado.extend(self.trozos[trozo][inicio - base : fin - base])
+            inicio = inicios[trozo + 1]
+            trozo += 1
+        return resultado
+
+
+class Registros(Sequence):
+    """Vista de solo lectura de la foto publicada en cada momento."""
+
+    __slots__ = ("_almacen",)
+
+    def __init__(self, almacen: "Almacen"):
+        self._almacen = almacen
+
+    def __len__(self) -> int:
+        return len(self._almacen._foto)
+
+    def __iter__(self) -> Iterator[Registro]:
+        return iter(self._almacen._foto)
+
+    def __getitem__(self, indice):
+        return self._almacen._foto[indice]
+
+
+class Almacen:
+    """Registros de una entidad con índices por id y por clave única."""
+
+    def __init__(self, clave: str, indices_secundarios: Optional[List[Any]] = None):
+        """
+        Args:
+            clave: campo con restricción de unicidad (además del id)
+            indices_secundarios: índices derivados que se notifican en cada
+                escritura (agregar / actualizar / eliminar / agregar_muchos)
+        """
+        self.clave = clave
+        self.por_id = IndiceUnico()
+        self.por_clave = IndiceUnico()
+        self.indices_secundarios: List[Any] = list(indices_secundarios or [])
+        self.escrituras = CandadoEscrituras()
+        self._ids = AsignadorIds()
+        # Serializa las escrituras sobre un mismo registro
+        self._candados_registro = CandadosFranjas()
+        # Serializa la edición de los trozos y la publicación de cada foto
+        self._candado_lista = threading.Lock()
+        # id -> (trozo, posición en el trozo), para sustituir sin buscar
+        self._ubicacion: Dict[int, Tuple[int, int]] = {}
+        self._total = 0
+
+        # La versión es la de la foto publicada. Las entradas de _cache
+        # guardan la versión con la que se calcularon y solo se reutilizan
+        # mientras esta no cambie.
+        self._foto = Foto(0, (), 0)
+        self.registros = Registros(self)
+        self._cache: Dict[str, Tuple[int, Any]] = {}
+        # versión -> (último uso, foto)
+        self._snapshots: "OrderedDict[int, Tuple[float, Foto]]" = OrderedDict()
+        self._candado_snapshots = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Versiones y caché
+    # ------------------------------------------------------------------
+
+    @property
+    def version(self) -> int:
+        return self._foto.version
+
+    def desde_cache(self, clave: str, calcular: Callable[[], Any]) -> Any:
+        version = self.version
+        entrada = self._cache.get(clave)
+        if entrada is not None and entrada[0] == version:
+            return entrada[1]
+        valor = calcular()
+        self._cache[clave] = (version, valor)
+        return valor
+
+    # ------------------------------------------------------------------
+    # Estructura (requieren el candado del registro o el modo exclusivo)
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _editar(self) -> Iterator[List[Trozo]]:
+        """Editar una copia de la lista de trozos y publicarla como la versión siguiente."""
+        with self._candado_lista:
+            foto = self._foto
+            trozos = list(foto.trozos)
+            yield trozos
+            if len(trozos) > 2 * (self._total // TAMANO_TROZO) + 8:
+                trozos = self._compactar(trozos)
+            self._foto = Foto(foto.version + 1, tuple(trozos), self._total)
+
+    def _extender(self, trozos: List[Trozo], registros: List[Registro]) -> None:
+        pendientes = 0
+        while pendientes < len(registros):
+            if not trozos or len(trozos[-1]) >= TAMANO_TROZO:
+                trozos.append(())
+            numero, ultimo = len(trozos) - 1, trozos[-1]
+            nuevos = registros[pendientes : pendientes + TAMANO_TROZO - len(ultimo)]
+            for posicion, registro in enumerate(nuevos, start=len(ultimo)):
+                self._ubicacion[registro["id"]] = (numero, posicion)
+            trozos[-1] = ultimo + tuple(nuevos)
+            pendientes += len(nuevos)
+        self._total += len(registros)
+
+    def _reemplazar(self, trozos: List[Trozo], anterior: Registro, nuevo: Registro) -> None:
+        numero, posicion = self._ubicacion[anterior["id"]]
+        trozo = trozos[numero]
+        trozos[numero] = trozo[:posicion] + (nuevo,) + trozo[posicion + 1 :]
+
+    def _quitar(self, trozos: List[Trozo], registro: Registro) -> None:
+        numero, posicion = self._ubicacion.pop(registro["id"])
+        trozo = trozos[numero]
+        trozos[numero] = trozo = trozo[:posicion] + trozo[posicion + 1 :]
+        for siguiente in range(posicion, len(trozo)):
+            self._ubicacion[trozo[siguiente]["id"]] = (numero, siguiente)
+        self._total -= 1
+
+    def _compactar(self, trozos: List[Trozo]) -> List[Trozo]:
+        """Rehacer trozos llenos cuando las bajas dejaron muchos casi vacíos."""
+        todos = list(chain.from_iterable(trozos))
+        compactos: List[Trozo] = []
+        self._ubicacion.clear()
+        self._total = 0
+        self._extender(compactos, todos)
+        return compactos
+
+    def _publicar(self, registro: Registro) -> None:
+        with self._editar() as trozos:
+            self._extender(trozos, [registro])
+        for indice in self.indices_secundarios:
+            indice.agregar(registro)
+
+    def _sustituir(self, anterior: Registro, nuevo: Registro) -> None:
+        with self._editar() as trozos:
+            self._reemplazar(trozos, anterior, nuevo)
+        for indice in self.indices_secundarios:
+            indice.actualizar(nuevo)
+
+    def _retirar(self, registro: Registro) -> None:
+        with self._editar() as trozos:
+            self._quitar(trozos, registro)
+        for indice in self.indices_secundarios:
+            indice.eliminar(registro)
+
+    # ------------------------------------------------------------------
+    # Escrituras de un registro
+    # ------------------------------------------------------------------
+
+    def crear(self, registro: Registro) -> Registro:
+        """
+        Insertar `registro`; si su "id" es None se asigna uno nuevo.
+
+        La reserva de id y clave en los índices es atómica: dos creaciones
+        concurrentes no obtienen el mismo id ni la misma clave.
+        """
+        explicito = registro["id"] is not None
+        with self.escrituras.compartido():
+            while True:
+                if not explicito:
+                    registro["id"] = self._ids.siguiente()
+                with self._candados_registro.para(registro["id"]):
+                    if not self.por_id.reservar(registro["id"], registro):
+                        if explicito:
+                            raise Conflicto("id", registro["id"])
+                        continue  # Ocupado por un id explícito: saltar al siguiente
+                    if not self.por_clave.reservar(registro[self.clave], registro):
+                        self.por_id.liberar(registro["id"], registro)
+                        raise Conflicto(self.clave, registro[self.clave])
+                    self._publicar(registro)
+                    break
+        return registro
+
+    def actualizar(self, registro_id: int, cambios: Registro) -> Registro:
+        """Sustituir el registro por una copia con `cambios` aplicados."""
+        with self.escrituras.compartido(), self._candados_registro.para(registro_id):
+            actual = self.por_id.get(registro_id)
+            if actual is None:
+                raise Inexistente(registro_id)
+            nuevo = {**actual, **cambios}
+            clave_anterior, clave_nueva = actual[self.clave], nuevo[self.clave]
+            if clave_nueva != clave_anterior:
+                if not self.por_clave.reservar(clave_nueva, nuevo):
+                    raise Conflicto(self.clave, clave_nueva)
+                self.por_clave.liberar(clave_anterior, actual)
+            else:
+                self.por_clave.reemplazar(clave_anterior, actual, nuevo)
+            self.por_id.reemplazar(registro_id, actual, nuevo)
+            self._sustituir(actual, nuevo)
+        return nuevo
+
+    def eliminar(self, registro_id: int) -> Registro:
+        """Quitar un registro; devuelve el registro eliminado."""
+        with self.escrituras.compartido(), self._candados_registro.para(registro_id):
+            actual = self.por_id.get(registro_id)
+            if actual is None:
+                raise Inexistente(registro_id)
+            self._retirar(actual)
+            self.por_id.liberar(registro_id, actual)
+            self.por_clave.liberar(actual[self.clave], actual)
+        return actual
+
+    def cargar_muchos(self, registros: List[Registro]) -> List[Tuple[int, Conflicto]]:
+        """
+        Alta masiva: unicidad comprobada una vez por registro y una sola
+        foto nueva.
+
+        Returns:
+            Pares (posición en `registros`, conflicto) de los rechazados
+        """
+        aceptados: List[Registro] = []
+        rechazados: List[Tuple[int, Conflicto]] = []
+        with self.escrituras.exclusivo():
+            for posicion, registro in enumerate(registros):
+                if registro["id"] is not None:
+                    if not self.por_id.reservar(registro["id"], registro):
+                        rechazados.append((posicion, Conflicto("id", registro["id"])))
+                        continue
+                else:
+                    registro["id"] = self._ids.siguiente()
+                    while not self.por_id.reservar(registro["id"], registro):
+                        registro["id"] = self._ids.siguiente()
+                if not self.por_clave.reservar(registro[self.clave], registro):
+                    self.por_id.liberar(registro["id"], registro)
+                    rechazados.append((posicion, Conflicto(self.clave, registro[self.clave])))
+                    continue
+                aceptados.append(registro)
+
+            with self._editar() as trozos:
+                self._extender(trozos, aceptados)
+            for indice in self.indices_secundarios:
+                indice.agregar_muchos(aceptados)
+        return rechazados
+
+    # ------------------------------------------------------------------
+    # Lecturas aisladas
+    # ------------------------------------------------------------------
+
+    def snapshot(self, version: Optional[int] = None) -> Tuple[int, Foto]:
+        """
+        Foto inmutable del almacén: (versión, registros).
+
+        Sin `version` se fija la publicada. Con `version` se devuelve la foto
+        conservada; si ya expiró (y el almacén cambió) se lanza CursorInvalido.
+        """
+        ahora = time.monotonic()
+        foto = self._foto
+        with self._candado_snapshots:
+            for vieja, (uso, _) in list(self._snapshots.items()):
+                if ahora - uso > TTL_SNAPSHOTS:
+                    del self._snapshots[vieja]
+            if version is not None and version != foto.version:
+                conservada = self._snapshots.get(version)
+                if conservada is None:
+                    raise CursorInvalido(f"La versión {version} ya no está disponible")
+                foto = conservada[1]
+            self._snapshots[foto.version] = (ahora, foto)
+            self._snapshots.move_to_end(foto.version)
+            while len(self._snapshots) > MAX_SNAPSHOTS:
+                self._snapshots.popitem(last=False)
+        return foto.version, foto
+
+    def pagina(
+        self, cursor: Optional[str] = None, skip: int = 0, limit: int = 100
+    ) -> Tuple[List[Registro], Optional[str]]:
+        """
+        Página de una foto fija y cursor de la siguiente (None si no hay más).
+
+        Sin `cursor` se fija la versión actual y se empieza en `skip`; con
+        `cursor` se continúa en la versión y posición que este indica.
+        """
+        version: Optional[int] = None
+        if cursor:
+            version, skip = decodificar_cursor(cursor)
+        version, registros = self.snapshot(version)
+        pagina = registros[skip : skip + limit]
+        fin = skip + len(pagina)
+        siguiente = codificar_cursor(version, fin) if fin < len(registros) else None
+        return list(pagina), siguiente
+
+    def transaccion(self) -> "Transaccion":
+        """Nueva transacción; debe usarse con `escrituras.exclusivo()` tomado."""
+        return Transaccion(self)
+
+
+class Transaccion:
+    """
+    Cambios pendientes sobre un Almacen.
+
+    Cada operación se aplica sobre una vista privada (el estado confirmado
+    más los cambios previos de la transacción), así que un intercambio de
+    claves entre dos registros es válido: la unicidad se comprueba en
+    `verificar` sobre el estado final. Todo el ciclo (operaciones, verificar,
+    aplicar) debe ocurrir con el almacén en modo exclusivo.
+    """
+
+    def __init__(self, almacen: Almacen):
+        self.almacen = almacen
+        # id -> registro confirmado antes de la transacción (None si no existía)
+        self._originales: Dict[int, Optional[Registro]] = {}
+        # id -> estado final (None si queda eliminado)
+        self._finales: Dict[int, Optional[Registro]] = {}
+
+    def _actual(self, registro_id: int) -> Optional[Registro]:
+        if registro_id in self._finales:
+            return self._finales[registro_id]
+        return self.almacen.por_id.get(registro_id)
+
+    def _escribir(self, registro_id: int, registro: Optional[Registro]) -> None:
+        if registro_id not in self._originales:
+            self._originales[registro_id] = self.almacen.por_id.get(registro_id)
+        self._finales[registro_id] = registro
+
+    def crear(self, datos: Registro) -> Registro:
+        registro = dict(datos)
+        if registro.get("id") is None:
+            registro["id"] = self.almacen._ids.siguiente()
+            while registro["id"] in self._finales or registro["id"] in self.almacen.por_id:
+                registro["id"] = self.almacen._ids.siguiente()
+        elif self._actual(registro["id"]) is not None:
+            raise Conflicto("id", registro["id"])
+        self._escribir(registro["id"], registro)
+        return registro
+
+    def actualizar(self, registro_id: int, cambios: Registro) -> Registro:
+        actual = self._actual(registro_id)
+        if actual is None:
+            raise Inexistente(registro_id)
+        nuevo = {**actual, **cambios}
+        self._escribir(registro_id, nuevo)
+        return nuevo
+
+    def eliminar(self, registro_id: int) -> Registro:
+        actual = self._actual(registro_id)
+        if actual is None:
+            raise Inexistente(registro_id)
+        self._escribir(registro_id, None)
+        return actual
+
+    def verificar(self) -> None:
+        """Comprobar la unicidad de la clave sobre el estado final."""
+        clave = self.almacen.clave
+        vistos: Dict[Any, int] = {}
+        for registro_id, final in self._finales.items():
+            if final is None:
+                continue
+            valor = final[clave]
+            titular = self.almacen.por_clave.get(valor)
+            if valor in vistos or (titular is not None and titular["id"] not in self._finales):
+                raise Conflicto(clave, valor)
+            vistos[valor] = registro_id
+
+    def aplicar(self) -> None:
+        """Publicar los cambios (tras `verificar`); no puede fallar a medias."""
+        almacen = self.almacen
+        if not self._finales:
+            return
+        # Los lectores consultan los índices sin candado: cada entrada se
+        # sobrescribe en su sitio y solo se quitan las claves que
+        # desaparecen, así una clave que existe antes y después (p. ej. en
+        # un intercambio) nunca falta.
+        for registro_id, final in self._finales.items():
+            if final is not None:
+                almacen.por_id.asignar(registro_id, final)
+                almacen.por_clave.asignar(final[almacen.clave], final)
+        for registro_id, original in self._originales.items():
+            if original is not None:
+                if self._finales[registro_id] is None:
+                    almacen.por_id.liberar(registro_id, original)
+                # Si otro registro de la transacción tomó la clave, ya no
+                # apunta a `original` y liberar no la quita
+                almacen.por_clave.liberar(original[almacen.clave], original)
+        # Todos los cambios de la lista en una sola foto
+        with almacen._editar() as trozos:
+            for registro_id, final in self._finales.items():
+                original = self._originales[registro_id]
+                if original is not None and final is not None:
+                    almacen._reemplazar(trozos, original, final)
+                elif original is not None:
+                    almacen._quitar(trozos, original)
+                elif final is not None:
+                    almacen._extender(trozos, [final])
+        for registro_id, final in self._finales.items():
+            original = self._originales[registro_id]
+            for indice in almacen.indices_secundarios:
+                if original is not None and final is not None:
+                    indice.actualizar(final)
+                elif original is not None:
+                    indice.eliminar(original)
+                elif final is not None:
+                    indice.agregar(final)
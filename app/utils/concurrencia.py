@@ -0,0 +1,157 @@
+"""
+Primitivas de concurrencia para los almacenes en memoria.
+
+Permiten que varias peticiones escriban a la vez (threadpool de FastAPI,
+Python sin GIL) sin perder incrementos de ID ni duplicar claves únicas:
+
+    - IndiceUnico: dict clave -> registro con reserva atómica de claves
+      usando candados por franja (lock striping por hash de la clave).
+      Las lecturas (get / in) no toman candado.
+    - AsignadorIds: generador atómico de IDs consecutivos.
+    - CandadosFranjas: conjunto fijo de candados indexado por hash, para
+      serializar escrituras sobre un mismo registro.
+    - CandadoEscrituras: modo compartido (escrituras simples) / exclusivo
+      (transacciones) sobre un almacén completo.
+
+Configuración por variables de entorno:
+    ALMACEN_CONCURRENTE "0" para que app.services.asincrono serialice todas
+                      las escrituras de cada servicio (default "1")
+    ALMACEN_FRANJAS   Número de candados por índice (default 16).
+                      Con 1 todas las escrituras de un índice se serializan.
+"""
+
+import itertools
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Hashable, Iterator, Optional
+
+MODO_CONCURRENTE = os.getenv("ALMACEN_CONCURRENTE", "1") != "0"
+FRANJAS_POR_DEFECTO = int(os.getenv("ALMACEN_FRANJAS", "16"))
+
+
+class CandadosFranjas:
+    """Candados por franja: claves con el mismo hash módulo N comparten candado."""
+
+    def __init__(self, franjas: Optional[int] = None):
+        self._candados = [threading.Lock() for _ in range(franjas or FRANJAS_POR_DEFECTO)]
+
+    def para(self, clave: Hashable) -> threading.Lock:
+        return self._candados[hash(clave) % len(self._candados)]
+
+
+class IndiceUnico:
+    """Índice clave -> registro con restricción de unicidad."""
+
+    def __init__(self, franjas: Optional[int] = None):
+        self._datos: Dict[Hashable, Dict[str, Any]] = {}
+        self._franjas = CandadosFranjas(franjas)
+
+    def candado(self, clave: Hashable) -> threading.Lock:
+        """Candado de la franja que protege `clave`."""
+        return self._franjas.para(clave)
+
+    def get(self, clave: Hashable) -> Optional[Dict[str, Any]]:
+        return self._datos.get(clave)
+
+    def __contains__(self, clave: Hashable) -> bool:
+        return clave in self._datos
+
+    def __len__(self) -> int:
+        return len(self._datos)
+
+    def bytes_estructura(self) -> int:
+        """Bytes de la tabla hash (sin contar claves ni registros)."""
+        return sys.getsizeof(self._datos)
+
+    def reservar(self, clave: Hashable, registro: Dict[str, Any]) -> bool:
+        """Asociar `clave` a `registro` si está libre; devuelve False si ya existe."""
+        with self.candado(clave):
+            if clave in self._datos:
+                return False
+            self._datos[clave] = registro
+            return True
+
+    def reemplazar(
+        self, clave: Hashable, anterior: Dict[str, Any], nuevo: Dict[str, Any]
+    ) -> bool:
+        """Apuntar `clave` a `nuevo` solo si sigue apuntando a `anterior`."""
+        with self.candado(clave):
+            if self._datos.get(clave) is not anterior:
+                return False
+            self._datos[clave] = nuevo
+            return True
+
+    def asignar(self, clave: Hashable, registro: Dict[str, Any]) -> None:
+        """Apuntar `clave` a `registro` sin condiciones (la clave nunca falta)."""
+        with self.candado(clave):
+            self._datos[clave] = registro
+
+    def liberar(self, clave: Hashable, registro: Dict[str, Any]) -> bool:
+        """Quitar `clave` solo si sigue apuntando a `registro`."""
+        with self.candado(clave):
+            if self._datos.get(clave) is not registro:
+                return False
+            del self._datos[clave]
+            return True
+
+
+class AsignadorIds:
+    """Asignador atómico de IDs enteros consecutivos."""
+
+    def __init__(self, inicio: int = 1):
+        self._contador = itertools.count(inicio)
+        self._candado = threading.Lock()
+
+    def siguiente(self) -> int:
+        with self._candado:
+            return next(self._contador)
+
+
+class CandadoEscrituras:
+    """
+    Candado compartido/exclusivo para las escrituras de un almacén.
+
+    Las escrituras de un solo registro lo toman en modo compartido (entre
+    ellas ya se coordinan con candados por franja); las transacciones y la
+    carga masiva lo toman en modo exclusivo. Los lectores no lo usan nunca.
+    Mientras un exclusivo espera no entran nuevas escrituras compartidas.
+    """
+
+    def __init__(self):
+        self._condicion = threading.Condition()
+        self._compartidas = 0
+        self._exclusiva = False
+        self._esperando = 0
+
+    @contextmanager
+    def compartido(self) -> Iterator[None]:
+        with self._condicion:
+            while self._exclusiva or self._esperando:
+                self._condicion.wait()
+            self._compartidas += 1
+        try:
+            yield
+        finally:
+            with self._condicion:
+                self._compartidas -= 1
+                if not self._compartidas:
+                    self._condicion.notify_all()
+
+    @contextmanager
+    def exclusivo(self) -> Iterator[None]:
+        with self._condicion:
+            self._esperando += 1
+            try:
+                while self._exclusiva or self._compartidas:
+                    self._condicion.wait()
+            finally:
+                self._esperando -= 1
+            self._exclusiva = True
+        try:
+            yield
+        finally:
+            with self._condicion:
+                self._exclusiva = False
+                self._condicion.notify_all()
@@ -5,6 +5,9 @@ Decisión sobre códigos HTTP:
     - 400 Bad Request: Para errores de validación general
     - 422 Unprocessable Entity: Para errores específicos de Pydantic (alternativa a 400)
     - 404 Not Found: Recurso no existe
+    - 410 Gone: Versión pasada que ya no se conserva (historial recortado)
+    - 406 Not Acceptable: No se puede responder en ningún formato aceptado
+    - 415 Unsupported Media Type: Formato del cuerpo no soportado
     - 409 Conflict: Conflictos de unicidad (e.g., matrícula/numeroEmpleado duplicados)
     - 500 Internal Server Error: Errores no controlados
 
@@ -55,6 +58,27 @@ class ConflictError(APIException):
         super().__init__(message, status.HTTP_409_CONFLICT, detail)
 
 
+class GoneError(APIException):
+    """Excepción para versiones que ya no se conservan (410)."""
+    
+    def __init__(self, message: str, detail: Optional[str] = None):
+        super().__init__(message, status.HTTP_410_GONE, detail)
+
+
+class NotAcceptableError(APIException):
+    """Excepción para formatos de respuesta no disponibles (406)."""
+    
+    def __init__(self, message: str, detail: Optional[str] = None):
+        super().__init__(message, status.HTTP_406_NOT_ACCEPTABLE, detail)
+
+
+class UnsupportedMediaTypeError(APIException):
+    """Excepción para formatos de cuerpo no soportados (415)."""
+    
+    def __init__(self, message: str, detail: Optional[str] = None):
+        super().__init__(message, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail)
+
+
 class ServerError(APIException):
     """Excepción para errores del servidor (500)."""
     
@@ -90,6 +114,45 @@ async def not_found_error_handler(request: Request, exc: NotFoundError) -> JSONR
     )
 
 
+async def gone_error_handler(request: Request, exc: GoneError) -> JSONResponse:
+    """Manejo de versiones que ya no se conservan."""
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={
+            "error": "Gone",
+            "message": exc.message,
+            "detail": exc.detail,
+            "path": str(request.url.path),
+        },
+    )
+
+
+async def not_acceptable_error_handler(request: Request, exc: NotAcceptableError) -> JSONResponse:
+    """Manejo de formatos de respuesta no disponibles."""
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={
+            "error": "Not Acceptable",
+            "message": exc.message,
+            "detail": exc.detail,
+            "path": str(request.url.path),
+        },
+    )
+
+
+async def unsupported_media_type_error_handler(request: Request, exc: UnsupportedMediaTypeError) -> JSONResponse:
+    """Manejo de formatos de cuerpo no soportados."""
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={
+            "error": "Unsupported Media Type",
+            "message": exc.message,
+            "detail": exc.detail,
+            "path": str(request.url.path),
+        },
+    )
+
+
 async def server_error_handler(request: Request, exc: ServerError) -> JSONResponse:
     """Manejo de errores del servidor."""
     return JSONResponse(
@@ -0,0 +1,103 @@
+"""
+Exportación de una tabla completa en formato Apache Arrow IPC (stream).
+
+Pensado para cargas analíticas (pandas, DuckDB, Polars): en lugar de paginar
+JSON, el cliente recibe lotes de columnas que lee sin parsear texto.
+
+    - Los registros salen de una foto fija del almacén (ver Almacen.snapshot):
+      el export es consistente aunque haya escrituras mientras se envía.
+    - Cada lote se arma por columnas directamente desde los registros del
+      almacén, sin crear dicts ni modelos por fila. Las columnas numéricas
+      se llenan en un `array.array` y Arrow usa esa memoria tal cual
+      (Array.from_buffers, sin copiar); las de texto se codifican a UTF-8.
+    - La respuesta se envía lote a lote (StreamingResponse): la memoria
+      extra es la de un lote, no la de la tabla entera. El esquema lleva la
+      versión del almacén en sus metadatos (`version_almacen`).
+
+`pyarrow` es una dependencia opcional: si no está instalada, el export
+responde 406 (no hay forma de entregar el formato pedido).
+
+Configuración por variables de entorno:
+    EXPORTACION_FILAS_POR_LOTE   Filas por record batch (default 65536)
+"""
+
+import os
+from array import array
+from typing import Any, Dict, Iterator, Sequence
+
+from fastapi.responses import StreamingResponse
+
+from .exceptions import NotAcceptableError
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - dependencia opcional
+    pa = None
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+FILAS_POR_LOTE = max(1, int(os.getenv("EXPORTACION_FILAS_POR_LOTE", "65536")))
+
+# Marca de fin de stream IPC: continuación + longitud de metadatos 0
+_FIN_STREAM = b"\xff\xff\xff\xff\x00\x00\x00\x00"
+
+# Tipo de columna -> (tipo Arrow, código de array.array; None = texto)
+_TIPOS = {
+    "int64": ("int64", "q"),
+    "float64": ("float64", "d"),
+    "string": ("string", None),
+}
+
+Registro = Dict[str, Any]
+
+
+def _columna(registros: Sequence[Registro], campo: str, tipo: str) -> "pa.Array":
+    tipo_arrow, codigo = _TIPOS[tipo]
+    if codigo is None:
+        return pa.array([r[campo] for r in registros], type=pa.string())
+    valores = array(codigo, [r[campo] for r in registros])
+    # Sin copia: el buffer de Arrow apunta a la memoria de `valores`
+    return pa.Array.from_buffers(getattr(pa, tipo_arrow)(), len(valores), [None, pa.py_buffer(valores)])
+
+
+def esquema(columnas: Dict[str, str], version: int) -> "pa.Schema":
+    return pa.schema(
+        [(campo, getattr(pa, _TIPOS[tipo][0])()) for campo, tipo in columnas.items()],
+        metadata={"version_almacen": str(version)},
+    )
+
+
+def lotes_arrow(registros: Sequence[Registro], columnas: Dict[str, str], version: int) -> Iterator[bytes]:
+    """Mensajes IPC del stream: esquema, un record batch por lote y fin."""
+    schema = esquema(columnas, version)
+    yield schema.serialize().to_pybytes()
+    for inicio in range(0, len(registros), FILAS_POR_LOTE):
+        lote = registros[inicio : inicio + FILAS_POR_LOTE]
+        batch = pa.RecordBatch.from_arrays(
+            [_columna(lote, campo, tipo) for campo, tipo in columnas.items()], schema=schema
+        )
+        yield batch.serialize().to_pybytes()
+    yield _FIN_STREAM
+
+
+def respuesta_arrow(
+    registros: Sequence[Registro], columnas: Dict[str, str], version: int, nombre: str
+) -> StreamingResponse:
+    """
+    Respuesta con la tabla `registros` como stream Arrow IPC.
+
+    Args:
+        registros: foto del almacén (no se modifica mientras se envía)
+        columnas: campo -> tipo ("int64", "float64" o "string"), en orden
+        version: versión del almacén de la foto
+        nombre: nombre del archivo sugerido al cliente
+    """
+    if pa is None:
+        raise NotAcceptableError(
+            "Arrow no disponible",
+            "El servidor no tiene instalado el paquete pyarrow; usar GET con paginación en JSON",
+        )
+    return StreamingResponse(
+        lotes_arrow(registros, columnas, version),
+        media_type=ARROW_STREAM,
+        headers={"Content-Disposition": f'attachment; filename="{nombre}.arrow"'},
+    )
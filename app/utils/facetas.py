@@ -0,0 +1,209 @@
+"""
+Índice de facetas basado en bitmaps.
+
+Cada registro ocupa una posición (slot) fija; por cada faceta y valor se
+mantiene un bitmap (un `int` de Python usado como conjunto de bits) con los
+slots de los registros que tienen ese valor. Contar bajo una combinación de
+filtros es un OR de los valores pedidos dentro de cada faceta, un AND entre
+facetas y un `bit_count()` por valor: no se recorre ningún registro.
+
+Los `int` son inmutables: cambiar un bit crea un bitmap nuevo del tamaño de
+la tabla, O(n). Por eso las altas, cambios y bajas sueltas no tocan los
+bitmaps. Solo anotan el cambio de bit como pendiente (O(1)), y los
+pendientes se fusionan de una vez, con una máscara por bitmap, antes de
+cada conteo o al llegar a PENDIENTES_MAX. Una ráfaga de k escrituras cuesta
+un O(n) por bitmap tocado y no k. Las cargas masivas arman los bits en
+bytearrays y crean cada bitmap una sola vez.
+
+Los servicios mantienen el índice en crear/actualizar/eliminar/cargar.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+Registro = Dict[str, Any]
+
+# Cambios de bits sueltos acumulados antes de fusionarlos en los bitmaps
+PENDIENTES_MAX = 4096
+
+# Clave de los cambios pendientes del bitmap de todos los registros
+_TODOS = ("", "")
+
+
+class IndiceFacetas:
+    """Bitmaps por (faceta, valor) actualizados de forma incremental."""
+
+    def __init__(
+        self,
+        facetas: Dict[str, Callable[[Registro], str]],
+        valores_fijos: Optional[Dict[str, List[str]]] = None,
+    ):
+        """
+        Args:
+            facetas: nombre de faceta -> función que da el valor de un registro
+            valores_fijos: valores que se reportan siempre (aunque cuenten 0)
+        """
+        self._facetas = facetas
+        self._valores_fijos = valores_fijos or {}
+        self._bitmaps: Dict[str, Dict[str, int]] = {nombre: {} for nombre in facetas}
+        self._slots: Dict[int, int] = {}
+        self._valores: Dict[int, Dict[str, str]] = {}
+        self._libres: List[int] = []
+        self._siguiente_slot = 0
+        self._todos = 0
+        # (faceta, valor) -> slot -> encender (True) o apagar (False)
+        self._pendientes: Dict[Tuple[str, str], Dict[int, bool]] = {}
+        self._cantidad_pendientes = 0
+        self._candado = threading.Lock()
+
+    def _valores_de(self, registro: Registro) -> Dict[str, str]:
+        return {nombre: funcion(registro) for nombre, funcion in self._facetas.items()}
+
+    def _marcar(self, clave: Tuple[str, str], slot: int, encendido: bool) -> None:
+        """Anotar un cambio de bit; el último cambio de cada slot es el que vale."""
+        self._pendientes.setdefault(clave, {})[slot] = encendido
+        self._cantidad_pendientes += 1
+        if self._cantidad_pendientes >= PENDIENTES_MAX:
+            self._fusionar()
+
+    def _aplicar(self, clave: Tuple[str, str], encender: int, apagar: int = 0) -> None:
+        if clave == _TODOS:
+            self._todos = (self._todos & ~apagar) | encender
+            return
+        faceta, valor = clave
+        bitmaps = self._bitmaps[faceta]
+        bitmap = (bitmaps.get(valor, 0) & ~apagar) | encender
+        if bitmap or valor in self._valores_fijos.get(faceta, ()):
+            bitmaps[valor] = bitmap
+        else:
+            bitmaps.pop(valor, None)
+
+    def _fusionar(self) -> None:
+        """Aplicar los cambios pendientes: un solo bitmap nuevo por (faceta, valor)."""
+        for clave, cambios in self._pendientes.items():
+            encender, apagar = bytearray(), bytearray()
+            for slot, encendido in cambios.items():
+                _marcar_bit(encender if encendido else apagar, slot)
+            self._aplicar(clave, int.from_bytes(encender, "little"), int.from_bytes(apagar, "little"))
+        self._pendientes = {}
+        self._cantidad_pendientes = 0
+
+    def agregar(self, registro: Registro) -> None:
+        with self._candado:
+            slot = self._libres.pop() if self._libres else self._nuevo_slot()
+            valores = self._valores_de(registro)
+            self._slots[registro["id"]] = slot
+            self._valores[registro["id"]] = valores
+            self._marcar(_TODOS, slot, True)
+            for faceta, valor in valores.items():
+                self._marcar((faceta, valor), slot, True)
+
+    def agregar_muchos(self, registros: Iterable[Registro]) -> None:
+        """Alta masiva: acumula los bits en bytearrays y crea cada bitmap una vez."""
+        with self._candado:
+            # Los slots reutilizados pueden tener bajas pendientes
+            self._fusionar()
+            acumulados: Dict[str, Dict[str, bytearray]] = {f: {} for f in self._facetas}
+            todos = bytearray()
+            for registro in registros:
+                slot = self._libres.pop() if self._libres else self._nuevo_slot()
+                valores = self._valores_de(registro)
+                self._slots[registro["id"]] = slot
+                self._valores[registro["id"]] = valores
+                _marcar_bit(todos, slot)
+                for faceta, valor in valores.items():
+                    bits = acumulados[faceta].get(valor)
+                    if bits is None:
+                        bits = acumulados[faceta][valor] = bytearray()
+                    _marcar_bit(bits, slot)
+            for faceta, por_valor in acumulados.items():
+                for valor, bits in por_valor.items():
+                    self._aplicar((faceta, valor), int.from_bytes(bits, "little"))
+            self._aplicar(_TODOS, int.from_bytes(todos, "little"))
+
+    def actualizar(self, registro: Registro) -> None:
+        with self._candado:
+            slot = self._slots.get(registro["id"])
+            if slot is None:
+                return
+            anteriores = self._valores[registro["id"]]
+            nuevos = self._valores_de(registro)
+            for faceta, valor in nuevos.items():
+                if anteriores[faceta] != valor:
+                    self._marcar((faceta, anteriores[faceta]), slot, False)
+                    self._marcar((faceta, valor), slot, True)
+            self._valores[registro["id"]] = nuevos
+
+    def eliminar(self, registro: Registro) -> None:
+        with self._candado:
+            slot = self._slots.pop(registro["id"], None)
+            if slot is None:
+                return
+            for faceta, valor in self._valores.pop(registro["id"]).items():
+                self._marcar((faceta, valor), slot, False)
+            self._marcar(_TODOS, slot, False)
+            self._libres.append(slot)
+
+    def _nuevo_slot(self) -> int:
+        slot = self._siguiente_slot
+        self._siguiente_slot += 1
+        return slot
+
+    def contar(self, filtros: Optional[Dict[str, List[str]]] = None) -> Dict[str, Any]:
+        """
+        Contar registros por valor de cada faceta bajo `filtros`.
+
+        `filtros` es faceta -> valores aceptados: OR dentro de una faceta y
+        AND entre facetas. Los conteos de cada valor se calculan sobre el
+        conjunto ya filtrado.
+        """
+        with self._candado:
+            self._fusionar()
+            bitmaps = {f: dict(por_valor) for f, por_valor in self._bitmaps.items()}
+            seleccion = self._todos
+        for faceta, valores in (filtros or {}).items():
+            union = 0
+            for valor in valores:
+                union |= bitmaps[faceta].get(valor, 0)
+            seleccion &= union
+
+        conteos: Dict[str, Dict[str, int]] = {}
+        for faceta, por_valor in bitmaps.items():
+            conteos[faceta] = {valor: 0 for valor in self._valores_fijos.get(faceta, ())}
+            for valor in sorted(por_valor):
+                conteos[faceta][valor] = (por_valor[valor] & seleccion).bit_count()
+        return {"total": seleccion.bit_count(), "facetas": conteos}
+
+
+def _marcar_bit(bits: bytearray, posicion: int) -> None:
+    byte = posicion >> 3
+    if byte >= len(bits):
+        # Crecimiento geométrico para que la alta masiva sea lineal
+        bits.extend(bytes(max(byte + 1 - len(bits), len(bits))))
+    bits[byte] |= 1 << (posicion & 7)
+
+
+def inicial(campo: str) -> Callable[[Registro], str]:
+    """Faceta: primera letra (en mayúscula) de un campo de texto."""
+    def valor(registro: Registro) -> str:
+        texto = registro[campo]
+        return texto[0].upper() if texto else ""
+
+    return valor
+
+
+def bandas(campo: str, limites: List[float], etiquetas: List[str]) -> Callable[[Registro], str]:
+    """
+    Faceta: banda de un campo numérico.
+
+    `limites` son los cortes superiores (exclusivos) de cada banda salvo la
+    última, que recibe todo lo demás: len(etiquetas) == len(limites) + 1.
+    """
+    def valor(registro: Registro) -> str:
+        numero = registro[campo]
+        for limite, etiqueta in zip(limites, etiquetas):
+            if numero < limite:
+                return etiqueta
+        return etiquetas[-1]
+
+    return valor
@@ -0,0 +1,208 @@
+"""
+Negociación de formato: JSON (por defecto) o MessagePack.
+
+    - Respuestas: con `Accept: application/msgpack` (con q > 0 y no menor
+      que la de JSON) las rutas de lectura masiva codifican directamente los
+      registros crudos del almacén (`respuesta_cruda`); en el resto de
+      rutas RutaMsgpack empaqueta el valor ya serializado por FastAPI
+      (RespuestaNegociada) en lugar de codificarlo como JSON.
+    - Peticiones: un cuerpo `Content-Type: application/msgpack` se decodifica
+      en RutaMsgpack y el objeto resultante llega a la validación de Pydantic
+      como si fuera el JSON ya parseado (sin pasar por texto JSON). Un cuerpo
+      corrupto es un 400 con la forma habitual de ValidationError.
+
+`msgpack` es una dependencia opcional: si no está instalada, se responde JSON
+(406 si Accept no admite JSON) y los cuerpos MessagePack se rechazan con 415.
+"""
+
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+from fastapi import Header, Request
+from fastapi.datastructures import Default, DefaultPlaceholder
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from .exceptions import NotAcceptableError, UnsupportedMediaTypeError, ValidationError
+from .proyeccion import respuesta_proyectada
+from .tiempos import JSONResponseMedida, RutaMedida, fase
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - dependencia opcional
+    msgpack = None
+
+MSGPACK = "application/msgpack"
+JSON = "application/json"
+_TIPOS_MSGPACK = (MSGPACK, "application/x-msgpack")
+
+# Formato de respuesta negociado para la petición en curso (ver RutaMsgpack)
+_formato: ContextVar[str] = ContextVar("formato", default=JSON)
+
+
+def _tipos_con_calidad(cabecera: str) -> Dict[str, float]:
+    """Media types de una cabecera Accept con su q (1 si no se indica)."""
+    tipos: Dict[str, float] = {}
+    for rango in cabecera.split(","):
+        tipo, *parametros = rango.split(";")
+        tipo = tipo.strip().lower()
+        if not tipo:
+            continue
+        calidad = 1.0
+        for parametro in parametros:
+            nombre, _, valor = parametro.partition("=")
+            if nombre.strip().lower() == "q":
+                try:
+                    calidad = min(max(float(valor), 0.0), 1.0)
+                except ValueError:
+                    calidad = 0.0
+        tipos[tipo] = calidad
+    return tipos
+
+
+def _es_msgpack(content_type: Optional[str]) -> bool:
+    """Content-Type MessagePack (el media type exacto, sin parámetros)."""
+    return bool(content_type) and content_type.split(";", 1)[0].strip().lower() in _TIPOS_MSGPACK
+
+
+@lru_cache(maxsize=256)
+def _calidades(accept: str) -> Tuple[float, float]:
+    """
+    q de MessagePack y de JSON en Accept. La de JSON es la del tipo más
+    específico que cubra application/json; los comodines solos no piden
+    MessagePack porque JSON es el formato por defecto.
+    """
+    tipos = _tipos_con_calidad(accept)
+    calidad = max(tipos.get(tipo, 0.0) for tipo in _TIPOS_MSGPACK)
+    calidad_json = next(
+        (tipos[tipo] for tipo in (JSON, "application/*", "*/*") if tipo in tipos), 0.0
+    )
+    return calidad, calidad_json
+
+
+def acepta_msgpack(accept: Optional[str]) -> bool:
+    """Accept pide MessagePack con q > 0 y al menos la misma calidad que JSON."""
+    if msgpack is None or not accept:
+        return False
+    calidad, calidad_json = _calidades(accept)
+    return calidad > 0 and calidad >= calidad_json
+
+
+def _solo_msgpack(accept: Optional[str]) -> bool:
+    """Accept pide MessagePack y no admite JSON."""
+    if not accept:
+        return False
+    calidad, calidad_json = _calidades(accept)
+    return calidad > 0 and calidad_json == 0
+
+
+async def formato_respuesta(accept: Optional[str] = Header(None)) -> str:
+    """Dependencia: tipo de contenido de respuesta negociado a partir de Accept."""
+    return MSGPACK if acepta_msgpack(accept) else JSON
+
+
+def _proyectar(registro: dict, campos: Optional[Tuple[str, ...]]) -> dict:
+    return registro if not campos else {c: registro[c] for c in campos}
+
+
+def respuesta_cruda(
+    datos: Any,
+    modelo: Type[BaseModel],
+    campos: Optional[Tuple[str, ...]],
+    forma: str = "lista",
+    formato: str = JSON,
+    status_code: int = 200,
+) -> Response:
+    """
+    Codificar registros crudos del almacén en el formato negociado.
+
+    Con JSON requiere `campos` (ver respuesta_proyectada); con MessagePack
+    los registros se empaquetan tal cual (o proyectados si hay `campos`).
+    """
+    with fase("serializacion"):
+        if formato != MSGPACK:
+            return respuesta_proyectada(datos, modelo, campos, forma, status_code)
+        if forma == "item":
+            contenido = _proyectar(datos, campos)
+        elif forma == "lista":
+            contenido = [_proyectar(r, campos) for r in datos]
+        else:
+            contenido = {**datos, "encontrados": [_proyectar(r, campos) for r in datos["encontrados"]]}
+        return Response(msgpack.packb(contenido), status_code=status_code, media_type=MSGPACK)
+
+
+async def _request_decodificada(request: Request) -> Request:
+    """
+    Request con el cuerpo MessagePack ya decodificado: FastAPI toma el cuerpo
+    de request.json() (Content-Type pasa a ser JSON), que devuelve el objeto
+    cacheado en lugar de parsear texto.
+    """
+    if msgpack is None:
+        raise UnsupportedMediaTypeError(
+            "MessagePack no disponible",
+            "El servidor no tiene instalado el paquete msgpack; enviar el cuerpo como application/json",
+        )
+    crudo = await request.body()
+    decodificada = Request(_scope_como_json(request.scope), request.receive)
+    decodificada._body = crudo
+    if crudo:
+        with fase("decodificacion"):
+            try:
+                decodificada._json = msgpack.unpackb(crudo)
+            except Exception:
+                raise ValidationError(
+                    "Cuerpo MessagePack inválido",
+                    "No se pudo decodificar el cuerpo como MessagePack",
+                )
+    return decodificada
+
+
+def _scope_como_json(scope: dict) -> dict:
+    cabeceras = [(k, v) for k, v in scope["headers"] if k != b"content-type"]
+    cabeceras.append((b"content-type", JSON.encode()))
+    return {**scope, "headers": cabeceras}
+
+
+class RespuestaNegociada(JSONResponseMedida):
+    """
+    Respuesta de las rutas con response_model: JSON, o MessagePack si se
+    negoció. Recibe el contenido ya serializado por FastAPI
+    (jsonable_encoder), que se empaqueta directamente.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if _formato.get() != MSGPACK:
+            return super().render(content)
+        self.media_type = MSGPACK
+        with fase("codificacion"):
+            return msgpack.packb(content)
+
+
+class RutaMsgpack(RutaMedida):
+    """APIRoute que acepta cuerpos MessagePack y responde MessagePack si se pide."""
+
+    def manejador(self) -> Callable:
+        if isinstance(self.response_class, DefaultPlaceholder) and (
+            self.response_class.value is JSONResponseMedida
+        ):
+            self.response_class = Default(RespuestaNegociada)
+        original = super().manejador()
+
+        async def handler(request: Request) -> Response:
+            if msgpack is None and _solo_msgpack(request.headers.get("accept")):
+                raise NotAcceptableError(
+                    "MessagePack no disponible",
+                    "El servidor no tiene instalado el paquete msgpack; aceptar application/json",
+                )
+            if _es_msgpack(request.headers.get("content-type")):
+                request = await _request_decodificada(request)
+            if not acepta_msgpack(request.headers.get("accept")):
+                return await original(request)
+            token = _formato.set(MSGPACK)
+            try:
+                return await original(request)
+            finally:
+                _formato.reset(token)
+
+        return handler
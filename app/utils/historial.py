@@ -0,0 +1,387 @@
+"""
+Historial de cambios por registro y lecturas en el pasado (as_of).
+
+Historial se engancha al almacén como índice derivado (ver
+Almacen.indices_secundarios), así que ve todas las escrituras: altas,
+actualizaciones, bajas, cargas masivas y transacciones. Por registro guarda
+una línea de versiones con su instante:
+
+    - completa: el registro entero. Es la misma referencia inmutable que
+      publica el almacén (copy-on-write), no una copia. Se guarda en el alta
+      y cada HISTORIAL_INTERVALO_COMPLETO versiones;
+    - delta: solo los campos que cambiaron respecto a la versión anterior;
+    - baja: el registro dejó de existir.
+
+Reconstruir un registro en un instante es una búsqueda binaria sobre los
+instantes de su línea más, como mucho, INTERVALO - 1 deltas aplicados sobre
+la completa anterior: O(log versiones).
+
+Listar los registros de un instante (registros_en) no recorre todas las
+líneas. Las líneas se guardan en orden de alta junto con el mínimo de sus
+instantes de alta desde cada posición hasta el final, una lista no
+decreciente. Una búsqueda binaria en ella descarta todas las líneas creadas
+después del instante. De las anteriores se recorren las `skip` primeras
+que existían en ese instante, comprobando solo su existencia, y las `limit`
+de la página: O(skip + limit) búsquedas binarias, más las de las líneas ya
+dadas de baja en ese instante.
+
+Las escrituras y la compactación toman el candado del historial (una
+anotación es O(1)). Las lecturas no lo toman: cada línea publica sus listas
+como una tupla que se sustituye entera al recortarla, y al anotar se agrega
+la entrada antes que su instante.
+
+Si la versión vigente en el instante pedido ya se descartó (recorte por
+MAX_VERSIONES o por la retención) pero el registro existía entonces, las
+lecturas lanzan VersionNoConservada en vez de responder como si no
+existiera.
+
+Retención (variables de entorno):
+    HISTORIAL_MAX_VERSIONES       Versiones conservadas por registro (default 64)
+    HISTORIAL_RETENCION_SEGUNDOS  Antigüedad consultable; lo anterior se
+                                  compacta en la tarea de mantenimiento
+                                  (default 30 días, 0 = sin límite)
+    HISTORIAL_MAX_ELIMINADOS      Registros eliminados cuyo historial se
+                                  conserva (default 10000)
+    HISTORIAL_INTERVALO_COMPLETO  Cada cuántas versiones se guarda una
+                                  completa (default 16)
+"""
+
+import os
+import sys
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+Registro = Dict[str, Any]
+
+MAX_VERSIONES = max(1, int(os.getenv("HISTORIAL_MAX_VERSIONES", "64")))
+RETENCION_SEGUNDOS = float(os.getenv("HISTORIAL_RETENCION_SEGUNDOS", str(30 * 24 * 3600)))
+MAX_ELIMINADOS = int(os.getenv("HISTORIAL_MAX_ELIMINADOS", "10000"))
+INTERVALO_COMPLETO = max(1, int(os.getenv("HISTORIAL_INTERVALO_COMPLETO", "16")))
+
+CREAR, ACTUALIZAR, ELIMINAR = "crear", "actualizar", "eliminar"
+
+# Instante compartido por las escrituras de una transacción (ver instante_comun)
+_instante_comun: ContextVar[Optional[float]] = ContextVar("instante_comun", default=None)
+
+
+def a_instante(fecha: datetime) -> float:
+    """Segundos desde epoch; una fecha sin zona horaria se interpreta como UTC."""
+    if fecha.tzinfo is None:
+        fecha = fecha.replace(tzinfo=timezone.utc)
+    return fecha.timestamp()
+
+
+def a_fecha(instante: float) -> str:
+    return datetime.fromtimestamp(instante, timezone.utc).isoformat()
+
+
+@contextmanager
+def instante_comun() -> Iterator[float]:
+    """Registrar todas las escrituras del bloque con el mismo instante."""
+    instante = time.time()
+    token = _instante_comun.set(instante)
+    try:
+        yield instante
+    finally:
+        _instante_comun.reset(token)
+
+
+class VersionNoConservada(Exception):
+    """El registro existía en el instante pedido pero esa versión ya se descartó."""
+
+    def __init__(self, registro_id: int, instante: float):
+        self.registro_id = registro_id
+        self.instante = instante
+        super().__init__(f"La versión del registro {registro_id} en {a_fecha(instante)} ya no se conserva")
+
+
+class Entrada(NamedTuple):
+    operacion: str
+    completa: bool  # True: `datos` es el registro entero (o None en una baja)
+    datos: Optional[Registro]
+
+
+class Tramo(NamedTuple):
+    """Versiones conservadas de una línea; se sustituye entero al recortar."""
+
+    primera: int  # número de versión de entradas[0]
+    instantes: List[float]
+    entradas: List[Entrada]
+
+
+class _Linea:
+    __slots__ = ("tramo", "actual", "desde_completa", "creada")
+
+    def __init__(self, creada: float):
+        self.tramo = Tramo(1, [], [])
+        self.actual: Optional[Registro] = None
+        self.desde_completa = 0
+        self.creada = creada
+
+
+class Altas(NamedTuple):
+    """Líneas en orden de alta; se sustituye entero al compactar."""
+
+    lineas: List[Tuple[int, _Linea]]
+    # desde[i]: mínimo de `creada` de lineas[i:] (no decreciente)
+    desde: List[float]
+
+
+def _posicion_en(tramo: Tramo, instante: float) -> int:
+    """Índice de la versión vigente en `instante` dentro del tramo (-1 si ninguna)."""
+    return bisect_right(tramo.instantes, instante) - 1
+
+
+def _estado(entradas: List[Entrada], hasta: int) -> Optional[Registro]:
+    """Registro tras aplicar la entrada `hasta` (None si estaba eliminado)."""
+    inicio = hasta
+    while not entradas[inicio].completa:
+        inicio -= 1
+    estado = entradas[inicio].datos
+    for entrada in entradas[inicio + 1 : hasta + 1]:
+        estado = {**estado, **entrada.datos}
+    return estado
+
+
+class Historial:
+    """Líneas de versiones por id, mantenidas como índice derivado del almacén."""
+
+    def __init__(self):
+        self._lineas: Dict[int, _Linea] = {}
+        self._altas = Altas([], [])
+        # ids cuyo último estado es una baja, del más antiguo al más reciente
+        self._eliminados: "OrderedDict[int, None]" = OrderedDict()
+        self._candado = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Escrituras (interfaz de índice secundario)
+    # ------------------------------------------------------------------
+
+    def _linea(self, registro_id: int, instante: float) -> _Linea:
+        linea = self._lineas.get(registro_id)
+        if linea is None:
+            linea = self._lineas[registro_id] = _Linea(instante)
+            altas = self._altas
+            altas.lineas.append((registro_id, linea))
+            # Una transacción puede anotar con un instante anterior al de
+            # altas ya hechas: bajar el mínimo de la cola (asignación de
+            # slice atómica, la lista sigue ordenada para los lectores)
+            desde = altas.desde
+            inicio = bisect_right(desde, instante)
+            if inicio < len(desde):
+                desde[inicio:] = [instante] * (len(desde) - inicio)
+            desde.append(instante)
+        return linea
+
+    def _compactar_altas(self) -> None:
+        """Quitar de las altas las líneas descartadas (se llama con el candado)."""
+        lineas = [(i, linea) for i, linea in self._altas.lineas if self._lineas.get(i) is linea]
+        desde = [linea.creada for _, linea in lineas]
+        for posicion in range(len(desde) - 2, -1, -1):
+            desde[posicion] = min(desde[posicion], desde[posicion + 1])
+        self._altas = Altas(lineas, desde)
+
+    def _descartadas(self) -> bool:
+        return len(self._altas.lineas) > 2 * len(self._lineas) + 1024
+
+    def _anotar(self, registro_id: int, entrada: Entrada, instante: float) -> _Linea:
+        linea = self._linea(registro_id, instante)
+        tramo = linea.tramo
+        if tramo.instantes:
+            instante = max(instante, tramo.instantes[-1])
+        tramo.entradas.append(entrada)
+        tramo.instantes.append(instante)
+        linea.desde_completa = 0 if entrada.completa else linea.desde_completa + 1
+        if len(tramo.entradas) > MAX_VERSIONES:
+            linea.tramo = _recortar(tramo, len(tramo.entradas) - MAX_VERSIONES)
+        return linea
+
+    def _agregar(self, registro: Registro, instante: float) -> None:
+        self._anotar(registro["id"], Entrada(CREAR, True, registro), instante).actual = registro
+        self._eliminados.pop(registro["id"], None)
+
+    def agregar(self, registro: Registro) -> None:
+        with self._candado:
+            self._agregar(registro, _instante_comun.get() or time.time())
+
+    def agregar_muchos(self, registros: Iterable[Registro]) -> None:
+        instante = _instante_comun.get() or time.time()
+        with self._candado:
+            for registro in registros:
+                self._agregar(registro, instante)
+
+    def actualizar(self, registro: Registro) -> None:
+        with self._candado:
+            instante = _instante_comun.get() or time.time()
+            linea = self._linea(registro["id"], instante)
+            anterior = linea.actual or {}
+            cambios = {c: v for c, v in registro.items() if anterior.get(c) != v}
+            if not cambios:
+                return
+            if linea.actual is None or linea.desde_completa + 1 >= INTERVALO_COMPLETO:
+                entrada = Entrada(ACTUALIZAR, True, registro)
+            else:
+                entrada = Entrada(ACTUALIZAR, False, cambios)
+            self._anotar(registro["id"], entrada, instante)
+            linea.actual = registro
+
+    def eliminar(self, registro: Registro) -> None:
+        with self._candado:
+            instante = _instante_comun.get() or time.time()
+            self._anotar(registro["id"], Entrada(ELIMINAR, True, None), instante).actual = None
+            self._eliminados[registro["id"]] = None
+            while len(self._eliminados) > MAX_ELIMINADOS:
+                viejo, _ = self._eliminados.popitem(last=False)
+                self._lineas.pop(viejo, None)
+            if self._descartadas():
+                self._compactar_altas()
+
+    # ------------------------------------------------------------------
+    # Lecturas
+    # ------------------------------------------------------------------
+
+    def estado_en(self, registro_id: int, instante: float) -> Optional[Registro]:
+        """
+        Registro tal como estaba en `instante` (None si no existía).
+
+        Raises:
+            VersionNoConservada: existía, pero esa versión ya se descartó
+        """
+        linea = self._lineas.get(registro_id)
+        if linea is None:
+            return None
+        tramo = linea.tramo
+        posicion = _posicion_en(tramo, instante)
+        if posicion < 0:
+            if linea.creada <= instante:
+                raise VersionNoConservada(registro_id, instante)
+            return None
+        return _estado(tramo.entradas, posicion)
+
+    def registros_en(self, instante: float, skip: int = 0, limit: Optional[int] = None) -> List[Registro]:
+        """
+        Registros existentes en `instante`, en orden de primera alta.
+
+        Raises:
+            VersionNoConservada: alguno de los recorridos existía, pero esa
+                versión ya se descartó (la lista estaría incompleta)
+        """
+        altas = self._altas
+        # Las líneas desde `fin` se crearon todas después de `instante`
+        fin = bisect_right(altas.desde, instante)
+        resultado: List[Registro] = []
+        saltados = 0
+        for registro_id, linea in islice(altas.lineas, fin):
+            if self._lineas.get(registro_id) is not linea:
+                continue
+            tramo = linea.tramo
+            posicion = _posicion_en(tramo, instante)
+            if posicion < 0:
+                if linea.creada <= instante:
+                    raise VersionNoConservada(registro_id, instante)
+                continue
+            if tramo.entradas[posicion].operacion == ELIMINAR:
+                continue
+            if saltados < skip:
+                saltados += 1
+                continue
+            resultado.append(_estado(tramo.entradas, posicion))
+            if limit is not None and len(resultado) >= limit:
+                break
+        return resultado
+
+    def versiones(self, registro_id: int) -> Optional[List[Dict[str, Any]]]:
+        """Versiones conservadas con los campos que cambió cada una (None si no hay historial)."""
+        linea = self._lineas.get(registro_id)
+        if linea is None:
+            return None
+        primera, instantes, entradas = linea.tramo
+        resultado = []
+        anterior: Optional[Registro] = None
+        for posicion, instante in enumerate(instantes):
+            entrada = entradas[posicion]
+            estado = entrada.datos if entrada.completa else {**anterior, **entrada.datos}
+            if entrada.operacion == ELIMINAR:
+                cambios: Registro = {}
+            elif anterior is None:
+                cambios = dict(estado)
+            else:
+                cambios = {c: v for c, v in estado.items() if anterior.get(c) != v}
+            resultado.append(
+                {
+                    "version": primera + posicion,
+                    "fecha": a_fecha(instante),
+                    "operacion": entrada.operacion,
+                    "cambios": cambios,
+                }
+            )
+            anterior = estado
+        return resultado
+
+    # ------------------------------------------------------------------
+    # Retención
+    # ------------------------------------------------------------------
+
+    def purgar(self, ahora: Optional[float] = None) -> int:
+        """
+        Compactar lo anterior a la ventana de retención; devuelve las versiones descartadas.
+
+        Se conserva la última versión anterior al corte (materializada como
+        completa), así que el estado en cualquier instante de la ventana
+        sigue siendo reconstruible. Las líneas cuyo último estado es una baja
+        anterior al corte se eliminan.
+        """
+        if not RETENCION_SEGUNDOS:
+            return 0
+        corte = (ahora or time.time()) - RETENCION_SEGUNDOS
+        descartadas = 0
+        for registro_id in list(self._lineas):
+            with self._candado:
+                linea = self._lineas.get(registro_id)
+                if linea is None:
+                    continue
+                tramo = linea.tramo
+                posicion = bisect_right(tramo.instantes, corte) - 1
+                if linea.actual is None and posicion == len(tramo.instantes) - 1:
+                    del self._lineas[registro_id]
+                    self._eliminados.pop(registro_id, None)
+                    descartadas += len(tramo.instantes)
+                elif posicion > 0:
+                    linea.tramo = _recortar(tramo, posicion)
+                    descartadas += posicion
+        with self._candado:
+            if self._descartadas():
+                self._compactar_altas()
+        return descartadas
+
+    def bytes_estructura(self) -> int:
+        """Bytes de líneas, listas y deltas (sin los registros compartidos con el almacén)."""
+        altas = self._altas
+        total = sys.getsizeof(self._lineas) + sys.getsizeof(self._eliminados)
+        total += sys.getsizeof(altas.lineas) + sys.getsizeof(altas.desde)
+        total += len(altas.lineas) * (sys.getsizeof((0, None)) + sys.getsizeof(0.0))
+        for linea in list(self._lineas.values()):
+            _, instantes, entradas = linea.tramo
+            total += sys.getsizeof(linea) + sys.getsizeof(instantes) + sys.getsizeof(entradas)
+            total += len(instantes) * sys.getsizeof(0.0)
+            for entrada in entradas:
+                total += sys.getsizeof(entrada)
+                if not entrada.completa:
+                    total += sys.getsizeof(entrada.datos)
+        return total
+
+
+def _recortar(tramo: Tramo, descartar: int) -> Tramo:
+    """Quitar las `descartar` versiones más antiguas; la primera restante pasa a completa."""
+    entradas = tramo.entradas[descartar:]
+    primera = entradas[0]
+    if not primera.completa:
+        entradas[0] = Entrada(primera.operacion, True, _estado(tramo.entradas, descartar))
+    return Tramo(tramo.primera + descartar, tramo.instantes[descartar:], entradas)
@@ -0,0 +1,98 @@
+"""
+Proyección de campos (sparse fieldsets) para las respuestas de la API.
+
+Permite a los clientes pedir solo algunas columnas con `?fields=id,matricula`.
+Para cada combinación de campos se construye una única vez un serializador
+(TypeAdapter sobre un TypedDict con solo esos campos) que codifica los
+registros crudos del almacén directamente a JSON, sin instanciar los
+modelos de respuesta completos por cada fila.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter
+from typing_extensions import TypedDict
+
+from .exceptions import ValidationError
+
+
+def parsear_campos(fields: Optional[str], modelo: Type[BaseModel]) -> Optional[Tuple[str, ...]]:
+    """
+    Convertir el parámetro `fields` en una tupla de campos válidos.
+
+    Args:
+        fields: Texto recibido (ej: "id,matricula"); None o vacío = sin proyección
+        modelo: Modelo de respuesta cuyos campos son los permitidos
+
+    Raises:
+        ValidationError: Si se pide un campo que no existe en el modelo
+    """
+    if not fields:
+        return None
+    campos: List[str] = []
+    for campo in fields.split(","):
+        campo = campo.strip()
+        if campo and campo not in campos:
+            campos.append(campo)
+    desconocidos = [c for c in campos if c not in modelo.model_fields]
+    if desconocidos or not campos:
+        raise ValidationError(
+            "Parámetro inválido: fields",
+            f"Campos desconocidos: {', '.join(desconocidos)}. "
+            f"Permitidos: {', '.join(modelo.model_fields)}",
+        )
+    return tuple(campos)
+
+
+@lru_cache(maxsize=256)
+def _tipo_proyeccion(modelo: Type[BaseModel], campos: Tuple[str, ...]) -> type:
+    anotaciones = {c: modelo.model_fields[c].annotation for c in campos}
+    return TypedDict(f"{modelo.__name__}Proyeccion", anotaciones)
+
+
+@lru_cache(maxsize=256)
+def obtener_serializador(
+    modelo: Type[BaseModel],
+    campos: Tuple[str, ...],
+    forma: str = "lista",
+    claves_extra: Tuple[str, ...] = (),
+) -> TypeAdapter:
+    """
+    Serializador cacheado por (modelo, campos, forma).
+
+    Formas soportadas:
+        - "item": un solo registro
+        - "lista": lista de registros
+        - "lote": dict con "encontrados" (lista proyectada) más `claves_extra`
+    """
+    proyeccion = _tipo_proyeccion(modelo, campos)
+    if forma == "item":
+        return TypeAdapter(proyeccion)
+    if forma == "lista":
+        return TypeAdapter(List[proyeccion])
+    if forma == "lote":
+        anotaciones: Dict[str, Any] = {"encontrados": List[proyeccion]}
+        anotaciones.update({clave: List[Any] for clave in claves_extra})
+        return TypeAdapter(TypedDict(f"{modelo.__name__}LoteProyeccion", anotaciones))
+    raise ValueError(f"Forma de proyección desconocida: {forma}")
+
+
+def respuesta_proyectada(
+    datos: Any,
+    modelo: Type[BaseModel],
+    campos: Tuple[str, ...],
+    forma: str = "lista",
+    status_code: int = 200,
+) -> Response:
+    """Codificar `datos` (registros crudos) con solo los campos pedidos."""
+    claves_extra: Tuple[str, ...] = ()
+    if forma == "lote":
+        claves_extra = tuple(k for k in datos if k != "encontrados")
+    serializador = obtener_serializador(modelo, campos, forma, claves_extra)
+    return Response(
+        content=serializador.dump_json(datos),
+        status_code=status_code,
+        media_type="application/json",
+    )
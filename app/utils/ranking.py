@@ -0,0 +1,186 @@
+"""
+Índice de ranking (posición y percentil) sobre un campo numérico acotado.
+
+El rango [minimo, maximo] del campo se divide en cubetas de ancho
+`resolucion` y un árbol de Fenwick (Binary Indexed Tree) guarda cuántos
+registros hay en cada una. Contar los registros por debajo o por encima de
+un valor es una suma de prefijo y cada alta, baja o cambio de valor mueve
+una unidad entre cubetas. Ambas operaciones son O(log cubetas) y no se
+recorre ningún registro.
+
+Los valores que caen en la misma cubeta cuentan como empatados: con
+promedio (0.0-5.0) y resolución 0.001 eso solo ocurre con diferencias de
+menos de una milésima; con horasClase (enteros) la resolución 1 es exacta.
+
+Se engancha al almacén como índice derivado (ver
+Almacen.indices_secundarios), así que altas, actualizaciones, bajas,
+cargas masivas y transacciones lo mantienen al día.
+"""
+
+import sys
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+Registro = Dict[str, Any]
+
+
+class Fenwick:
+    """Conteos por posición con sumas de prefijo en O(log n)."""
+
+    def __init__(self, tamano: int):
+        self.tamano = tamano
+        self._arbol = [0] * (tamano + 1)  # 1-based
+
+    def sumar(self, posicion: int, delta: int) -> None:
+        i = posicion + 1
+        arbol, tamano = self._arbol, self.tamano
+        while i <= tamano:
+            arbol[i] += delta
+            i += i & -i
+
+    def prefijo(self, posicion: int) -> int:
+        """Suma de las posiciones 0..posicion (0 si posicion < 0)."""
+        i = min(posicion + 1, self.tamano)
+        arbol = self._arbol
+        total = 0
+        while i > 0:
+            total += arbol[i]
+            i -= i & -i
+        return total
+
+    def reconstruir(self, conteos: List[int]) -> None:
+        """Rehacer el árbol a partir de los conteos por posición en O(n)."""
+        arbol = [0] + list(conteos)
+        for i in range(1, self.tamano + 1):
+            padre = i + (i & -i)
+            if padre <= self.tamano:
+                arbol[padre] += arbol[i]
+        self._arbol = arbol
+
+    def bytes_estructura(self) -> int:
+        return sys.getsizeof(self._arbol)
+
+
+class IndiceRanking:
+    """Posición de cada registro según `campo` (mayor valor = posición 1)."""
+
+    def __init__(self, campo: str, minimo: float, maximo: float, resolucion: float):
+        self.campo = campo
+        self.minimo = minimo
+        self.maximo = maximo
+        self.resolucion = resolucion
+        self._cubetas = int(round((maximo - minimo) / resolucion)) + 1
+        self._arbol = Fenwick(self._cubetas)
+        self._conteos = [0] * self._cubetas
+        self._cubeta_de: Dict[int, int] = {}  # id -> cubeta
+        self._valor_de: Dict[int, Any] = {}  # id -> valor indexado
+        self._candado = threading.Lock()
+
+    def _cubeta(self, valor: float) -> int:
+        cubeta = int(round((valor - self.minimo) / self.resolucion))
+        return min(max(cubeta, 0), self._cubetas - 1)
+
+    def _poner(self, registro_id: int, valor: Any) -> None:
+        cubeta = self._cubeta(valor)
+        self._cubeta_de[registro_id] = cubeta
+        self._valor_de[registro_id] = valor
+        self._conteos[cubeta] += 1
+        self._arbol.sumar(cubeta, 1)
+
+    def _quitar(self, registro_id: int) -> None:
+        cubeta = self._cubeta_de.pop(registro_id)
+        del self._valor_de[registro_id]
+        self._conteos[cubeta] -= 1
+        self._arbol.sumar(cubeta, -1)
+
+    # ------------------------------------------------------------------
+    # Escrituras (interfaz de índice secundario)
+    # ------------------------------------------------------------------
+
+    def agregar(self, registro: Registro) -> None:
+        with self._candado:
+            if registro["id"] in self._cubeta_de:
+                self._quitar(registro["id"])
+            self._poner(registro["id"], registro[self.campo])
+
+    def agregar_muchos(self, registros: Iterable[Registro]) -> None:
+        """Alta masiva: acumula los conteos y reconstruye el árbol una sola vez."""
+        with self._candado:
+            for registro in registros:
+                registro_id = registro["id"]
+                anterior = self._cubeta_de.get(registro_id)
+                if anterior is not None:
+                    self._conteos[anterior] -= 1
+                cubeta = self._cubeta(registro[self.campo])
+                self._cubeta_de[registro_id] = cubeta
+                self._valor_de[registro_id] = registro[self.campo]
+                self._conteos[cubeta] += 1
+            self._arbol.reconstruir(self._conteos)
+
+    def actualizar(self, registro: Registro) -> None:
+        with self._candado:
+            if registro["id"] not in self._cubeta_de:
+                return
+            if self._valor_de[registro["id"]] != registro[self.campo]:
+                self._quitar(registro["id"])
+                self._poner(registro["id"], registro[self.campo])
+
+    def eliminar(self, registro: Registro) -> None:
+        with self._candado:
+            if registro["id"] in self._cubeta_de:
+                self._quitar(registro["id"])
+
+    # ------------------------------------------------------------------
+    # Lecturas
+    # ------------------------------------------------------------------
+
+    def _posicion_de_cubeta(self, cubeta: int, propio: int) -> Dict[str, Any]:
+        """
+        Posición de un valor de la cubeta dada. `propio` es 1 si el valor es
+        el de un registro indexado (no cuenta como empatado consigo mismo).
+        """
+        total = self._arbol.prefijo(self._cubetas - 1)
+        menores = self._arbol.prefijo(cubeta - 1)
+        iguales = self._conteos[cubeta]
+        mayores = total - menores - iguales
+        return {
+            "posicion": mayores + 1,
+            "total": total,
+            "empatados": max(iguales - propio, 0),
+            # Rango percentil: por debajo más la mitad de los empatados
+            "percentil": round(100 * (menores + 0.5 * iguales) / total, 2) if total else 0.0,
+            # "Está en el top X%"
+            "top": round(100 * (mayores + 1) / total, 2) if total else 0.0,
+        }
+
+    def posicion_de(self, registro_id: int) -> Optional[Dict[str, Any]]:
+        """Posición del registro `registro_id` (None si no está indexado)."""
+        with self._candado:
+            cubeta = self._cubeta_de.get(registro_id)
+            if cubeta is None:
+                return None
+            return {
+                "id": registro_id,
+                "campo": self.campo,
+                "valor": self._valor_de[registro_id],
+                **self._posicion_de_cubeta(cubeta, propio=1),
+            }
+
+    def posicion_para(self, valor: float) -> Dict[str, Any]:
+        """Posición que tendría un registro con `valor` (sin agregarlo)."""
+        with self._candado:
+            return {
+                "id": None,
+                "campo": self.campo,
+                "valor": valor,
+                **self._posicion_de_cubeta(self._cubeta(valor), propio=0),
+            }
+
+    def bytes_estructura(self) -> int:
+        """Bytes del árbol, los conteos y los mapas por id (sin los registros)."""
+        return (
+            self._arbol.bytes_estructura()
+            + sys.getsizeof(self._conteos)
+            + sys.getsizeof(self._cubeta_de)
+            + sys.getsizeof(self._valor_de)
+        )
@@ -0,0 +1,197 @@
+"""
+Desglose del tiempo de cada petición por fases (cabecera Server-Timing).
+
+En las peticiones muestreadas RutaMedida (base de RutaMsgpack, la
+route_class de los routers) añade la cabecera `Server-Timing` con:
+
+    validacion        lectura y validación de parámetros y cuerpo (Pydantic)
+    servicio          llamadas a los servicios (app.services.asincrono)
+    serializacion     registros crudos codificados en la ruta (respuesta_cruda)
+    ruta              resto del código de la función de la ruta
+    modelo_respuesta  validación contra response_model
+    codificacion      render JSON / empaquetado MessagePack
+    total
+
+Las fases son enchufables: cualquier subsistema mide las suyas con
+`fase(nombre)` o `registrar(nombre, segundos)` y aparecen en la cabecera. Se
+descuentan de la fase fija en la que ocurren (validacion, ruta o
+modelo_respuesta), así que las fases no se solapan. Fuera de una petición
+muestreada ambas funciones son no-ops: con el muestreo desactivado el costo
+por petición es una comparación.
+
+Configuración por variables de entorno:
+    SERVER_TIMING_MUESTREO  0 desactiva (default); N mide 1 de cada N peticiones
+    SERVER_TIMING_LOG       "1" para emitir además una línea JSON por petición medida
+"""
+
+import functools
+import inspect
+import itertools
+import json
+import logging
+import os
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import Request
+from fastapi.datastructures import Default, DefaultPlaceholder
+from fastapi.responses import JSONResponse, Response
+from fastapi.routing import APIRoute
+
+logger = logging.getLogger(__name__)
+
+MUESTREO = max(0, int(os.getenv("SERVER_TIMING_MUESTREO", "0")))
+LOG = os.getenv("SERVER_TIMING_LOG", "0") == "1"
+
+_actual: ContextVar[Optional["Medicion"]] = ContextVar("medicion_tiempos", default=None)
+_peticiones = itertools.count()
+
+
+class Medicion:
+    """Tiempos acumulados de una petición."""
+
+    __slots__ = ("fases", "por_region", "region", "inicio", "inicio_ruta", "fin_ruta")
+
+    def __init__(self):
+        self.fases: Dict[str, float] = {}
+        # Tiempo de fases enchufables dentro de cada tramo fijo
+        self.por_region = {"validacion": 0.0, "ruta": 0.0, "modelo_respuesta": 0.0}
+        self.region = "validacion"
+        self.inicio = perf_counter()
+        self.inicio_ruta: Optional[float] = None
+        self.fin_ruta: Optional[float] = None
+
+    def sumar(self, nombre: str, segundos: float) -> None:
+        self.fases[nombre] = self.fases.get(nombre, 0.0) + segundos
+        self.por_region[self.region] += segundos
+
+    def desglose(self, fin: float) -> Dict[str, float]:
+        """Fases en segundos, fijas primero y enchufables a continuación."""
+        if self.inicio_ruta is None or self.fin_ruta is None:
+            return {**self.fases, "total": fin - self.inicio}
+        fijas = {
+            "validacion": self.inicio_ruta - self.inicio - self.por_region["validacion"],
+            "ruta": self.fin_ruta - self.inicio_ruta - self.por_region["ruta"],
+            "modelo_respuesta": fin - self.fin_ruta - self.por_region["modelo_respuesta"],
+        }
+        return {**fijas, **self.fases, "total": fin - self.inicio}
+
+
+class _Fase:
+    __slots__ = ("nombre", "medicion", "inicio")
+
+    def __init__(self, nombre: str, medicion: Medicion):
+        self.nombre = nombre
+        self.medicion = medicion
+
+    def __enter__(self) -> None:
+        self.inicio = perf_counter()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.medicion.sumar(self.nombre, perf_counter() - self.inicio)
+
+
+class _SinMedicion:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+
+_SIN_MEDICION = _SinMedicion()
+
+
+def fase(nombre: str):
+    """Context manager que suma su duración a la fase `nombre` de la petición actual."""
+    medicion = _actual.get()
+    if medicion is None:
+        return _SIN_MEDICION
+    return _Fase(nombre, medicion)
+
+
+def registrar(nombre: str, segundos: float) -> None:
+    """Sumar una duración ya medida a la fase `nombre` de la petición actual."""
+    medicion = _actual.get()
+    if medicion is not None:
+        medicion.sumar(nombre, segundos)
+
+
+def cabecera_server_timing(fases: Dict[str, float]) -> str:
+    return ", ".join(f"{nombre};dur={segundos * 1000:.3f}" for nombre, segundos in fases.items())
+
+
+def _medir_ruta(llamada: Callable[..., Any]) -> Callable[..., Any]:
+    """Envolver la función de la ruta para marcar su inicio y su fin."""
+
+    @functools.wraps(llamada)
+    async def medida(**valores: Any) -> Any:
+        medicion = _actual.get()
+        if medicion is None:
+            return await llamada(**valores)
+        medicion.inicio_ruta = perf_counter()
+        medicion.region = "ruta"
+        try:
+            return await llamada(**valores)
+        finally:
+            medicion.fin_ruta = perf_counter()
+            medicion.region = "modelo_respuesta"
+
+    return medida
+
+
+class JSONResponseMedida(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        with fase("codificacion"):
+            return super().render(content)
+
+
+class RutaMedida(APIRoute):
+    """
+    APIRoute que mide las fases de las peticiones muestreadas.
+
+    Las subclases que necesiten envolver el manejador de FastAPI
+    sobrescriben `manejador()`, no `get_route_handler()`, para que su
+    trabajo quede dentro de la medición.
+    """
+
+    def get_route_handler(self) -> Callable:
+        if isinstance(self.response_class, DefaultPlaceholder) and (
+            self.response_class.value is JSONResponse
+        ):
+            self.response_class = Default(JSONResponseMedida)
+        if inspect.iscoroutinefunction(self.dependant.call):
+            self.dependant.call = _medir_ruta(self.dependant.call)
+        manejador = self.manejador()
+
+        async def handler(request: Request) -> Response:
+            if not MUESTREO or next(_peticiones) % MUESTREO:
+                return await manejador(request)
+            medicion = Medicion()
+            token = _actual.set(medicion)
+            try:
+                respuesta = await manejador(request)
+            finally:
+                _actual.reset(token)
+            fases = medicion.desglose(perf_counter())
+            respuesta.headers["Server-Timing"] = cabecera_server_timing(fases)
+            if LOG:
+                logger.info(
+                    json.dumps(
+                        {
+                            "metodo": request.method,
+                            "ruta": self.path,
+                            "estado": respuesta.status_code,
+                            "fases_ms": {n: round(s * 1000, 3) for n, s in fases.items()},
+                        }
+                    )
+                )
+            return respuesta
+
+        return handler
+
+    def manejador(self) -> Callable:
+        return super().get_route_handler()
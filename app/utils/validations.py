@@ -85,4 +85,29 @@ def validar_numero_empleado(numero: str) -> None:
         raise ValidationError(
             "Formato de número de empleado inválido",
             "Debe ser exactamente 6 dígitos (ej: 789012)",
-        )
\ No newline at end of file
+        )
+
+def parsear_lista_csv(valor: Optional[str], nombre_campo: str, como_entero: bool = False) -> list:
+    """
+    Convertir un parámetro de query separado por comas en una lista.
+    
+    Args:
+        valor: Texto recibido (ej: "1,2,3"); None o vacío produce lista vacía
+        nombre_campo: Nombre del parámetro (para el mensaje de error)
+        como_entero: Si es True, cada elemento se convierte a int
+    
+    Raises:
+        ValidationError: Si algún elemento no es un entero válido
+    """
+    if not valor:
+        return []
+    elementos = [e.strip() for e in valor.split(",") if e.strip()]
+    if not como_entero:
+        return elementos
+    try:
+        return [int(e) for e in elementos]
+    except ValueError:
+        raise ValidationError(
+            f"Parámetro inválido: {nombre_campo}",
+            f"El parámetro '{nombre_campo}' debe ser una lista de enteros separados por comas",
+        )
@@ -0,0 +1,6 @@
+"""
+Benchmarks de rendimiento de la API.
+
+Ejecutar desde la raíz del proyecto, por ejemplo:
+    python -m benchmarks.bench_lookup
+"""
@@ -0,0 +1,66 @@
+"""
+Benchmark: latencia de GET /alumnos/{id} mientras hay una operación lenta en curso.
+
+Compara una operación bloqueante ejecutada directamente en el event loop con
+la misma operación delegada al pool de servicios (app.services.asincrono).
+
+Ejecutar desde la raíz del proyecto con:
+    python -m benchmarks.bench_concurrencia
+"""
+
+import asyncio
+import logging
+import statistics
+import time
+
+import httpx
+
+from app.main import app
+from app.services.asincrono import ejecutar_bloqueante
+
+DURACION_LENTA = 0.5
+N_RAPIDAS = 200
+
+
+@app.get("/bench/lento-bloqueante", include_in_schema=False)
+async def _lento_bloqueante():
+    time.sleep(DURACION_LENTA)
+    return {"ok": True}
+
+
+@app.get("/bench/lento-delegado", include_in_schema=False)
+async def _lento_delegado():
+    await ejecutar_bloqueante(time.sleep, DURACION_LENTA)
+    return {"ok": True}
+
+
+async def _medir(client: httpx.AsyncClient, ruta_lenta: str, alumno_id: int) -> list:
+    async def rapida(inicio: float) -> float:
+        await client.get(f"/alumnos/{alumno_id}")
+        return (time.perf_counter() - inicio) * 1000
+
+    # La latencia se mide desde que la petición rápida se encola, de modo que
+    # cualquier bloqueo del event loop por la operación lenta cuenta.
+    lenta = asyncio.create_task(client.get(ruta_lenta))
+    rapidas = [asyncio.create_task(rapida(time.perf_counter())) for _ in range(N_RAPIDAS)]
+    latencias = await asyncio.gather(*rapidas)
+    await lenta
+    return sorted(latencias)
+
+
+async def main() -> None:
+    logging.disable(logging.INFO)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        payload = {"nombres": "Bench", "apellidos": "Conc", "matricula": "BC000001", "promedio": 3.0}
+        alumno_id = (await client.post("/alumnos", json=payload)).json()["id"]
+
+        for ruta in ("/bench/lento-bloqueante", "/bench/lento-delegado"):
+            latencias = await _medir(client, ruta, alumno_id)
+            p50 = statistics.median(latencias)
+            p99 = latencias[int(len(latencias) * 0.99) - 1]
+            print(f"{ruta:26s} p50={p50:7.1f} ms  p99={p99:7.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,113 @@
+"""
+Benchmark: cargar la tabla completa de alumnos en un dataframe, paginando
+JSON (GET /alumnos con cursor) frente al export Arrow (GET /alumnos/export.arrow).
+
+Se lanza el servidor de producción sembrado con N alumnos y se mide de punta
+a punta: descarga, decodificación y construcción del dataframe. Con pandas
+instalado el destino es un pandas.DataFrame; si no, una pyarrow.Table.
+
+Ejecutar desde la raíz del proyecto con:
+    python -m benchmarks.bench_exportacion [registros]
+"""
+
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable
+
+import httpx
+import pyarrow as pa
+
+from benchmarks.bench_servidor import PUERTO, _esperar_salud
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+RONDAS = 3
+BASE = f"http://127.0.0.1:{PUERTO}"
+
+
+def _sembrar(ruta: str, registros: int) -> None:
+    azar = random.Random(0)
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        for i in range(1, registros + 1):
+            fila = {
+                "id": i,
+                "nombres": f"Nombre{i % 997}",
+                "apellidos": f"Apellido{i % 991}",
+                "matricula": f"BX{i:08d}",
+                "promedio": round(azar.uniform(0, 5), 2),
+            }
+            archivo.write(json.dumps(fila) + "\n")
+
+
+def _desde_json(cliente: httpx.Client) -> Any:
+    filas = []
+    respuesta = cliente.get("/alumnos", params={"snapshot": True, "limit": 1000})
+    while True:
+        filas.extend(respuesta.json())
+        cursor = respuesta.headers.get("X-Cursor-Siguiente")
+        if not cursor:
+            break
+        respuesta = cliente.get("/alumnos", params={"cursor": cursor, "limit": 1000})
+    return pd.DataFrame(filas) if pd is not None else pa.Table.from_pylist(filas)
+
+
+def _desde_arrow(cliente: httpx.Client) -> Any:
+    tabla = pa.ipc.open_stream(cliente.get("/alumnos/export.arrow").content).read_all()
+    return tabla.to_pandas() if pd is not None else tabla
+
+
+def _medir(cargar: Callable[[httpx.Client], Any], cliente: httpx.Client) -> tuple:
+    mejor = float("inf")
+    for _ in range(RONDAS):
+        inicio = time.perf_counter()
+        resultado = cargar(cliente)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, len(resultado)
+
+
+def main() -> None:
+    registros = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    with tempfile.TemporaryDirectory() as directorio:
+        semilla = os.path.join(directorio, "alumnos.jsonl")
+        _sembrar(semilla, registros)
+        entorno = {
+            **os.environ,
+            "SERVIDOR_PUERTO": str(PUERTO),
+            "SERVIDOR_HOST": "127.0.0.1",
+            "SEMILLA_ALUMNOS": semilla,
+        }
+        proceso = subprocess.Popen(
+            [sys.executable, "-m", "app.servidor"],
+            env=entorno,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        try:
+            _esperar_salud(limite=300)
+            with httpx.Client(base_url=BASE, timeout=300) as cliente:
+                t_json, filas_json = _medir(_desde_json, cliente)
+                t_arrow, filas_arrow = _medir(_desde_arrow, cliente)
+                bytes_arrow = len(cliente.get("/alumnos/export.arrow").content)
+        finally:
+            os.killpg(proceso.pid, signal.SIGTERM)
+            proceso.wait(timeout=60)
+
+    assert filas_json == filas_arrow == registros, (filas_json, filas_arrow)
+    destino = "pandas.DataFrame" if pd is not None else "pyarrow.Table (pandas no instalado)"
+    print(f"{registros:,} alumnos -> {destino}, mejor de {RONDAS}")
+    print(f"JSON paginado (1000 por página): {t_json:7.2f} s")
+    print(f"Arrow IPC:                       {t_arrow:7.2f} s  ({t_json / t_arrow:.1f}x, {bytes_arrow / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
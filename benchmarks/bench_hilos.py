@@ -0,0 +1,56 @@
+"""
+Benchmark: rendimiento del almacén de alumnos con 1 a 32 hilos.
+
+Cada hilo ejecuta una mezcla de escrituras (crear / actualizar) y lecturas
+(obtener por id) directamente sobre app.services.alumnos_service y al final
+se verifican los invariantes del almacén.
+
+Ejecutar desde la raíz del proyecto con:
+    python -m benchmarks.bench_hilos
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.schemas.alumno_schema import AlumnoCreate, AlumnoUpdate
+from app.services import alumnos_service
+
+OPERACIONES_POR_HILO = 2000
+HILOS = (1, 2, 4, 8, 16, 32)
+
+
+def _trabajo(hilo: int, ronda: int) -> None:
+    ids = []
+    for i in range(OPERACIONES_POR_HILO):
+        if i % 4 == 0:
+            datos = AlumnoCreate(
+                nombres="Bench",
+                apellidos="Hilos",
+                matricula=f"BH{ronda:02d}{hilo:02d}{i:06d}",
+                promedio=(i % 50) / 10,
+            )
+            ids.append(alumnos_service.crear_alumno(datos).id)
+        elif i % 4 == 1 and ids:
+            alumnos_service.actualizar_alumno(ids[-1], AlumnoUpdate(promedio=4.0))
+        elif ids:
+            alumnos_service.obtener_alumno_por_id(ids[i % len(ids)])
+
+
+def main() -> None:
+    logging.disable(logging.INFO)
+    for ronda, hilos in enumerate(HILOS):
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=hilos) as pool:
+            list(pool.map(_trabajo, range(hilos), [ronda] * hilos))
+        duracion = time.perf_counter() - inicio
+        total = hilos * OPERACIONES_POR_HILO
+        print(f"{hilos:2d} hilos: {total / duracion:10.0f} ops/s")
+
+    assert len(alumnos_service._alumnos_por_id) == len(alumnos_service.alumnos_db)
+    assert len(alumnos_service._alumnos_por_matricula) == len(alumnos_service.alumnos_db)
+    print(f"Invariantes OK ({len(alumnos_service.alumnos_db)} alumnos)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark: costo del historial de cambios en escrituras, lecturas as_of y memoria.
+
+Se comparan dos almacenes con el mismo contenido, uno sin historial y otro
+con Historial como índice derivado: ritmo de actualizaciones, tiempo de
+reconstruir un registro en un instante (búsqueda binaria + deltas) según
+cuántas versiones tiene y bytes por versión conservada. También lista
+páginas as_of (`registros_en`, limit = PAGINA) en un instante en que solo
+existía una parte de los registros: cuesta O(skip + limit) y no depende de
+cuántos registros se crearon después.
+
+Ejecutar desde la raíz del proyecto con:
+    python -m benchmarks.bench_historial [registros] [actualizaciones]
+"""
+
+import sys
+import time
+from typing import Dict
+
+from app.utils import historial as modulo_historial
+from app.utils.almacen import Almacen
+from app.utils.historial import Historial
+
+RONDAS = 5  # sin y con historial alternados; se toma la mejor ronda de cada uno
+PAGINA = 100
+
+
+def _almacen(registros: int, con_historial: bool) -> Almacen:
+    almacen = Almacen("matricula", indices_secundarios=[Historial()] if con_historial else [])
+    almacen.cargar_muchos(
+        [
+            {"id": i + 1, "nombres": "Bench", "apellidos": "Historial", "matricula": f"BH{i:08d}", "promedio": 3.0}
+            for i in range(registros)
+        ]
+    )
+    return almacen
+
+
+def _actualizar(almacen: Almacen, registros: int, actualizaciones: int) -> float:
+    inicio = time.perf_counter()
+    for i in range(actualizaciones):
+        almacen.actualizar(i % registros + 1, {"promedio": (i % 50) / 10})
+    return actualizaciones / (time.perf_counter() - inicio)
+
+
+def _lectura_as_of(versiones: int, consultas: int = 20_000) -> float:
+    historial = Historial()
+    registro = {"id": 1, "nombres": "Bench", "promedio": 0.0}
+    historial.agregar(registro)
+    for v in range(versiones):
+        registro = {**registro, "promedio": v % 50 / 10}
+        historial.actualizar(registro)
+    instantes = historial._lineas[1].tramo.instantes
+    objetivo = instantes[len(instantes) // 2]
+    inicio = time.perf_counter()
+    for _ in range(consultas):
+        historial.estado_en(1, objetivo)
+    return (time.perf_counter() - inicio) / consultas * 1e6
+
+
+def _paginas_as_of(registros: int, existentes: int, consultas: int = 200) -> Dict[str, float]:
+    """µs por página as_of cuando en el instante consultado solo existían `existentes` registros."""
+    historial = Historial()
+    lote = [{"id": i + 1, "nombres": "Bench", "promedio": 3.0} for i in range(registros)]
+    with modulo_historial.instante_comun() as instante:
+        historial.agregar_muchos(lote[:existentes])
+    time.sleep(0.001)
+    historial.agregar_muchos(lote[existentes:])
+    tiempos = {}
+    for nombre, skip in (("primera", 0), ("última", existentes - PAGINA), ("vacía", existentes)):
+        inicio = time.perf_counter()
+        for _ in range(consultas):
+            historial.registros_en(instante, skip, PAGINA)
+        tiempos[nombre] = (time.perf_counter() - inicio) / consultas * 1e6
+    return tiempos
+
+
+def main() -> None:
+    registros = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    actualizaciones = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+
+    sin, con = _almacen(registros, False), _almacen(registros, True)
+    mejor_sin = mejor_con = 0.0
+    for _ in range(RONDAS):
+        mejor_sin = max(mejor_sin, _actualizar(sin, registros, actualizaciones // RONDAS))
+        mejor_con = max(mejor_con, _actualizar(con, registros, actualizaciones // RONDAS))
+    print(f"Actualizaciones sin historial: {mejor_sin:>10,.0f} ops/s")
+    print(f"Actualizaciones con historial: {mejor_con:>10,.0f} ops/s  ({mejor_con / mejor_sin:.2f}x)")
+
+    historial: Historial = con.indices_secundarios[0]
+    versiones = sum(len(linea.tramo.instantes) for linea in historial._lineas.values())
+    print(
+        f"Memoria: {historial.bytes_estructura() / versiones:.0f} bytes por versión "
+        f"({versiones:,} versiones, máximo {modulo_historial.MAX_VERSIONES} por registro)"
+    )
+
+    print(f"Lectura as_of (intervalo completo = {modulo_historial.INTERVALO_COMPLETO}):")
+    for n in (1, 16, 64, 1024):
+        modulo_historial.MAX_VERSIONES = max(n + 1, 64)
+        print(f"    {n:>5} versiones: {_lectura_as_of(n):6.2f} µs")
+
+    print(f"Páginas as_of de {PAGINA} (µs; primera, última y vacía de las existentes):")
+    for existentes in (1_000, 10_000):
+        tiempos = _paginas_as_of(100_000, existentes)
+        detalle = "  ".join(f"{nombre} {us:9.1f}" for nombre, us in tiempos.items())
+        print(f"    {existentes:>6} de 100,000 registros: {detalle}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Benchmark: N llamadas GET /alumnos/{id} contra una sola llamada de lote.
+
+Ejecutar desde la raíz del proyecto con:
+    python -m benchmarks.bench_lookup
+"""
+
+import logging
+import time
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+N_REGISTROS = 5000
+N_CONSULTA = 500
+
+
+def _poblar(client: TestClient) -> list:
+    ids = []
+    for i in range(N_REGISTROS):
+        payload = {
+            "nombres": "Bench",
+            "apellidos": "Lookup",
+            "matricula": f"BL{i:06d}",
+            "promedio": (i % 50) / 10,
+        }
+        ids.append(client.post("/alumnos", json=payload).json()["id"])
+    return ids
+
+
+def main() -> None:
+    logging.disable(logging.INFO)
+    client = TestClient(app)
+    ids = _poblar(client)
+    consulta = ids[:: N_REGISTROS // N_CONSULTA][:N_CONSULTA]
+
+    inicio = time.perf_counter()
+    for alumno_id in consulta:
+        client.get(f"/alumnos/{alumno_id}")
+    t_individual = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    response = client.post("/alumnos/lookup", json={"ids": consulta})
+    t_lote = time.perf_counter() - inicio
+    assert len(response.json()["encontrados"]) == len(consulta)
+
+    print(f"{N_CONSULTA} GET individuales: {t_individual * 1000:8.1f} ms")
+    print(f"1 POST /lookup:        {t_lote * 1000:8.1f} ms")
+    print(f"Aceleración:           {t_individual / t_lote:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
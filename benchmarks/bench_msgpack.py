@@ -0,0 +1,54 @@
+"""
+Benchmark: JSON contra MessagePack en páginas de 1000 alumnos.
+
+Mide tamaño del payload y tiempo de codificación en el servidor (incluida la
+ruta completa) y de decodificación en el cliente.
+
+Ejecutar desde la raíz del proyecto con:
+    python -m benchmarks.bench_msgpack
+"""
+
+import json
+import logging
+import time
+
+import msgpack
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import alumnos_service
+
+REPETICIONES = 50
+
+
+def _medir(client: TestClient, accept: str, decodificar) -> None:
+    cabeceras = {"Accept": accept}
+    client.get("/alumnos", params={"limit": 1000}, headers=cabeceras)
+    t_peticion = t_decodificar = 0.0
+    for _ in range(REPETICIONES):
+        inicio = time.perf_counter()
+        response = client.get("/alumnos", params={"limit": 1000}, headers=cabeceras)
+        t_peticion += time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        filas = decodificar(response.content)
+        t_decodificar += time.perf_counter() - inicio
+    assert len(filas) == 1000
+    print(
+        f"{accept:20s} {len(response.content) / 1024:7.1f} KiB  "
+        f"petición {t_peticion * 1000 / REPETICIONES:6.2f} ms  "
+        f"decodificación {t_decodificar * 1000 / REPETICIONES:6.2f} ms"
+    )
+
+
+def main() -> None:
+    logging.disable(logging.INFO)
+    alumnos_service.cargar_registros(
+        [(i, (None, "Nombre", "Apellido", f"BM{i:06d}", (i % 51) / 10)) for i in range(1000)]
+    )
+    client = TestClient(app)
+    _medir(client, "application/json", json.loads)
+    _medir(client, "application/msgpack", msgpack.unpackb)
+
+
+if __name__ == "__main__":
+    main()
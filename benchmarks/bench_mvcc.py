@@ -0,0 +1,82 @@
+"""
+Benchmark: escrituras con y sin un lector paginando sobre fotos (MVCC).
+
+Un hilo actualiza alumnos sin pausa mientras otro recorre el almacén
+página a página con cursor. Se mide el ritmo de escrituras con y sin
+lector (los lectores no deben frenarlas), las páginas leídas y el costo de
+publicar una versión nueva y fijarla.
+
+Ejecutar desde la raíz del proyecto con:
+    python -m benchmarks.bench_mvcc [registros]
+"""
+
+import logging
+import sys
+import threading
+import time
+
+from app.services import alumnos_service
+
+DURACION = 2.0
+
+
+def _escribir(parar: threading.Event, contador: list) -> None:
+    almacen = alumnos_service.almacen
+    n = len(almacen.registros)
+    i = 0
+    while not parar.is_set():
+        almacen.actualizar(i % n + 1, {"promedio": (i % 50) / 10})
+        i += 1
+    contador.append(i)
+
+
+def _paginar(parar: threading.Event, contador: list) -> None:
+    paginas = 0
+    while not parar.is_set():
+        registros, cursor = alumnos_service.obtener_pagina_alumnos(limit=1000)
+        vistos = {r["id"] for r in registros}
+        while cursor and not parar.is_set():
+            registros, cursor = alumnos_service.obtener_pagina_alumnos(cursor, limit=1000)
+            vistos.update(r["id"] for r in registros)
+            paginas += 1
+        assert cursor or len(vistos) == len(alumnos_service.alumnos_db)
+    contador.append(paginas)
+
+
+def _correr(con_lector: bool) -> tuple:
+    parar = threading.Event()
+    escrituras: list = []
+    paginas: list = []
+    hilos = [threading.Thread(target=_escribir, args=(parar, escrituras))]
+    if con_lector:
+        hilos.append(threading.Thread(target=_paginar, args=(parar, paginas)))
+    for hilo in hilos:
+        hilo.start()
+    time.sleep(DURACION)
+    parar.set()
+    for hilo in hilos:
+        hilo.join()
+    return escrituras[0] / DURACION, (paginas[0] / DURACION if paginas else 0)
+
+
+def main() -> None:
+    logging.disable(logging.INFO)
+    registros = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    alumnos_service.cargar_registros(
+        [(i, (None, "Bench", "Mvcc", f"BM{i:08d}", 3.0)) for i in range(registros)]
+    )
+
+    inicio = time.perf_counter()
+    for i in range(20):
+        alumnos_service.almacen.actualizar(i + 1, {"promedio": 4.0})
+        alumnos_service.almacen.snapshot()
+    print(f"Escritura + foto de {registros} registros: {(time.perf_counter() - inicio) * 50:.2f} ms")
+
+    solo, _ = _correr(con_lector=False)
+    con_lector, paginas = _correr(con_lector=True)
+    print(f"Escrituras sin lector: {solo:>10,.0f} ops/s")
+    print(f"Escrituras con lector: {con_lector:>10,.0f} ops/s  ({paginas:,.0f} páginas/s de 1000)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark: posición de un alumno por promedio, recorriendo y ordenando
+alumnos_db frente al índice de ranking (árbol de Fenwick).
+
+Se mide el tiempo por consulta de cada forma y el costo que el índice añade
+a cada actualización de promedio.
+
+Ejecutar desde la raíz del proyecto con:
+    python -m benchmarks.bench_ranking [registros]
+"""
+
+import logging
+import random
+import sys
+import time
+
+from app.services import alumnos_service
+
+CONSULTAS = 2000
+
+
+def _posicion_ordenando(alumno_id: int) -> int:
+    ordenados = sorted(alumnos_service.alumnos_db, key=lambda a: a["promedio"], reverse=True)
+    promedio = alumnos_service.almacen.por_id.get(alumno_id)["promedio"]
+    return next(i for i, a in enumerate(ordenados) if a["promedio"] == promedio) + 1
+
+
+def main() -> None:
+    logging.disable(logging.INFO)
+    registros = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    azar = random.Random(0)
+    alumnos_service.cargar_registros(
+        [(i, (None, "Bench", "Ranking", f"BR{i:08d}", round(azar.uniform(0, 5), 2))) for i in range(registros)]
+    )
+    ids = [a["id"] for a in azar.sample(alumnos_service.alumnos_db, 20)]
+
+    for alumno_id in ids:
+        assert _posicion_ordenando(alumno_id) == alumnos_service.obtener_ranking_alumno(alumno_id)["posicion"]
+
+    inicio = time.perf_counter()
+    for alumno_id in ids:
+        _posicion_ordenando(alumno_id)
+    ordenando = (time.perf_counter() - inicio) / len(ids) * 1e6
+
+    inicio = time.perf_counter()
+    for i in range(CONSULTAS):
+        alumnos_service.obtener_ranking_alumno(ids[i % len(ids)])
+    fenwick = (time.perf_counter() - inicio) / CONSULTAS * 1e6
+
+    indice = alumnos_service._ranking
+    registro = alumnos_service.almacen.por_id.get(ids[0])
+    inicio = time.perf_counter()
+    for i in range(CONSULTAS):
+        indice.actualizar({**registro, "promedio": (i % 500) / 100})
+    actualizacion = (time.perf_counter() - inicio) / CONSULTAS * 1e6
+
+    print(f"{registros:,} alumnos (µs por operación)")
+    print(f"Posición ordenando alumnos_db: {ordenando:12,.1f}")
+    print(f"Posición con Fenwick:          {fenwick:12,.1f}  ({ordenando / fenwick:,.0f}x)")
+    print(f"Actualizar el índice:          {actualizacion:12,.1f}")
+
+
+if __name__ == "__main__":
+    main()
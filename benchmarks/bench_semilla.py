@@ -0,0 +1,49 @@
+"""
+Benchmark: carga inicial de 1M alumnos desde CSV con validación en paralelo.
+
+Ejecutar desde la raíz del proyecto con:
+    python -m benchmarks.bench_semilla [filas]
+"""
+
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from app.services import alumnos_service, semilla_service
+
+
+def _generar_csv(ruta: str, filas: int) -> None:
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        archivo.write("nombres,apellidos,matricula,promedio\n")
+        for i in range(filas):
+            archivo.write(f"Nombre{i % 997},Apellido{i % 991},SD{i:08d},{(i % 51) / 10}\n")
+
+
+def main() -> None:
+    logging.disable(logging.INFO)
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    procesos = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = os.path.join(tmp, "alumnos.csv")
+        _generar_csv(ruta, filas)
+
+        inicio = time.perf_counter()
+        contexto = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=procesos, mp_context=contexto) as pool:
+            reporte = semilla_service.cargar_archivo(
+                "alumnos", ruta, pool, max_en_vuelo=2 * procesos
+            )
+        duracion = time.perf_counter() - inicio
+
+    print(f"{filas} filas con {procesos} procesos: {duracion:.2f} s "
+          f"({filas / duracion:,.0f} filas/s)")
+    print(f"Cargados: {reporte['cargados']}  rechazados: {reporte['total_rechazados']}")
+    assert len(alumnos_service.alumnos_db) == reporte["cargados"]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Benchmark: costo de la instrumentación Server-Timing.
+
+Compara la latencia de GET /alumnos/{id} sin muestreo, midiendo todas las
+peticiones y midiendo 1 de cada 100, e imprime un desglose típico.
+
+Ejecutar desde la raíz del proyecto con:
+    python -m benchmarks.bench_server_timing
+"""
+
+import logging
+import time
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.utils import tiempos
+
+REPETICIONES = 3000
+
+
+def _medir(client: TestClient, ruta: str, muestreo: int) -> float:
+    tiempos.MUESTREO = muestreo
+    for _ in range(200):
+        client.get(ruta)
+    inicio = time.perf_counter()
+    for _ in range(REPETICIONES):
+        client.get(ruta)
+    return (time.perf_counter() - inicio) * 1e6 / REPETICIONES
+
+
+def main() -> None:
+    logging.disable(logging.INFO)
+    client = TestClient(app)
+    payload = {"nombres": "Bench", "apellidos": "Tiempos", "matricula": "BT000001", "promedio": 4.0}
+    ruta = f"/alumnos/{client.post('/alumnos', json=payload).json()['id']}"
+
+    for muestreo in (0, 100, 1):
+        print(f"SERVER_TIMING_MUESTREO={muestreo:<3}  {_medir(client, ruta, muestreo):8.1f} µs/petición")
+
+    inicio = time.perf_counter()
+    for _ in range(1_000_000):
+        with tiempos.fase("x"):
+            pass
+    print(f"fase() sin petición medida: {(time.perf_counter() - inicio) * 1000:.0f} ns/llamada")
+
+    tiempos.MUESTREO = 1
+    print(f"Ejemplo: {client.get(ruta).headers['Server-Timing']}")
+
+
+if __name__ == "__main__":
+    main()
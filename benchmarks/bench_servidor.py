@@ -0,0 +1,129 @@
+"""
+Benchmark: arranque y rendimiento del lanzador de producción frente al de desarrollo.
+
+Para cada modo se lanza el servidor como subproceso, se mide el tiempo hasta
+que /health responde 200 y luego las peticiones por segundo de GET
+/alumnos/{id} con varias conexiones keep-alive (cliente HTTP/1.1 mínimo
+sobre asyncio, para que el cliente no sea el cuello de botella).
+
+    desarrollo   python -m uvicorn app.main:app --reload
+    produccion   python -m app.servidor
+
+Ejecutar desde la raíz del proyecto con:
+    python -m benchmarks.bench_servidor [segundos] [conexiones]
+"""
+
+import asyncio
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+PUERTO = 8799
+MODOS: Dict[str, List[str]] = {
+    "desarrollo": [sys.executable, "-m", "uvicorn", "app.main:app", "--reload", "--port", str(PUERTO)],
+    "produccion": [sys.executable, "-m", "app.servidor"],
+}
+
+
+def _peticion(metodo: str, ruta: str, cuerpo: bytes = b"") -> bytes:
+    cabeceras = f"{metodo} {ruta} HTTP/1.1\r\nHost: localhost\r\n"
+    if cuerpo:
+        cabeceras += f"Content-Type: application/json\r\nContent-Length: {len(cuerpo)}\r\n"
+    return (cabeceras + "\r\n").encode() + cuerpo
+
+
+async def _leer_respuesta(lector: asyncio.StreamReader) -> int:
+    linea_estado = await lector.readline()
+    largo = 0
+    while True:
+        linea = await lector.readline()
+        if linea in (b"\r\n", b""):
+            break
+        nombre, _, valor = linea.partition(b":")
+        if nombre.lower() == b"content-length":
+            largo = int(valor)
+    await lector.readexactly(largo)
+    return int(linea_estado.split()[1])
+
+
+async def _carga(ruta: str, segundos: float, conexiones: int) -> float:
+    fin = time.perf_counter() + segundos
+    total = 0
+
+    async def cliente() -> None:
+        nonlocal total
+        lector, escritor = await asyncio.open_connection("127.0.0.1", PUERTO)
+        peticion = _peticion("GET", ruta)
+        while time.perf_counter() < fin:
+            escritor.write(peticion)
+            assert await _leer_respuesta(lector) == 200
+            total += 1
+        escritor.close()
+
+    await asyncio.gather(*(cliente() for _ in range(conexiones)))
+    return total / segundos
+
+
+def _esperar_salud(limite: float = 60) -> float:
+    inicio = time.perf_counter()
+    while time.perf_counter() - inicio < limite:
+        try:
+            with socket.create_connection(("127.0.0.1", PUERTO), timeout=1) as sock:
+                sock.sendall(_peticion("GET", "/health"))
+                if sock.recv(4096).startswith(b"HTTP/1.1 200"):
+                    return time.perf_counter() - inicio
+        except OSError:
+            pass
+        time.sleep(0.02)
+    raise RuntimeError("El servidor no respondió a /health")
+
+
+def _crear_alumno() -> int:
+    cuerpo = json.dumps(
+        {"nombres": "Bench", "apellidos": "Servidor", "matricula": "BS000001", "promedio": 4.0}
+    ).encode()
+    with socket.create_connection(("127.0.0.1", PUERTO)) as sock:
+        sock.sendall(_peticion("POST", "/alumnos", cuerpo))
+        archivo = sock.makefile("rb")
+        largo = 0
+        for linea in iter(archivo.readline, b"\r\n"):
+            nombre, _, valor = linea.partition(b":")
+            if nombre.lower() == b"content-length":
+                largo = int(valor)
+        return json.loads(archivo.read(largo))["id"]
+
+
+def main() -> None:
+    segundos = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    conexiones = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    entorno = {**os.environ, "SERVIDOR_PUERTO": str(PUERTO), "SERVIDOR_HOST": "127.0.0.1"}
+    for modo, comando in MODOS.items():
+        proceso = subprocess.Popen(
+            comando,
+            env=entorno,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        try:
+            arranque = _esperar_salud()
+            ruta = f"/alumnos/{_crear_alumno()}"
+            rps = asyncio.run(_carga(ruta, segundos, conexiones))
+        finally:
+            inicio = time.perf_counter()
+            os.killpg(proceso.pid, signal.SIGTERM)
+            proceso.wait(timeout=60)
+            apagado = time.perf_counter() - inicio
+        print(
+            f"{modo:<11} arranque {arranque:5.2f} s   {rps:8,.0f} peticiones/s   "
+            f"apagado {apagado:5.2f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
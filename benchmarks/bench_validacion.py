@@ -0,0 +1,105 @@
+"""
+Benchmark: validación de schemas antes y después de los tipos anotados.
+
+"antes" son los schemas con field_validator(mode="before") en Python, leídos
+de git (el commit anterior al que agregó app/schemas/tipos.py); "después"
+los actuales, validados en pydantic-core. Antes de medir se comprueba que
+ambos devuelvan los mismos valores y los mismos mensajes de error, tanto con
+model_validate como con model_validate_json.
+
+Ejecutar desde la raíz del proyecto con:
+    python -m benchmarks.bench_validacion [revision_antes]
+"""
+
+import json
+import subprocess
+import sys
+import time
+import types
+from typing import Any, Dict, List, Tuple
+
+from pydantic import BaseModel, ValidationError
+
+from app.schemas import alumno_schema, profesor_schema
+
+REPETICIONES = 5000
+RONDAS = 9  # antes y después alternados; se toma la mejor ronda de cada uno
+
+PAYLOADS: List[Tuple[str, str, str, Dict[str, Any]]] = [
+    ("AlumnoCreate", "alumno", "válido",
+     {"nombres": "  Juan ", "apellidos": "García", "matricula": "AL123456", "promedio": 4.25}),
+    ("AlumnoCreate", "alumno", "inválido",
+     {"nombres": " ", "apellidos": None, "matricula": 1.5, "promedio": 7}),
+    ("AlumnoUpdate", "alumno", "válido", {"promedio": "3.5", "matricula": 123456}),
+    ("AlumnoUpdate", "alumno", "inválido", {"nombres": None, "promedio": "abc"}),
+    ("ProfesorCreate", "profesor", "válido",
+     {"numeroEmpleado": "789012", "nombres": "María", "apellidos": "Rodríguez", "horasClase": 20}),
+    ("ProfesorCreate", "profesor", "inválido",
+     {"numeroEmpleado": -5, "nombres": "", "apellidos": "R", "horasClase": 2.5}),
+    ("ProfesorUpdate", "profesor", "válido", {"horasClase": 40.0, "numeroEmpleado": 654321}),
+    ("ProfesorUpdate", "profesor", "inválido", {"horasClase": 200, "numeroEmpleado": "-1"}),
+]
+
+
+def _revision_antes() -> str:
+    agregado = subprocess.run(
+        ["git", "log", "--diff-filter=A", "--format=%H", "--", "app/schemas/tipos.py"],
+        capture_output=True, text=True, check=True,
+    ).stdout.split()
+    return f"{agregado[-1]}~1" if agregado else "HEAD"
+
+
+def _modulo_antes(revision: str, ruta: str) -> types.ModuleType:
+    codigo = subprocess.run(
+        ["git", "show", f"{revision}:{ruta}"], capture_output=True, text=True, check=True
+    ).stdout
+    modulo = types.ModuleType(f"antes_{ruta.replace('/', '_')}")
+    exec(compile(codigo, ruta, "exec"), modulo.__dict__)
+    return modulo
+
+
+def _resultado(modelo: type, datos: Dict[str, Any], desde_json: bool = False) -> Any:
+    try:
+        if desde_json:
+            return modelo.model_validate_json(json.dumps(datos)).model_dump()
+        return modelo.model_validate(datos).model_dump()
+    except ValidationError as e:
+        return [f"{' -> '.join(str(x) for x in err['loc'])}: {err['msg']}" for err in e.errors()]
+
+
+def _medir(modelo: type, datos: Dict[str, Any]) -> float:
+    validar = modelo.model_validate
+    inicio = time.perf_counter()
+    for _ in range(REPETICIONES):
+        try:
+            validar(datos)
+        except ValidationError:
+            pass
+    return (time.perf_counter() - inicio) / REPETICIONES * 1e6
+
+
+def main() -> None:
+    revision = sys.argv[1] if len(sys.argv) > 1 else _revision_antes()
+    antes = {
+        "alumno": _modulo_antes(revision, "app/schemas/alumno_schema.py"),
+        "profesor": _modulo_antes(revision, "app/schemas/profesor_schema.py"),
+    }
+    despues = {"alumno": alumno_schema, "profesor": profesor_schema}
+    print(f"antes = {revision}   (µs por payload, mejor de {RONDAS} rondas de {REPETICIONES})")
+    print(f"{'schema':<16}{'payload':<10}{'antes':>9}{'después':>9}{'x':>7}")
+    for nombre, entidad, caso, datos in PAYLOADS:
+        modelo_antes: type[BaseModel] = getattr(antes[entidad], nombre)
+        modelo_despues: type[BaseModel] = getattr(despues[entidad], nombre)
+        for desde_json in (False, True):
+            assert _resultado(modelo_antes, datos, desde_json) == _resultado(
+                modelo_despues, datos, desde_json
+            ), (nombre, caso, desde_json)
+        t_antes = t_despues = float("inf")
+        for _ in range(RONDAS):
+            t_antes = min(t_antes, _medir(modelo_antes, datos))
+            t_despues = min(t_despues, _medir(modelo_despues, datos))
+        print(f"{nombre:<16}{caso:<10}{t_antes:9.2f}{t_despues:9.2f}{t_antes / t_despues:7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark: operaciones por segundo por REST frente al WebSocket /ws.
+
+Se lanza el servidor de producción como subproceso y se mide, para lecturas
+(get) y actualizaciones (update) del mismo alumno:
+
+    rest        una petición HTTP/1.1 keep-alive tras otra por conexión
+    ws          llamadas sueltas con hasta VENTANA en vuelo por conexión
+    ws-lote     frames de LOTE llamadas
+
+Ejecutar desde la raíz del proyecto con:
+    python -m benchmarks.bench_ws [segundos] [conexiones]
+"""
+
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from typing import Any, Dict
+
+import websockets
+
+from benchmarks.bench_servidor import PUERTO, _crear_alumno, _esperar_salud, _leer_respuesta, _peticion
+
+VENTANA = 32  # llamadas en vuelo por conexión WebSocket
+LOTE = 50
+
+
+def _llamada(operacion: str, alumno_id: int, i: int) -> Dict[str, Any]:
+    if operacion == "get":
+        return {"id": i, "method": "alumnos.get", "params": {"id": alumno_id}}
+    return {"id": i, "method": "alumnos.update", "params": {"id": alumno_id, "datos": {"promedio": i % 50 / 10}}}
+
+
+async def _rest(operacion: str, alumno_id: int, segundos: float, conexiones: int) -> float:
+    fin = time.perf_counter() + segundos
+    total = 0
+
+    async def cliente() -> None:
+        nonlocal total
+        lector, escritor = await asyncio.open_connection("127.0.0.1", PUERTO)
+        while time.perf_counter() < fin:
+            if operacion == "get":
+                peticion = _peticion("GET", f"/alumnos/{alumno_id}")
+            else:
+                cuerpo = json.dumps({"promedio": total % 50 / 10}).encode()
+                peticion = _peticion("PUT", f"/alumnos/{alumno_id}", cuerpo)
+            escritor.write(peticion)
+            assert await _leer_respuesta(lector) == 200
+            total += 1
+        escritor.close()
+
+    await asyncio.gather(*(cliente() for _ in range(conexiones)))
+    return total / segundos
+
+
+async def _ws(operacion: str, alumno_id: int, segundos: float, conexiones: int, lote: int = 0) -> float:
+    fin = time.perf_counter() + segundos
+    total = 0
+
+    async def cliente() -> None:
+        nonlocal total
+        async with websockets.connect(f"ws://127.0.0.1:{PUERTO}/ws", max_size=None) as ws:
+            enviados = 0
+
+            async def enviar() -> None:
+                nonlocal enviados
+                if lote:
+                    frame = [_llamada(operacion, alumno_id, enviados + j) for j in range(lote)]
+                else:
+                    frame = _llamada(operacion, alumno_id, enviados)
+                await ws.send(json.dumps(frame))
+                enviados += 1
+
+            ventana = 1 if lote else VENTANA
+            for _ in range(ventana):
+                await enviar()
+            pendientes = ventana
+            while pendientes:
+                respuesta = json.loads(await ws.recv())
+                for r in respuesta if isinstance(respuesta, list) else [respuesta]:
+                    assert "result" in r, r
+                    total += 1
+                pendientes -= 1
+                if time.perf_counter() < fin:
+                    await enviar()
+                    pendientes += 1
+
+    await asyncio.gather(*(cliente() for _ in range(conexiones)))
+    return total / segundos
+
+
+def main() -> None:
+    segundos = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    conexiones = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    entorno = {**os.environ, "SERVIDOR_PUERTO": str(PUERTO), "SERVIDOR_HOST": "127.0.0.1"}
+    proceso = subprocess.Popen(
+        [sys.executable, "-m", "app.servidor"],
+        env=entorno,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    try:
+        _esperar_salud()
+        alumno_id = _crear_alumno()
+        print(f"{conexiones} conexiones, {segundos:.0f} s por medición (operaciones/s)")
+        print(f"{'operación':<10}{'rest':>10}{'ws':>10}{'ws-lote':>10}")
+        for operacion in ("get", "update"):
+            rest = asyncio.run(_rest(operacion, alumno_id, segundos, conexiones))
+            ws = asyncio.run(_ws(operacion, alumno_id, segundos, conexiones))
+            ws_lote = asyncio.run(_ws(operacion, alumno_id, segundos, conexiones, lote=LOTE))
+            print(f"{operacion:<10}{rest:10,.0f}{ws:10,.0f}{ws_lote:10,.0f}")
+    finally:
+        os.killpg(proceso.pid, signal.SIGTERM)
+        proceso.wait(timeout=60)
+
+
+if __name__ == "__main__":
+    main()